@@ -0,0 +1,70 @@
+# DravTech/database.py
+"""
+SQLite tuning.
+
+Every new SQLite connection gets the pragmas from settings.SQLITE_PRAGMAS:
+WAL journaling so readers never wait for a writer, synchronous=NORMAL
+(durable at each WAL checkpoint, no fsync per commit), a busy timeout, and
+larger mmap and page caches. journal_mode is stored in the database file;
+the others only last for the connection, which is why persistent
+connections (CONN_MAX_AGE) matter.
+
+`serialized_write` wraps hot write paths. In WAL mode a deferred
+transaction that reads first and writes later can fail with "database is
+locked" without waiting on busy_timeout, because its snapshot went stale
+while it waited for the write lock. Opening with BEGIN IMMEDIATE takes the
+write lock up front, and a process-wide lock makes this process's writers
+queue in Python instead of polling the file lock.
+
+Other database backends (or SQLITE_SERIALIZE_WRITES=False) get a plain
+transaction.atomic().
+"""
+import threading
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+_write_lock = threading.RLock()
+
+
+@receiver(connection_created)
+def apply_sqlite_pragmas(sender, connection, **kwargs):
+    if connection.vendor != "sqlite":
+        return
+    with connection.cursor() as cursor:
+        for pragma, value in getattr(settings, "SQLITE_PRAGMAS", {}).items():
+            cursor.execute(f"PRAGMA {pragma} = {value}")
+
+
+@contextmanager
+def _begin_immediate(connection):
+    # Django opens SQLite transactions with a bare BEGIN; swap it for this
+    # transaction only.
+    connection.ensure_connection()
+    connection._start_transaction_under_autocommit = (
+        lambda: connection.cursor().execute("BEGIN IMMEDIATE")
+    )
+    try:
+        yield
+    finally:
+        del connection._start_transaction_under_autocommit
+
+
+@contextmanager
+def serialized_write(using=DEFAULT_DB_ALIAS):
+    """
+    transaction.atomic() for a hot write path; usable as a decorator.
+    Inside an existing transaction it simply nests.
+    """
+    connection = connections[using]
+    if (connection.vendor != "sqlite" or connection.in_atomic_block
+            or not getattr(settings, "SQLITE_SERIALIZE_WRITES", True)):
+        with transaction.atomic(using=using):
+            yield
+        return
+
+    with _write_lock, _begin_immediate(connection), transaction.atomic(using=using):
+        yield
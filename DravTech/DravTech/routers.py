@@ -0,0 +1,111 @@
+# DravTech/routers.py
+"""
+Primary / read-replica routing.
+
+Writes always go to "default". Reads go to the "replica" alias only while
+a view decorated with `@replica_reads` runs (the catalog pages). Only
+models from REPLICA_APPS are routed there: sessions, auth and
+contenttypes always read the primary.
+
+Read-your-writes: `PrimaryPinMiddleware` sets a short-lived cookie on the
+response to any unsafe request (orders, inquiries, contact messages,
+bookings, logins). While that cookie is present the visitor's reads stay
+on the primary, so a page loaded right after a POST never shows replica
+lag. The cookie is used instead of the session so that checking it costs
+no query.
+
+Anything that fills a shared cache (homepage sections, template fragments)
+builds inside `primary_reads()`: whatever it caches is served to every
+visitor, so it must not capture replica lag.
+
+Without a "replica" entry in settings.DATABASES everything reads the
+primary. `manage.py refresh_replica` copies the primary into a local
+SQLite replica file to stand in for real replication.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+REPLICA      = "replica"
+REPLICA_APPS = {"main", "services", "marketplace"}
+PIN_COOKIE   = "db_primary_pin"
+
+_replica_reads = ContextVar("replica_reads", default=False)
+_pinned        = ContextVar("primary_pinned", default=False)
+
+
+def has_replica():
+    return REPLICA in connections.settings
+
+
+def replica_reads(view):
+    """Send this view's catalog reads to the replica (unless pinned)."""
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        token = _replica_reads.set(request.method in ("GET", "HEAD"))
+        try:
+            return view(request, *args, **kwargs)
+        finally:
+            _replica_reads.reset(token)
+    return wrapper
+
+
+@contextmanager
+def primary_reads():
+    """Read the primary inside this block, even within a @replica_reads view."""
+    token = _replica_reads.set(False)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+class PrimaryPinMiddleware:
+
+    UNSAFE_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = _pinned.set(PIN_COOKIE in request.COOKIES)
+        try:
+            response = self.get_response(request)
+        finally:
+            _pinned.reset(token)
+
+        if request.method in self.UNSAFE_METHODS and has_replica():
+            response.set_cookie(
+                PIN_COOKIE, "1",
+                max_age=getattr(settings, "REPLICA_PIN_SECONDS", 10),
+                httponly=True, samesite="Lax", secure=settings.SESSION_COOKIE_SECURE,
+            )
+        return response
+
+
+class PrimaryReplicaRouter:
+
+    def db_for_read(self, model, **hints):
+        if (
+            _replica_reads.get()
+            and not _pinned.get()
+            and model._meta.app_label in REPLICA_APPS
+            and has_replica()
+            # Reads inside a write transaction must see its own rows.
+            and not connections[DEFAULT_DB_ALIAS].in_atomic_block
+        ):
+            return REPLICA
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases hold the same data.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db != REPLICA
@@ -28,16 +28,20 @@ INSTALLED_APPS = [
     'main',
     'services',
     'marketplace',
+    'search',
 ]
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    "main.staticfiles.PrecompressedStaticMiddleware",
+    "DravTech.routers.PrimaryPinMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "main.media.SaveDataMiddleware",
 ]
 
 ROOT_URLCONF = "DravTech.urls"
@@ -61,13 +65,67 @@ TEMPLATES = [
 WSGI_APPLICATION = "DravTech.wsgi.application"
 
 # Database
+# Connections are kept for DB_CONN_MAX_AGE seconds (health-checked on reuse)
+# so the per-connection SQLite pragmas below are paid once, not per request.
 DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": BASE_DIR / "db.sqlite3",
+        "CONN_MAX_AGE": config('DB_CONN_MAX_AGE', default=600, cast=int),
+        "CONN_HEALTH_CHECKS": True,
     }
 }
 
+# Read replica (see DravTech.routers). Catalog pages read from it when
+# DB_REPLICA_NAME is set; for local testing point it at a second SQLite file
+# and fill it with `manage.py refresh_replica`. After any POST a visitor
+# reads the primary for REPLICA_PIN_SECONDS so they see their own writes.
+DB_REPLICA_NAME = config('DB_REPLICA_NAME', default='')
+if DB_REPLICA_NAME:
+    DATABASES["replica"] = {
+        "ENGINE": config('DB_REPLICA_ENGINE', default='django.db.backends.sqlite3'),
+        "NAME": DB_REPLICA_NAME,
+        "USER": config('DB_REPLICA_USER', default=''),
+        "PASSWORD": config('DB_REPLICA_PASSWORD', default=''),
+        "HOST": config('DB_REPLICA_HOST', default=''),
+        "PORT": config('DB_REPLICA_PORT', default=''),
+        "CONN_MAX_AGE": DATABASES["default"]["CONN_MAX_AGE"],
+        "CONN_HEALTH_CHECKS": True,
+        "TEST": {"MIRROR": "default"},
+    }
+DATABASE_ROUTERS = ["DravTech.routers.PrimaryReplicaRouter"]
+REPLICA_PIN_SECONDS = config('REPLICA_PIN_SECONDS', default=10, cast=int)
+
+# SQLite tuning (see DravTech.database), applied to every new connection.
+# cache_size is negative to mean KiB rather than pages.
+SQLITE_PRAGMAS = {
+    "journal_mode": config('SQLITE_JOURNAL_MODE', default='wal'),
+    "synchronous": config('SQLITE_SYNCHRONOUS', default='normal'),
+    "busy_timeout": config('SQLITE_BUSY_TIMEOUT_MS', default=5000, cast=int),
+    "mmap_size": config('SQLITE_MMAP_SIZE', default=128 * 1024 * 1024, cast=int),
+    "cache_size": -config('SQLITE_CACHE_SIZE_KB', default=32 * 1024, cast=int),
+    "temp_store": config('SQLITE_TEMP_STORE', default='memory'),
+}
+# Open hot write transactions with BEGIN IMMEDIATE behind a process-wide lock.
+SQLITE_SERIALIZE_WRITES = config('SQLITE_SERIALIZE_WRITES', default=True, cast=bool)
+
+# Cache
+# Use a shared backend (e.g. redis/memcached) in production so that signal
+# invalidation reaches every worker process.
+CACHES = {
+    "default": {
+        "BACKEND": config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        "LOCATION": config('CACHE_LOCATION', default='dravtech'),
+    }
+}
+
+# Upper bound on homepage section staleness; sections are invalidated on save.
+HOMEPAGE_CACHE_TIMEOUT = config('HOMEPAGE_CACHE_TIMEOUT', default=60 * 60, cast=int)
+
+# {% cachefragment %} blocks are invalidated by model generations; the
+# timeout only expires fragments left behind by older generations.
+FRAGMENT_CACHE_TIMEOUT = config('FRAGMENT_CACHE_TIMEOUT', default=60 * 60 * 24, cast=int)
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {"NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator"},
@@ -87,6 +145,37 @@ STATIC_URL = '/static/'
 STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 STATICFILES_DIRS = [os.path.join(BASE_DIR, 'static')]
 
+# collectstatic writes content-hashed names plus .gz (and .br with the
+# optional `brotli` package) siblings; see main.staticfiles. Hashed files are
+# served with a STATIC_MAX_AGE immutable Cache-Control.
+STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {"BACKEND": "main.staticfiles.CompressedManifestStaticFilesStorage"},
+}
+STATIC_MAX_AGE = config('STATIC_MAX_AGE', default=60 * 60 * 24 * 365, cast=int)
+
+# Uploaded media. Model files are content-addressed (see main.storage), so
+# everything under blobs/ can be cached by browsers and CDNs forever.
+MEDIA_URL = config('MEDIA_URL', default='/media/')
+MEDIA_ROOT = config('MEDIA_ROOT', default=os.path.join(BASE_DIR, 'media'))
+MEDIA_BLOB_MAX_AGE = 60 * 60 * 24 * 365
+
+# Paid downloads (see marketplace.delivery). Set DOWNLOAD_OFFLOAD to
+# "x-accel" (nginx internal location at DOWNLOAD_ACCEL_PREFIX mapped to
+# MEDIA_ROOT) or "x-sendfile" to let the front-end server stream files.
+DOWNLOAD_OFFLOAD = config('DOWNLOAD_OFFLOAD', default='')
+DOWNLOAD_ACCEL_PREFIX = config('DOWNLOAD_ACCEL_PREFIX', default='/protected-media/')
+
+# Responsive image derivatives (see main.images)
+IMAGE_DERIVATIVE_WIDTHS = (320, 480, 768, 1200)
+IMAGE_DERIVATIVE_QUALITY = config('IMAGE_DERIVATIVE_QUALITY', default=80, cast=int)
+
+# Related products (see main.related): neighbours stored per product, of
+# which detail pages show a random four.
+RELATED_PRODUCTS_CANDIDATES = config('RELATED_PRODUCTS_CANDIDATES', default=12, cast=int)
+# Related projects (see main.similarity): top neighbours kept per project.
+RELATED_PROJECTS_LIMIT = config('RELATED_PROJECTS_LIMIT', default=6, cast=int)
+
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 # Email Configuration
@@ -99,4 +188,10 @@ EMAIL_HOST_PASSWORD = config('EMAIL_HOST_PASSWORD')
 DEFAULT_FROM_EMAIL = config('DEFAULT_FROM_EMAIL')
 DEFAULT_CONTACT_EMAIL = config('DEFAULT_CONTACT_EMAIL')
 ADMIN_EMAIL = config('ADMIN_EMAIL')
-EMAIL_SUBJECT_PREFIX = config('EMAIL_SUBJECT_PREFIX')
\ No newline at end of file
+EMAIL_SUBJECT_PREFIX = config('EMAIL_SUBJECT_PREFIX')
+
+# Email outbox (see main.outbox). Views queue mail; `manage.py run_outbox` sends it.
+OUTBOX_BATCH_SIZE = config('OUTBOX_BATCH_SIZE', default=50, cast=int)
+OUTBOX_MAX_ATTEMPTS = config('OUTBOX_MAX_ATTEMPTS', default=8, cast=int)
+OUTBOX_RETRY_BASE_SECONDS = config('OUTBOX_RETRY_BASE_SECONDS', default=60, cast=int)
+OUTBOX_RETRY_MAX_SECONDS = config('OUTBOX_RETRY_MAX_SECONDS', default=6 * 60 * 60, cast=int)
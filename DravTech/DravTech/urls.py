@@ -15,14 +15,24 @@ Including another URLconf
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
 
+import os
+
 from django.contrib import admin
 from django.urls import include, path
 from django.conf import settings
 from django.conf.urls.static import static
+from django.views.decorators.cache import cache_control
+from django.views.static import serve
+
+from search import views as search_views
 
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("", include("main.urls")),
+    path("search/", include("search.urls")),
+    path("api/search/", search_views.SearchAPIView.as_view(), name="api-search"),
+    path("api/autocomplete/", search_views.autocomplete_view, name="api-autocomplete"),
+    path("api/autocomplete/metrics/", search_views.autocomplete_metrics, name="api-autocomplete-metrics"),
     path("api/", include("services.api_urls")),
     # Pages for the services app (list + detail)
     path("services/", include("services.urls")),
@@ -30,5 +40,10 @@ urlpatterns = [
 ]
 
 if settings.DEBUG:
-    # serve media files during development
+    # serve media files during development; content-addressed blobs never change
+    urlpatterns += static(
+        f"{settings.MEDIA_URL}blobs/",
+        cache_control(public=True, max_age=settings.MEDIA_BLOB_MAX_AGE, immutable=True)(serve),
+        document_root=os.path.join(settings.MEDIA_ROOT, "blobs"),
+    )
     urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
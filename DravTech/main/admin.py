@@ -2,12 +2,15 @@ from django.contrib import admin
 from django.utils import timezone
 from django.utils.html import format_html
 
+from search.admin import IndexedSearchMixin
+
 from .models import (
     AboutPage,
     Category,
     CompanyValue,
     ContactMessage,
     HowWeWorkStep,
+    OutboxEmail,
     PricingPlan,
     Product,
     ProductInquiry,
@@ -20,9 +23,11 @@ from .models import (
 
 
 @admin.register(Product)
-class ProductAdmin(admin.ModelAdmin):
+class ProductAdmin(IndexedSearchMixin, admin.ModelAdmin):
     """Admin configuration for Product portfolio entries."""
 
+    search_kind = 'product'
+
     list_display = (
         'title',
         'category',
@@ -331,4 +336,21 @@ class ContactMessageAdmin(admin.ModelAdmin):
         ('Meta', {
             'fields': ('status', 'ip_address', 'submitted_at', 'updated_at')
         }),
-    )
\ No newline at end of file
+    )
+
+
+@admin.register(OutboxEmail)
+class OutboxEmailAdmin(admin.ModelAdmin):
+    list_display    = ('subject', 'status', 'attempts', 'next_attempt_at', 'sent_at', 'created_at')
+    list_filter     = ('status',)
+    search_fields   = ('subject', 'to')
+    readonly_fields = ('attempts', 'last_error', 'created_at', 'sent_at')
+    ordering        = ('-created_at',)
+    actions         = ['retry_now']
+
+    @admin.action(description="Retry selected emails now")
+    def retry_now(self, request, queryset):
+        updated = queryset.exclude(status=OutboxEmail.STATUS_SENT).update(
+            status=OutboxEmail.STATUS_PENDING, next_attempt_at=timezone.now(),
+        )
+        self.message_user(request, f"{updated} email(s) queued for retry.")
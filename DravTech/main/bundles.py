@@ -0,0 +1,522 @@
+# main/bundles.py
+"""
+Per-page-family CSS/JS bundles with inlined critical CSS.
+
+FAMILIES declares which asset kits each page family loads, and TEMPLATES
+maps every page template that extends base.html to its family. Unlisted
+templates use "base". A kit's stylesheets and scripts always travel
+together: aos.css without aos.js would leave every [data-aos] element
+invisible.
+
+`manage.py build_bundles` writes three files per family under
+assets/bundles/ in the first STATICFILES_DIRS entry:
+
+  <family>.css           every declared stylesheet, url()s rebased
+  <family>.js            every declared script
+  <family>.critical.css  the rules of <family>.css whose selectors can
+                         match the first screen of the family's pages,
+                         capped at CRITICAL_BUDGET
+
+base.html inlines the critical CSS in <head>, loads the full stylesheet
+bundle without blocking render, and defers the script bundle. The inline
+copy is re-sent with every page, so it covers only the first screen; the
+rest comes from the hashed bundle, which browsers cache. Run the
+command before collectstatic, which then hashes and precompresses the
+bundles like any other file. Until bundles exist, {% bundle_styles %} and
+{% bundle_scripts %} emit the individual files.
+
+"First screen" means the markup base.html renders before the content
+block (head and header), plus each page template's content up to its
+first </section> (the hero). Inline <style> and <script> are ignored.
+
+Pruning is PurgeCSS-style. Every word of a class or id attribute counts
+as a possible class or id, whatever template logic surrounds it. A class
+written as `alert-{{ message.tags }}` keeps every `.alert-*` selector.
+String literals in the family's own scripts and SAFELIST supply classes
+added at runtime. Selectors that only apply on interaction (:hover,
+:focus...) are dropped. If the rest is over CRITICAL_BUDGET, rules that
+can match the layout are kept first, then the page heroes', in cascade
+order.
+"""
+import os
+import posixpath
+import re
+from functools import lru_cache
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.template import Engine, TemplateDoesNotExist
+from django.templatetags.static import static
+
+BUNDLE_DIR = "assets/bundles"
+
+# kit: (stylesheets, scripts), in load order.
+KITS = {
+    "bootstrap":   (["assets/vendor/bootstrap/css/bootstrap.min.css"],
+                    ["assets/vendor/bootstrap/js/bootstrap.bundle.min.js"]),
+    "icons":       (["assets/vendor/bootstrap-icons/bootstrap-icons.css"], []),
+    "aos":         (["assets/vendor/aos/aos.css"], ["assets/vendor/aos/aos.js"]),
+    "purecounter": ([], ["assets/vendor/purecounter/purecounter_vanilla.js"]),
+    "site":        (["assets/css/main.css"],
+                    ["assets/js/main.js", "assets/js/marketplace.js", "assets/js/media.js"]),
+    "services":    (["assets/css/services.css"], []),
+}
+
+DEFAULT_FAMILY = "base"
+FAMILIES = {
+    "base":        ("bootstrap", "icons", "aos", "site"),
+    "home":        ("bootstrap", "icons", "aos", "purecounter", "site", "services"),
+    "marketplace": ("bootstrap", "icons", "aos", "site"),
+    "services":    ("bootstrap", "icons", "aos", "site"),
+    "about":       ("bootstrap", "icons", "aos", "site"),
+}
+
+TEMPLATES = {
+    "index.html":                           "home",
+    "products.html":                        "marketplace",
+    "product_detail.html":                  "marketplace",
+    "marketplace/products.html":            "marketplace",
+    "marketplace/product_detail.html":      "marketplace",
+    "marketplace/service_detail.html":      "marketplace",
+    "marketplace/request_demo.html":        "marketplace",
+    "marketplace/demo_confirmation.html":   "marketplace",
+    "marketplace/user_orders.html":         "marketplace",
+    "services/services.html":               "services",
+    "services/service_detail.html":         "services",
+    "services/case_study_detail.html":      "services",
+    "services/booking_confirmation.html":   "services",
+    "services/demo_confirmation.html":      "services",
+    "about.html":                           "about",
+    "portfolio_detail.html":                "about",
+    "contact/contact.html":                 "base",
+    "contact/contact_confirmation.html":    "base",
+    "user/contact_history.html":            "base",
+    "admin/admin_contacts.html":            "base",
+    "request_demo.html":                    "base",
+    "main/demo_confirmation.html":          "base",
+    "search/results.html":                  "base",
+}
+
+# Classes only ever added by vendor scripts.
+SAFELIST = {"aos-init", "aos-animate"}
+
+# Inlined CSS stays within about one initial TCP congestion window.
+CRITICAL_BUDGET = 14 * 1024
+# First-screen markup for a page with no <section> to end the hero.
+FOLD_CHARS = 4000
+
+# Dynamic prefixes left to the full bundle. `bi-{{ feature.icon }}` would
+# otherwise inline all ~2000 icon glyph rules, and the icon font itself
+# arrives after first paint anyway.
+DEFERRED_PREFIXES = {"bi-"}
+
+
+def family_for(context):
+    """The asset family for the page template being rendered."""
+    if context.get("asset_family") in FAMILIES:
+        return context["asset_family"]
+    template = getattr(context, "template", None)
+    return TEMPLATES.get(getattr(template, "name", None), DEFAULT_FAMILY)
+
+
+def sources(family, kind):
+    """Static paths of one kind ("css" or "js") that a family loads."""
+    position = 0 if kind == "css" else 1
+    return [path for kit in FAMILIES[family] for path in KITS[kit][position]]
+
+
+def bundle_name(family, suffix):
+    return f"{BUNDLE_DIR}/{family}.{suffix}"
+
+
+# ── Bundling ─────────────────────────────────
+
+_COMMENT   = re.compile(r"/\*.*?\*/", re.S)
+_CHARSET   = re.compile(r"@charset\s+[^;]+;", re.I)
+_URL       = re.compile(r"""url\(\s*(?:"([^"]*)"|'([^']*)'|([^'")\s]+))\s*\)""")
+_SOURCEMAP = re.compile(r"^\s*//[#@]\s*sourceMappingURL=.*$", re.M)
+
+
+def strip_comments(css):
+    return _COMMENT.sub("", css)
+
+
+def _is_relative(url):
+    return not re.match(r"^(?:[a-z][a-z0-9+.-]*:|/|#)", url, re.I)
+
+
+def _rebase_urls(css, source):
+    """Rewrite relative url()s in `source` so they resolve from BUNDLE_DIR."""
+    base = posixpath.dirname(source)
+
+    def repl(match):
+        url = next(group for group in match.groups() if group is not None)
+        if not _is_relative(url):
+            return match.group(0)
+        target = posixpath.normpath(posixpath.join(base, url))
+        return f'url("{posixpath.relpath(target, BUNDLE_DIR)}")'
+
+    return _URL.sub(repl, css)
+
+
+def _read(path):
+    found = finders.find(path)
+    if not found:
+        raise FileNotFoundError(f"static file {path!r} not found")
+    with open(found, encoding="utf-8") as f:
+        return f.read()
+
+
+def build_css(family):
+    parts = []
+    for path in sources(family, "css"):
+        css = _CHARSET.sub("", strip_comments(_read(path)))
+        parts.append(f"/* {path} */\n{_rebase_urls(css, path).strip()}")
+    return '@charset "UTF-8";\n' + "\n".join(parts) + "\n"
+
+
+def build_js(family):
+    parts = []
+    for path in sources(family, "js"):
+        parts.append(f"/* {path} */\n{_SOURCEMAP.sub('', _read(path)).strip()}")
+    return "\n;\n".join(parts) + "\n"
+
+
+# ── Critical CSS ─────────────────────────────────
+
+_GROUP_RULES = ("@media", "@supports", "@layer", "@container", "@document")
+_FUNCTIONAL  = re.compile(r":{1,2}[\w-]+\((?:[^()]|\([^()]*\))*\)")
+_CLASS       = re.compile(r"\.((?:\\.|[\w-])+)")
+_ID          = re.compile(r"#((?:\\.|[\w-])+)")
+_ATTRIBUTE   = re.compile(r"\[\s*([\w-]+)[^\]]*\]")
+_PSEUDO      = re.compile(r"::?[\w-]+")
+_TYPE        = re.compile(r"(?:^|[\s>+~(])([a-zA-Z][\w-]*)")
+_WORD        = re.compile(r"[A-Za-z0-9_-]+")
+_TAG         = re.compile(r"<([a-zA-Z][\w-]*)")
+_PREFIX      = re.compile(r"([A-Za-z][\w-]*-)\{[{%]")
+_TEMPLATE_REFERENCE = re.compile(r"""\{%\s*(?:extends|include)\s+["']([^"']+)["']""")
+_INCLUDE     = re.compile(r"""\{%\s*include\s+["']([^"']+)["']""")
+_CONTENT     = re.compile(r"\{%\s*block\s+content\s*%\}")
+_SECTION_END = re.compile(r"</section\s*>", re.I)
+_JS_STRING   = re.compile(r"""(["'`])((?:\\.|(?!\1).)*)\1""")
+_CLASS_OR_ID   = re.compile(r"""\b(?:class|id)\s*=\s*(["'])(.*?)\1""", re.S)
+_ATTRIBUTE_NAME = re.compile(r"\s([a-zA-Z][\w:-]*)\s*=")
+_INTERACTIVE  = re.compile(r":(?:hover|focus|focus-visible|focus-within|active|visited|disabled|checked)\b")
+_LINE_COMMENT = re.compile(r"^\s*//.*$", re.M)
+_INLINE_CODE = re.compile(r"<(style|script)\b.*?</\1\s*>", re.S | re.I)
+
+
+def _skip_string(css, i):
+    quote, i = css[i], i + 1
+    while i < len(css) and css[i] != quote:
+        i += 2 if css[i] == "\\" else 1
+    return i + 1
+
+
+def _closing_brace(css, i):
+    depth = 0
+    while i < len(css):
+        if css[i] in "\"'":
+            i = _skip_string(css, i)
+            continue
+        if css[i] == "{":
+            depth += 1
+        elif css[i] == "}":
+            depth -= 1
+            if depth == 0:
+                return i
+        i += 1
+    return len(css)
+
+
+def parse(css, i=0):
+    """
+    Split a stylesheet into (prelude, body) rules. Body is None for
+    statements (@import), a nested rule list for @media-like groups, and
+    the raw declaration text otherwise. Returns (rules, end offset).
+    """
+    rules, start = [], i
+    while i < len(css):
+        char = css[i]
+        if char in "\"'":
+            i = _skip_string(css, i)
+            continue
+        if char == ";":
+            if css[start:i].strip():
+                rules.append((css[start:i].strip(), None))
+            start = i + 1
+        elif char == "{":
+            prelude = css[start:i].strip()
+            if prelude.lower().startswith(_GROUP_RULES):
+                body, i = parse(css, i + 1)
+            else:
+                end = _closing_brace(css, i)
+                body, i = css[i + 1:end], end
+            rules.append((prelude, body))
+            start = i + 1
+        elif char == "}":
+            return rules, i
+        i += 1
+    return rules, i
+
+
+def render(rules):
+    out = []
+    for prelude, body in rules:
+        if body is None:
+            out.append(f"{prelude};")
+        elif isinstance(body, list):
+            out.append(f"{prelude}{{\n{render(body)}\n}}")
+        else:
+            out.append(f"{prelude}{{{body.strip()}}}")
+    return "\n".join(out)
+
+
+def split_selectors(prelude):
+    parts, depth, start = [], 0, 0
+    for i, char in enumerate(prelude):
+        if char in "([":
+            depth += 1
+        elif char in ")]":
+            depth -= 1
+        elif char == "," and depth == 0:
+            parts.append(prelude[start:i].strip())
+            start = i + 1
+    parts.append(prelude[start:].strip())
+    return [part for part in parts if part]
+
+
+class Vocabulary:
+    """Words, tags and class prefixes that appear in a set of templates."""
+
+    ALWAYS_TAGS = {"html", "body"}
+
+    def __init__(self, words=(), tags=(), prefixes=()):
+        self.words    = set(words) | SAFELIST
+        self.tags     = {tag.lower() for tag in tags} | self.ALWAYS_TAGS
+        self.prefixes = tuple(prefixes)
+
+    def feed(self, text, markup=True):
+        if markup:
+            # Classes and ids come from class/id values; attribute selectors
+            # need the attribute names. Link text and URL names are noise.
+            words = " ".join(value for _, value in _CLASS_OR_ID.findall(text))
+            words += " " + " ".join(_ATTRIBUTE_NAME.findall(text))
+        else:
+            # Scripts name the classes they add in string literals.
+            text  = _LINE_COMMENT.sub("", strip_comments(text))
+            words = " ".join(match[1] for match in _JS_STRING.findall(text))
+        self.words.update(_WORD.findall(words))
+        if markup:
+            self.tags.update(tag.lower() for tag in _TAG.findall(text))
+            self.prefixes += tuple(set(_PREFIX.findall(text)) - set(self.prefixes) - DEFERRED_PREFIXES)
+
+    def _has(self, name):
+        name = name.replace("\\", "")
+        return name in self.words or name.startswith(self.prefixes)
+
+    def matches(self, selector):
+        # Functional pseudo-classes (:not, :is, :nth-child) never make a
+        # selector unusable on their own; drop them before matching.
+        selector = _FUNCTIONAL.sub("", selector)
+        names    = _CLASS.findall(selector) + _ID.findall(selector)
+        selector = _ID.sub(" ", _CLASS.sub(" ", selector))
+        names   += _ATTRIBUTE.findall(selector)
+        selector = _PSEUDO.sub(" ", _ATTRIBUTE.sub(" ", selector))
+        tags     = _TYPE.findall(selector)
+        return (all(self._has(name) for name in names)
+                and all(tag.lower() in self.tags for tag in tags))
+
+
+def prune(rules, vocabulary):
+    """
+    Keep the rules (and the selectors within them) that can match.
+    @font-face and @keyframes survive only if a kept declaration uses them.
+    """
+    deferred = []
+
+    def walk(rules):
+        kept = []
+        for prelude, body in rules:
+            keyword = prelude.split(None, 1)[0].lower() if prelude.startswith("@") else ""
+            if body is None:
+                continue
+            if isinstance(body, list):
+                inner = walk(body)
+                if inner:
+                    kept.append((prelude, inner))
+            elif keyword == "@font-face" or keyword.endswith("keyframes"):
+                deferred.append((prelude, body))
+            elif not keyword:
+                selectors = [s for s in split_selectors(prelude) if vocabulary.matches(s)]
+                if selectors:
+                    kept.append((",".join(selectors), body))
+        return kept
+
+    kept = walk(rules)
+    used = set(_WORD.findall(render(kept)))
+    needed = []
+    for prelude, body in deferred:
+        if prelude.lower().startswith("@font-face"):
+            family = re.search(r"font-family\s*:\s*['\"]?([^;'\"]+)", body)
+            if family and set(_WORD.findall(family.group(1))) <= used:
+                needed.append((prelude, body))
+        elif prelude.split(None, 1)[-1].strip() in used:
+            needed.append((prelude, body))
+    return needed + kept
+
+
+def _template_source(name):
+    # Read the file rather than compile it: only the markup matters here.
+    for loader in Engine.get_default().template_loaders:
+        for origin in loader.get_template_sources(name):
+            try:
+                return origin.loader.get_contents(origin)
+            except TemplateDoesNotExist:
+                continue
+    raise TemplateDoesNotExist(name)
+
+
+def template_sources(names):
+    """Source of each named template plus everything it extends or includes."""
+    seen, pending, out = set(), list(names), []
+    while pending:
+        name = pending.pop()
+        if name in seen:
+            continue
+        seen.add(name)
+        source = _template_source(name)
+        out.append(source)
+        pending.extend(_TEMPLATE_REFERENCE.findall(source))
+    return out
+
+
+def above_the_fold(source):
+    """The part of a template that renders on the first screen."""
+    source = _INLINE_CODE.sub(" ", source)
+    block  = _CONTENT.search(source)
+    if block is None:
+        return source
+    if not re.search(r"\{%\s*extends\b", source[:block.start()]):
+        return source[:block.start()]               # the layout: head and header
+    content = source[block.end():]
+    end     = _SECTION_END.search(content)
+    return content[:end.end()] if end else content[:FOLD_CHARS]
+
+
+def fold_sources(names):
+    """First-screen markup of each named template and of what that includes."""
+    seen, out = set(), []
+    pending = [(name, True) for name in names]
+    while pending:
+        name, top = pending.pop()
+        if name in seen:
+            continue
+        seen.add(name)
+        source = _template_source(name)
+        source = above_the_fold(source) if top else _INLINE_CODE.sub(" ", source)
+        out.append(source)
+        pending.extend((included, False) for included in _INCLUDE.findall(source))
+    return out
+
+
+def vocabulary_for(family, pages=True):
+    """First-screen vocabulary of a family; pages=False covers only the layout."""
+    vocabulary = Vocabulary()
+    templates  = [name for name, owner in TEMPLATES.items() if owner == family] if pages else []
+    for source in fold_sources(["base.html", *templates]):
+        vocabulary.feed(source)
+    for path in sources(family, "js"):
+        if not path.startswith("assets/vendor/"):
+            vocabulary.feed(_read(path), markup=False)
+    return vocabulary
+
+
+def first_paint(rules):
+    """Drop selectors that only apply after user interaction (:hover, :focus...)."""
+    kept = []
+    for prelude, body in rules:
+        if isinstance(body, list):
+            inner = first_paint(body)
+            if inner:
+                kept.append((prelude, inner))
+        elif prelude.startswith("@") or body is None:
+            kept.append((prelude, body))
+        else:
+            selectors = [s for s in split_selectors(prelude) if not _INTERACTIVE.search(s)]
+            if selectors:
+                kept.append((",".join(selectors), body))
+    return kept
+
+
+def _matches_any(rule, vocabulary):
+    prelude, body = rule
+    if isinstance(body, list):
+        return any(_matches_any(inner, vocabulary) for inner in body)
+    if prelude.startswith("@"):
+        return True                     # @font-face / @keyframes a kept rule uses
+    return any(vocabulary.matches(selector) for selector in split_selectors(prelude))
+
+
+def within_budget(rules, budget=None, first=None):
+    """
+    Top-level rules that fit the budget, filled first with those that can
+    match the `first` vocabulary (the layout), then in cascade order. The
+    result keeps cascade order. Rules left out still arrive with the full
+    bundle a moment later.
+    """
+    budget   = CRITICAL_BUDGET if budget is None else budget
+    priority = sorted(
+        range(len(rules)),
+        key=lambda i: (first is not None and not _matches_any(rules[i], first), i),
+    )
+    kept, size = set(), 0
+    for i in priority:
+        length = len(render([rules[i]]).encode()) + 1
+        if size + length <= budget:
+            kept.add(i)
+            size += length
+    return [rule for i, rule in enumerate(rules) if i in kept]
+
+
+def build_critical(family, css=None):
+    css = css if css is not None else build_css(family)
+    rules, _ = parse(_CHARSET.sub("", strip_comments(css)))
+    kept = first_paint(prune(rules, vocabulary_for(family)))
+    return render(within_budget(kept, first=vocabulary_for(family, pages=False))) + "\n"
+
+
+# ── Serving ─────────────────────────────────
+
+def static_url(path):
+    clean, sep, suffix = re.match(r"([^?#]*)([?#]?)(.*)", path, re.S).groups()
+    try:
+        return static(clean) + sep + suffix
+    except ValueError:
+        # Not in the manifest; the unhashed name still resolves.
+        return f"{settings.STATIC_URL}{clean}{sep}{suffix}"
+
+
+def absolute_urls(css, base):
+    """Resolve url()s relative to static directory `base` for inlining in a page."""
+    def repl(match):
+        url = next(group for group in match.groups() if group is not None)
+        if not _is_relative(url):
+            return match.group(0)
+        return f'url("{static_url(posixpath.normpath(posixpath.join(base, url)))}")'
+
+    return _URL.sub(repl, css)
+
+
+@lru_cache(maxsize=16)
+def _load_critical(path, mtime):
+    with open(path, encoding="utf-8") as f:
+        return absolute_urls(f.read(), BUNDLE_DIR)
+
+
+def critical_css(family):
+    """The family's critical CSS with absolute URLs, or None if not built."""
+    path = finders.find(bundle_name(family, "critical.css"))
+    if not path:
+        return None
+    return _load_critical(path, os.stat(path).st_mtime_ns)
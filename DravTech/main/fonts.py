@@ -0,0 +1,336 @@
+# main/fonts.py
+"""
+Self-hosted web fonts.
+
+`manage.py vendor_fonts` works out which faces (family, weight, style)
+the site's CSS can actually use. It reads the same pruned per-family CSS
+that main.bundles inlines, plus the templates' own <style> blocks.
+Weight-only rules are attributed to the family their selector inherits,
+e.g. `.section-title h2` gets the h1–h6 heading font and everything else
+the body font. Only those faces are downloaded from Google Fonts, and
+only the unicode subsets asked for (latin by default). When the optional
+fontTools package is installed, each file is cut further to the glyphs
+the site needs.
+
+Output goes to assets/vendor/fonts/: the .woff2 files, fonts.css
+(@font-face with font-display: swap) and fonts.json listing the faces to
+preload. {% font_links %} inlines the @font-face rules and preloads
+those faces. Until fonts are vendored it falls back to the Google
+stylesheet.
+"""
+import io
+import json
+import os
+import re
+from collections import Counter
+from functools import lru_cache
+from urllib.request import Request, urlopen
+
+from django.contrib.staticfiles import finders
+
+from . import bundles
+
+try:
+    from fontTools import subset as font_subset
+    import brotli  # noqa: F401 -- fontTools needs it to write woff2
+except ImportError:         # optional; Google's unicode subsets still apply
+    font_subset = None
+
+FONT_DIR   = "assets/vendor/fonts"
+GOOGLE_CSS = "https://fonts.googleapis.com/css2"
+# Google only serves woff2 to browsers it recognises.
+USER_AGENT = ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+              "(KHTML, like Gecko) Chrome/124.0 Safari/537.36")
+
+# The Google families base.html uses, with the static weights each one
+# offers; anything else in the CSS is a system or icon font.
+FAMILIES = {
+    "Roboto":  (100, 300, 400, 500, 700, 900),
+    "Lato":    (100, 300, 400, 700, 900),
+    "Raleway": (100, 200, 300, 400, 500, 600, 700, 800, 900),
+}
+
+# What base.html loaded before fonts were vendored, and still does until
+# `manage.py vendor_fonts` has run.
+GOOGLE_FALLBACK = (
+    "https://fonts.googleapis.com/css2?family=Roboto:ital,wght@0,100;0,300;0,400;0,500;0,700;0,900;"
+    "1,100;1,300;1,400;1,500;1,700;1,900&family=Lato:ital,wght@0,100;0,300;0,400;0,700;0,900;"
+    "1,100;1,300;1,400;1,700;1,900&family=Raleway:ital,wght@0,100;0,200;0,300;0,400;0,500;0,600;"
+    "0,700;0,800;0,900;1,100;1,200;1,300;1,400;1,500;1,600;1,700;1,800;1,900&display=swap"
+)
+
+# Characters every face keeps when subsetting: printable ASCII, Latin-1,
+# typographic punctuation, euro and trademark signs. Template text adds to it.
+BASE_TEXT = "".join(map(chr, [*range(0x20, 0x7F), *range(0xA0, 0x100),
+                              *range(0x2010, 0x2028), *range(0x2030, 0x203B), 0x20AC, 0x2122]))
+
+WEIGHTS = {"normal": 400, "bold": 700, "lighter": 300, "bolder": 700}
+
+_DECLARATION = re.compile(r"(?:^|;)\s*(font-family|font-weight|font-style|--[\w-]+)\s*:\s*([^;]+)")
+_VAR         = re.compile(r"var\(\s*(--[\w-]+)\s*(?:,[^)]*)?\)")
+_STYLE_BLOCK = re.compile(r"<style[^>]*>(.*?)</style>", re.S | re.I)
+_PSEUDO      = re.compile(r":{1,2}[\w-]+(?:\((?:[^()]|\([^()]*\))*\))?")
+_COMBINATOR  = re.compile(r"\s*[>+~]\s*|\s+")
+_FACE        = re.compile(r"/\*\s*([\w-]+)\s*\*/\s*@font-face\s*\{([^}]*)\}")
+_DESCRIPTOR  = re.compile(r"([\w-]+)\s*:\s*([^;]+);")
+
+
+def _declarations(body):
+    return {name: value.replace("!important", "").strip()
+            for name, value in _DECLARATION.findall(body)}
+
+
+def _flatten(rules):
+    for prelude, body in rules:
+        if isinstance(body, list):
+            yield from _flatten(body)
+        elif body is not None and not prelude.startswith("@"):
+            yield prelude, body
+
+
+def _compounds(selector):
+    return [part for part in _COMBINATOR.split(_PSEUDO.sub("", selector).strip()) if part]
+
+
+def _is_subsequence(needle, haystack):
+    it = iter(haystack)
+    return all(part in it for part in needle)
+
+
+def _weight(value):
+    value = value.strip().lower()
+    return int(value) if value.isdigit() else WEIGHTS.get(value)
+
+
+def _rules(sheet, vocabulary):
+    parsed, _ = bundles.parse(bundles.strip_comments(sheet))
+    return [(prelude, _declarations(body))
+            for prelude, body in _flatten(bundles.prune(parsed, vocabulary))]
+
+
+def snap(weight, available):
+    """The weight a browser would pick from `available` (CSS font matching)."""
+    if weight in available:
+        return weight
+    lighter = sorted((w for w in available if w < weight), reverse=True)
+    heavier = sorted(w for w in available if w > weight)
+    if 400 <= weight <= 500:
+        up_to_500 = [w for w in heavier if w <= 500]
+        return (up_to_500 + lighter + heavier)[0]
+    return ((heavier + lighter) if weight > 500 else (lighter + heavier))[0]
+
+
+def _count(rules, faces):
+    """Add the faces one page's cascade can use to `faces`."""
+    variables = {}
+    for _, declarations in rules:
+        variables.update((k, v) for k, v in declarations.items() if k.startswith("--"))
+
+    def family_of(declarations):
+        value = _VAR.sub(lambda m: variables.get(m.group(1), ""), declarations.get("font-family", ""))
+        first = value.split(",")[0].strip().strip("'\"")
+        return None if first in ("", "inherit", "initial", "unset") else first
+
+    # Selectors that set a font, most specific last so they win below.
+    assigners, default = [], None
+    for prelude, declarations in rules:
+        family = family_of(declarations)
+        if not family:
+            continue
+        for selector in bundles.split_selectors(prelude):
+            if selector in ("html", "body", ":root"):
+                default = family            # later rules win, as in the cascade
+            assigners.append((_compounds(selector), family))
+    assigners.sort(key=lambda pair: len(pair[0]))
+
+    def inherited(selector):
+        compounds = _compounds(selector)
+        family = default
+        for needle, candidate in assigners:
+            if needle and _is_subsequence(needle, compounds):
+                family = candidate
+        return family
+
+    for prelude, declarations in rules:
+        weight = _weight(declarations.get("font-weight", "")) or 400
+        style  = "italic" if declarations.get("font-style", "").startswith(("italic", "oblique")) else "normal"
+        if family_of(declarations):
+            targets = [family_of(declarations)]
+        elif "font-weight" in declarations or "font-style" in declarations:
+            targets = [inherited(s) for s in bundles.split_selectors(prelude)]
+        elif all(inherited(s) == default for s in bundles.split_selectors(prelude)):
+            targets = [default]             # plain body text
+        else:
+            continue
+        for family in targets:
+            if family in faces:
+                faces[family][(snap(weight, FAMILIES[family]), style)] += 1
+
+    if default in faces:
+        # <em> and <strong> in page text use the body font's italic and bold.
+        faces[default][(400, "italic")] += 1
+        faces[default][(snap(700, FAMILIES[default]), "normal")] += 1
+
+
+def used_faces():
+    """
+    {family: Counter({(weight, style): rules using it})} for the vendored
+    FAMILIES, worked out page template by page template.
+    """
+    faces = {family: Counter() for family in FAMILIES}
+    for family in bundles.FAMILIES:
+        vocabulary = bundles.vocabulary_for(family)
+        bundle     = _rules(bundles.build_css(family), vocabulary)
+        for template, owner in bundles.TEMPLATES.items():
+            if owner != family:
+                continue
+            rules = list(bundle)
+            for source in bundles.template_sources([template]):
+                for block in _STYLE_BLOCK.findall(source):
+                    rules += _rules(block, vocabulary)
+            _count(rules, faces)
+    return {family: counter for family, counter in faces.items() if counter}
+
+
+def preloads(faces):
+    """
+    The face worth preloading per family: the one most rules use. Plain
+    body text counts toward the body font's regular face.
+    """
+    picked = set()
+    for family, counter in faces.items():
+        normal = [(count, weight) for (weight, style), count in counter.items() if style == "normal"]
+        if normal:
+            picked.add((family, max(normal)[1], "normal"))
+    return picked
+
+
+def google_url(faces):
+    families = []
+    for family, counter in sorted(faces.items()):
+        axes = sorted((int(style == "italic"), weight) for weight, style in counter)
+        tuples = ";".join(f"{ital},{weight}" for ital, weight in axes)
+        families.append(f"family={family.replace(' ', '+')}:ital,wght@{tuples}")
+    return f"{GOOGLE_CSS}?{'&'.join(families)}&display=swap"
+
+
+def fetch(url):
+    with urlopen(Request(url, headers={"User-Agent": USER_AGENT}), timeout=30) as response:
+        return response.read()
+
+
+def parse_google_css(css):
+    """[{subset, family, style, weight, url, unicode_range}] from a css2 response."""
+    faces = []
+    for subset, block in _FACE.findall(css):
+        descriptors = dict(_DESCRIPTOR.findall(block + ";"))
+        src = re.search(r"url\(([^)]+)\)", descriptors.get("src", ""))
+        if not src:
+            continue
+        faces.append({
+            "subset":        subset,
+            "family":        descriptors["font-family"].strip("'\" "),
+            "style":         descriptors.get("font-style", "normal").strip(),
+            "weight":        int(descriptors.get("font-weight", "400").strip()),
+            "url":           src.group(1).strip("'\""),
+            "unicode_range": descriptors.get("unicode-range", "").strip(),
+        })
+    return faces
+
+
+def _codepoints(unicode_range):
+    points = set()
+    for part in filter(None, (p.strip() for p in unicode_range.split(","))):
+        part = part.upper().removeprefix("U+")
+        if "-" in part:
+            start, end = part.split("-")
+            points.update(range(int(start, 16), int(end, 16) + 1))
+        elif "?" in part:
+            points.update(range(int(part.replace("?", "0"), 16), int(part.replace("?", "F"), 16) + 1))
+        else:
+            points.add(int(part, 16))
+    return points
+
+
+def _ranges(points):
+    out, points = [], sorted(points)
+    start = prev = points[0]
+    for point in points[1:] + [None]:
+        if point is not None and point == prev + 1:
+            prev = point
+            continue
+        out.append(f"U+{start:X}" if start == prev else f"U+{start:X}-{prev:X}")
+        if point is not None:
+            start = prev = point
+    return ", ".join(out)
+
+
+def subset(data, face, text):
+    """
+    Cut a face to the characters in `text` that its unicode-range covers.
+    Returns (data, unicode_range); unchanged without fontTools.
+    """
+    wanted = {ord(char) for char in text}
+    if face["unicode_range"]:
+        wanted &= _codepoints(face["unicode_range"])
+    if font_subset is None or not wanted:
+        return data, face["unicode_range"]
+
+    options = font_subset.Options()
+    options.flavor  = "woff2"
+    options.hinting = False
+    font = font_subset.load_font(io.BytesIO(data), options)
+    subsetter = font_subset.Subsetter(options)
+    subsetter.populate(unicodes=wanted)
+    subsetter.subset(font)
+    out = io.BytesIO()
+    font_subset.save_font(font, out, options)
+    kept = wanted & set(font.getBestCmap() or ())
+    return out.getvalue(), _ranges(kept) if kept else face["unicode_range"]
+
+
+def face_filename(face):
+    slug  = face["family"].lower().replace(" ", "-")
+    style = "-italic" if face["style"] == "italic" else ""
+    return f"{slug}-{face['weight']}{style}-{face['subset']}.woff2"
+
+
+def font_face_css(faces):
+    blocks = []
+    for face in faces:
+        blocks.append(
+            "@font-face{"
+            f"font-family:\"{face['family']}\";font-style:{face['style']};font-weight:{face['weight']};"
+            f"font-display:swap;src:url(\"{face['file']}\") format(\"woff2\");"
+            + (f"unicode-range:{face['unicode_range']};" if face["unicode_range"] else "")
+            + "}"
+        )
+    return "\n".join(blocks) + "\n"
+
+
+def site_text():
+    """BASE_TEXT plus every character that appears in the page templates."""
+    chars = set(BASE_TEXT)
+    for source in bundles.template_sources(["base.html", *bundles.TEMPLATES]):
+        chars.update(source)
+    return "".join(sorted(char for char in chars if char.isprintable()))
+
+
+# ── Serving ─────────────────────────────────
+
+def load_manifest():
+    """(font-face CSS with absolute URLs, preload URLs), or None if not vendored."""
+    path = finders.find(f"{FONT_DIR}/fonts.json")
+    if not path:
+        return None
+    return _load_manifest(path, os.stat(path).st_mtime_ns)
+
+
+@lru_cache(maxsize=4)
+def _load_manifest(path, mtime):
+    with open(path, encoding="utf-8") as f:
+        manifest = json.load(f)
+    css = bundles.absolute_urls(font_face_css(manifest["faces"]), FONT_DIR)
+    preload = [bundles.static_url(f"{FONT_DIR}/{face['file']}")
+               for face in manifest["faces"] if face.get("preload")]
+    return css, preload
@@ -0,0 +1,100 @@
+# main/fragment_cache.py
+"""
+Template fragments cached against per-model generation counters.
+
+Every model in MODELS has a counter in the cache. `{% cachefragment %}`
+(see main.templatetags.fragment_cache) puts the counters of the models a
+fragment renders into its key. The save/delete signals in `main.signals`
+bump a model's counter after commit, so the next request misses and
+re-renders from the primary database. Invalidation does not depend on a
+TTL. FRAGMENT_CACHE_TIMEOUT (a day by default) only bounds how long
+superseded generations occupy the cache.
+
+Counters are seeded from the clock, like the catalog version in
+marketplace.catalog. A counter that is evicted therefore never comes back
+with a value that matches an older fragment still in the cache.
+"""
+import os
+import time
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+
+KEY_PREFIX = "fragment-gen:"
+
+# Models whose rows appear in cached fragments (app_label.modelname).
+MODELS = {
+    "main.aboutpage",
+    "main.companyvalue",
+    "main.howweworkstep",
+    "main.pricingplan",
+    "main.product",
+    "main.project",
+    "main.sitestat",
+    "main.teammember",
+    "main.testimonial",
+    "main.timelineentry",
+    "services.casestudy",
+    "services.service",
+    "services.servicecategory",
+    "services.servicehighlight",
+}
+
+
+def label(model):
+    """'app_label.modelname' for a model class, instance or label string."""
+    if isinstance(model, str):
+        return apps.get_model(model)._meta.label_lower
+    return model._meta.label_lower
+
+
+def _key(model_label):
+    return f"{KEY_PREFIX}{model_label}"
+
+
+def _initial_generation():
+    return int(time.time() * 1000)
+
+
+def generations(labels):
+    """Current counter for each label, in order; one cache round trip."""
+    keys    = [_key(model_label) for model_label in labels]
+    current = cache.get_many(keys)
+    for key in keys:
+        if key not in current:
+            cache.add(key, _initial_generation(), None)
+            current[key] = cache.get(key)
+    return [current[key] for key in keys]
+
+
+def bump(*models):
+    """Invalidate every fragment that renders rows of these models."""
+    for model in models:
+        key = _key(label(model))
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, _initial_generation(), None)
+
+
+def template_version(origin):
+    """
+    Identifies the template source and the deployed static assets, so a
+    changed template or new hashed static names never meet an old fragment.
+    """
+    try:
+        mtime = int(os.path.getmtime(origin.name))
+    except (AttributeError, TypeError, OSError):
+        mtime = 0
+    return f"{mtime}:{getattr(staticfiles_storage, 'manifest_hash', '')}"
+
+
+def fragment_key(name, labels, vary_on=(), version=""):
+    return make_template_fragment_key(name, [*vary_on, *generations(labels), version])
+
+
+def timeout():
+    return getattr(settings, "FRAGMENT_CACHE_TIMEOUT", 60 * 60 * 24)
@@ -0,0 +1,120 @@
+# main/home_cache.py
+"""
+Per-section cache for the homepage context.
+
+Each section is built by one function and stored under its own key, so an
+admin edit to (say) a SiteStat only rebuilds the stats section. Keys are
+dropped by the signal handlers in `main.signals`; the timeout is only a
+safety net for per-process cache backends. Sections are rebuilt from the
+primary database, since every visitor is served what is cached.
+"""
+from django.conf import settings
+from django.core.cache import cache
+
+from DravTech.routers import primary_reads
+
+from services.models import CaseStudy, Service
+from .models import Product, SiteStat
+from .portfolio import active_projects, group_projects_by_service
+
+KEY_PREFIX = "home:"
+
+
+def _products_section():
+    active = Product.objects.filter(is_active=True)
+    return {
+        'featured_products': list(
+            active.filter(is_featured=True).order_by('display_order', '-published_at', 'title')
+        ),
+        'digital_products': list(
+            active.filter(product_type=Product.TYPE_DIGITAL).order_by('display_order', 'title')
+        ),
+        'merch_products': list(
+            active.filter(product_type=Product.TYPE_MERCH).order_by('display_order', 'title')
+        ),
+        'artwork_products': list(
+            active.filter(product_type=Product.TYPE_ARTWORK).order_by('display_order', 'title')
+        ),
+    }
+
+
+def _stats_section():
+    return {'stats': list(SiteStat.objects.filter(is_active=True))}
+
+
+def _services_section():
+    services = list(Service.objects.filter(is_active=True).order_by('display_order', 'title'))
+    return {
+        'categories': services,
+        'featured_services': [service for service in services if service.is_featured],
+    }
+
+
+def _case_studies_section():
+    featured_case_studies = list(
+        CaseStudy.objects.filter(is_active=True, is_featured=True)
+        .select_related('service__category')
+        .order_by('display_order', 'title')[:3]
+    )
+    # Split comma-separated results into lists for the template
+    for case_study in featured_case_studies:
+        if case_study.results:
+            case_study.results_list = [result.strip() for result in case_study.results.split(',')]
+        else:
+            case_study.results_list = []
+    return {'featured_case_studies': featured_case_studies}
+
+
+def _portfolio_section():
+    projects = list(active_projects())
+    return {
+        'projects': projects,
+        'projects_by_category': group_projects_by_service(projects),
+    }
+
+
+SECTIONS = {
+    'products': _products_section,
+    'stats': _stats_section,
+    'services': _services_section,
+    'case_studies': _case_studies_section,
+    'portfolio': _portfolio_section,
+}
+
+
+def _key(section):
+    return f"{KEY_PREFIX}{section}"
+
+
+def get_home_context():
+    """
+    Return the cached homepage context, rebuilding only the missing sections.
+
+    Costs a single cache round trip (and zero queries) when every section
+    is warm.
+    """
+    cached = cache.get_many([_key(section) for section in SECTIONS])
+
+    missing = {}
+    context = {}
+    for section, build in SECTIONS.items():
+        data = cached.get(_key(section))
+        if data is None:
+            with primary_reads():
+                data = build()
+            missing[_key(section)] = data
+        context.update(data)
+
+    if missing:
+        cache.set_many(missing, getattr(settings, 'HOMEPAGE_CACHE_TIMEOUT', None))
+
+    context['all_products'] = (
+        context['digital_products'] + context['merch_products'] + context['artwork_products']
+    )
+    context['contact_stats'] = context['stats'][:3]
+    return context
+
+
+def invalidate(*sections):
+    """Drop the given homepage sections from the cache."""
+    cache.delete_many([_key(section) for section in sections])
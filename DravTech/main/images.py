@@ -0,0 +1,136 @@
+# main/images.py
+"""
+Responsive image derivatives.
+
+For every uploaded image we store resized WebP and JPEG copies at a fixed
+set of widths under `derivatives/` in the field's storage, e.g.
+
+    products/ERP.jpg  →  derivatives/products/ERP-480w.webp
+                         derivatives/products/ERP-480w.jpg   (…one pair per width)
+
+Widths wider than the source are skipped, so small uploads are never
+upscaled. `render_variants` is plain Pillow with no Django access, which
+lets the backfill command run it in a process pool. Which widths exist for
+an image is remembered in the cache so templates never stat the disk.
+Derivatives may be built in another worker, and per-process caches never
+hear about it. So "none yet" is only remembered for MISSING_TIMEOUT, and
+known widths for WIDTHS_TIMEOUT.
+"""
+import io
+import posixpath
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+
+DERIVATIVE_DIR = "derivatives"
+DEFAULT_WIDTHS = (320, 480, 768, 1200)
+FORMATS = {
+    "webp": ("WEBP", "image/webp"),
+    "jpg":  ("JPEG", "image/jpeg"),
+}
+
+_CACHE_KEY      = "images:widths:{name}"
+WIDTHS_TIMEOUT  = 60 * 60 * 24
+MISSING_TIMEOUT = 60
+
+
+def widths():
+    return tuple(sorted(getattr(settings, "IMAGE_DERIVATIVE_WIDTHS", DEFAULT_WIDTHS)))
+
+
+def derivative_name(name, width, ext):
+    stem, _ = posixpath.splitext(name)
+    return posixpath.join(DERIVATIVE_DIR, f"{stem}-{width}w.{ext}")
+
+
+def render_variants(data, target_widths, quality=80):
+    """
+    Resize image bytes to each target width narrower than the source.
+    Returns [(width, ext, bytes), ...]. Pure Pillow; safe in a subprocess.
+    """
+    from PIL import Image, ImageOps
+
+    with Image.open(io.BytesIO(data)) as source:
+        source = ImageOps.exif_transpose(source)
+        if source.mode not in ("RGB", "RGBA"):
+            source = source.convert("RGBA" if "A" in source.getbands() else "RGB")
+
+        variants = []
+        for width in target_widths:
+            if width >= source.width:
+                continue
+            height  = round(source.height * width / source.width)
+            resized = source.resize((width, height), Image.LANCZOS)
+            for ext, (fmt, _) in FORMATS.items():
+                image = resized.convert("RGB") if fmt == "JPEG" else resized
+                buffer = io.BytesIO()
+                image.save(buffer, fmt, quality=quality, optimize=True)
+                variants.append((width, ext, buffer.getvalue()))
+        return variants
+
+
+def render_lite(data, max_width=640, quality=40):
+    """
+    A small progressive JPEG of image bytes, for Save-Data clients (see
+    main.media). Pure Pillow, like render_variants.
+    """
+    from PIL import Image, ImageOps
+
+    with Image.open(io.BytesIO(data)) as source:
+        image = ImageOps.exif_transpose(source).convert("RGB")
+        if image.width > max_width:
+            image = image.resize((max_width, round(image.height * max_width / image.width)), Image.LANCZOS)
+        buffer = io.BytesIO()
+        image.save(buffer, "JPEG", quality=quality, optimize=True, progressive=True)
+        return buffer.getvalue()
+
+
+def store_variants(storage, name, variants):
+    """Write rendered variants next to each other and remember their widths."""
+    produced = set()
+    for width, ext, data in variants:
+        target = derivative_name(name, width, ext)
+        if storage.exists(target):
+            storage.delete(target)
+        storage.save(target, ContentFile(data))
+        produced.add(width)
+    cache.set(_CACHE_KEY.format(name=name), sorted(produced), WIDTHS_TIMEOUT)
+    return sorted(produced)
+
+
+def generate_derivatives(fieldfile):
+    """Build all derivatives for an ImageField value in-process."""
+    if not fieldfile:
+        return []
+    storage = fieldfile.storage
+    with storage.open(fieldfile.name, "rb") as source:
+        data = source.read()
+    quality = getattr(settings, "IMAGE_DERIVATIVE_QUALITY", 80)
+    return store_variants(storage, fieldfile.name, render_variants(data, widths(), quality))
+
+
+def available_widths(fieldfile):
+    """Widths that have derivatives for this image (cached, stat on miss)."""
+    if not fieldfile:
+        return []
+    key   = _CACHE_KEY.format(name=fieldfile.name)
+    found = cache.get(key)
+    if found is None:
+        storage = fieldfile.storage
+        found = [
+            width for width in widths()
+            if storage.exists(derivative_name(fieldfile.name, width, "jpg"))
+        ]
+        cache.set(key, found, WIDTHS_TIMEOUT if found else MISSING_TIMEOUT)
+    return found
+
+
+def delete_derivatives(storage, name):
+    """Remove every derivative of `name` (used when its blob is deleted)."""
+    for width in widths():
+        for ext in FORMATS:
+            target = derivative_name(name, width, ext)
+            if storage.exists(target):
+                storage.delete(target)
+    cache.delete(_CACHE_KEY.format(name=name))
@@ -0,0 +1,165 @@
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from main.models import Category, ContactMessage, PricingPlan, Product, Project
+from marketplace.models import Order
+from services.models import CaseStudy, Service
+
+INDEXED_MODELS = (Product, PricingPlan, Project, ContactMessage, Service, CaseStudy, Order)
+
+
+class Rollback(Exception):
+    pass
+
+
+def access_paths(sample):
+    """(label, queryset) for the listing queries the composite indexes serve."""
+    return [
+        ('products list',       Product.objects.filter(is_active=True)
+                                .order_by('display_order', '-published_at', 'title')),
+        ('catalog page',        Product.objects.filter(is_active=True)
+                                .order_by('display_order', 'title', 'id')[:25]),
+        ('products by type',    Product.objects.filter(is_active=True, product_type=Product.TYPE_DIGITAL)
+                                .order_by('display_order', 'title')),
+        ('featured products',   Product.objects.filter(is_active=True, is_featured=True)
+                                .order_by('display_order', 'title')[:6]),
+        ('pricing plans',       PricingPlan.objects.filter(product_id=sample['product'], is_active=True)
+                                .order_by('display_order', 'price')),
+        ('services list',       Service.objects.filter(is_active=True).order_by('display_order', 'title')),
+        ('featured services',   Service.objects.filter(is_active=True, is_featured=True)
+                                .order_by('display_order')[:6]),
+        ('related services',    Service.objects.filter(is_active=True, category_id=sample['category'])
+                                .order_by('display_order', 'title')[:3]),
+        ('featured projects',   Project.objects.filter(is_active=True, is_featured=True)
+                                .order_by('display_order', '-published_at', 'title')),
+        ('featured cases',      CaseStudy.objects.filter(is_active=True, is_featured=True)
+                                .order_by('display_order', 'title')[:3]),
+        ('customer orders',     Order.objects.filter(customer_id=sample['customer'])
+                                .order_by('-created_at')),
+        ('contact history',     ContactMessage.objects.filter(email=sample['email'])
+                                .order_by('-submitted_at')),
+    ]
+
+
+class Command(BaseCommand):
+    help = ('Show query plans and timings for the catalog listing queries with and '
+            'without their composite indexes. Runs in a transaction that is always '
+            'rolled back, so it is safe against a real database.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', type=int, default=0,
+                            help='Insert this many synthetic rows per model first (rolled back)')
+        parser.add_argument('--repeat', type=int, default=50,
+                            help='Executions per query when timing')
+
+    def handle(self, *args, **options):
+        if not connection.features.can_rollback_ddl:
+            raise CommandError(f'{connection.vendor} cannot roll back DROP INDEX; '
+                               'run this against a copy of the database.')
+        try:
+            with transaction.atomic():
+                if options['seed']:
+                    self._seed(options['seed'])
+                sample = self._sample()
+                after  = self._measure(sample, options['repeat'], 'after')
+                self._drop_indexes()
+                before = self._measure(sample, options['repeat'], 'before')
+                raise Rollback
+        except Rollback:
+            pass
+
+        for label, (plan_after, ms_after) in after.items():
+            plan_before, ms_before = before[label]
+            self.stdout.write(self.style.MIGRATE_HEADING(f'{label}'))
+            self.stdout.write(f'  before  {ms_before:8.3f} ms   {plan_before}')
+            self.stdout.write(f'  after   {ms_after:8.3f} ms   {plan_after}')
+
+    # ── Steps ─────────────────────────────────
+
+    def _explain(self, qs, phase):
+        # The phase comment keeps the SQL text distinct: sqlite3 caches
+        # prepared statements by text, and a cached EXPLAIN is not replanned
+        # after the indexes are dropped.
+        sql, params = qs.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f'{connection.ops.explain_query_prefix()} {sql} /* {phase} */', params)
+            return ' | '.join(' '.join(str(col) for col in row) for row in cursor.fetchall())
+
+    def _measure(self, sample, repeat, phase):
+        results = {}
+        for label, qs in access_paths(sample):
+            plan  = self._explain(qs, phase)
+            start = time.perf_counter()
+            for _ in range(repeat):
+                list(qs.all())
+            results[label] = (plan, (time.perf_counter() - start) * 1000 / max(repeat, 1))
+        return results
+
+    def _drop_indexes(self):
+        # Only the backend's DROP INDEX template is needed; entering the
+        # editor would refuse to run inside a transaction on SQLite.
+        editor = connection.schema_editor()
+        with connection.cursor() as cursor:
+            for model in INDEXED_MODELS:
+                for index in model._meta.indexes:
+                    cursor.execute(editor.sql_delete_index % {
+                        'table': editor.quote_name(model._meta.db_table),
+                        'name':  editor.quote_name(index.name),
+                    })
+
+    def _sample(self):
+        return {
+            'product':  Product.objects.values_list('pk', flat=True).first(),
+            'category': Service.objects.exclude(category=None)
+                        .values_list('category_id', flat=True).first(),
+            'customer': Order.objects.exclude(customer=None)
+                        .values_list('customer_id', flat=True).first(),
+            'email':    ContactMessage.objects.values_list('email', flat=True).first() or '',
+        }
+
+    def _seed(self, n):
+        now      = timezone.now()
+        tag      = int(time.time())
+        category = Category.objects.create(name=f'Benchmark {tag}', slug=f'benchmark-{tag}')
+        customer = User.objects.create_user(f'benchmark-{tag}')
+        types    = [Product.TYPE_DIGITAL, Product.TYPE_MERCH, Product.TYPE_ARTWORK]
+
+        products = Product.objects.bulk_create(
+            Product(title=f'Product {i}', slug=f'bench-{tag}-product-{i}', category=category,
+                    product_type=types[i % 3], is_active=i % 5 != 0, is_featured=i % 17 == 0,
+                    display_order=i % 50, published_at=now)
+            for i in range(n)
+        )
+        PricingPlan.objects.bulk_create(
+            PricingPlan(product=products[i % len(products)], name=f'Plan {i}', price=i,
+                        billing_type=PricingPlan.BILLING_MONTHLY, display_order=i % 3)
+            for i in range(n)
+        )
+        services = Service.objects.bulk_create(
+            Service(title=f'Service {i}', slug=f'bench-{tag}-service-{i}', overview='-',
+                    is_active=i % 5 != 0, is_featured=i % 17 == 0, display_order=i % 50)
+            for i in range(n)
+        )
+        CaseStudy.objects.bulk_create(
+            CaseStudy(service=services[i % len(services)], title=f'Case {i}',
+                      slug=f'bench-{tag}-case-{i}', summary='-', results='-',
+                      is_featured=i % 17 == 0, display_order=i % 50)
+            for i in range(n)
+        )
+        Project.objects.bulk_create(
+            Project(title=f'Project {i}', slug=f'bench-{tag}-project-{i}', summary='-',
+                    is_active=i % 5 != 0, is_featured=i % 17 == 0, display_order=i % 50,
+                    published_at=now)
+            for i in range(n)
+        )
+        Order.objects.bulk_create(Order(customer=customer if i % 10 == 0 else None)
+                                  for i in range(n))
+        ContactMessage.objects.bulk_create(
+            ContactMessage(name='Benchmark', email=f'visitor{i % 100}@example.com',
+                           subject='Benchmark', message='-')
+            for i in range(n)
+        )
@@ -0,0 +1,42 @@
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from main import bundles
+
+
+class Command(BaseCommand):
+    help = ('Write the per-family CSS/JS bundles and pruned critical CSS that '
+            'base.html loads. Run before collectstatic.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', default=None,
+                            help='Static directory to write assets/bundles/ into '
+                                 '(default: the first STATICFILES_DIRS entry)')
+        parser.add_argument('families', nargs='*', metavar='family',
+                            help=f'Families to build (default: all of {", ".join(bundles.FAMILIES)})')
+
+    def handle(self, *args, **options):
+        output = options['output'] or (settings.STATICFILES_DIRS[0] if settings.STATICFILES_DIRS else None)
+        if not output:
+            raise CommandError('No output directory: pass --output or set STATICFILES_DIRS.')
+        unknown = set(options['families']) - set(bundles.FAMILIES)
+        if unknown:
+            raise CommandError(f'Unknown families: {", ".join(sorted(unknown))}')
+
+        os.makedirs(os.path.join(output, bundles.BUNDLE_DIR), exist_ok=True)
+        for family in options['families'] or bundles.FAMILIES:
+            try:
+                css = bundles.build_css(family)
+                js  = bundles.build_js(family)
+            except FileNotFoundError as exc:
+                raise CommandError(str(exc))
+            critical = bundles.build_critical(family, css)
+            for suffix, content in (('css', css), ('js', js), ('critical.css', critical)):
+                with open(os.path.join(output, bundles.bundle_name(family, suffix)), 'w', encoding='utf-8') as f:
+                    f.write(content)
+            self.stdout.write(self.style.SUCCESS(
+                f'{family}: {len(css) // 1024} KB css, {len(js) // 1024} KB js, '
+                f'{len(critical) // 1024} KB critical (inlined)'
+            ))
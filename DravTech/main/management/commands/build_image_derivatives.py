@@ -0,0 +1,77 @@
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from main import images
+from main.signals import IMAGE_FIELDS
+
+
+def _render(name, source, widths, quality):
+    # Runs in a worker process: Pillow only, no ORM or storage access.
+    # `source` is a filesystem path when the storage has one, else bytes.
+    if isinstance(source, str):
+        with open(source, 'rb') as f:
+            source = f.read()
+    return name, images.render_variants(source, widths, quality)
+
+
+def _source_for(fieldfile):
+    try:
+        return fieldfile.storage.path(fieldfile.name)
+    except NotImplementedError:
+        with fieldfile.storage.open(fieldfile.name, 'rb') as f:
+            return f.read()
+
+
+class Command(BaseCommand):
+    help = 'Generate responsive WebP/JPEG derivatives for every stored image'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=None,
+                            help='Process pool size (default: CPU count)')
+        parser.add_argument('--force', action='store_true',
+                            help='Rebuild derivatives that already exist')
+
+    def handle(self, *args, **options):
+        pending = {}
+        for model, field_name in IMAGE_FIELDS.items():
+            rows = model.objects.exclude(**{field_name: ''}).exclude(**{f'{field_name}__isnull': True})
+            for instance in rows.iterator():
+                fieldfile = getattr(instance, field_name)
+                if fieldfile.name in pending:
+                    continue
+                if not options['force'] and images.available_widths(fieldfile):
+                    continue
+                if not fieldfile.storage.exists(fieldfile.name):
+                    self.stdout.write(self.style.WARNING(f'  missing: {fieldfile.name}'))
+                    continue
+                pending[fieldfile.name] = fieldfile
+
+        if not pending:
+            self.stdout.write(self.style.SUCCESS('All images already have derivatives.'))
+            return
+
+        widths  = images.widths()
+        quality = getattr(settings, 'IMAGE_DERIVATIVE_QUALITY', 80)
+        self.stdout.write(f'Building derivatives for {len(pending)} images at widths {widths}...')
+
+        done = failed = 0
+        with ProcessPoolExecutor(max_workers=options['workers']) as pool:
+            futures = [
+                pool.submit(_render, name, _source_for(fieldfile), widths, quality)
+                for name, fieldfile in pending.items()
+            ]
+
+            for future in as_completed(futures):
+                try:
+                    name, variants = future.result()
+                except Exception as e:
+                    failed += 1
+                    self.stdout.write(self.style.ERROR(f'  failed: {e}'))
+                    continue
+                produced = images.store_variants(pending[name].storage, name, variants)
+                done += 1
+                self.stdout.write(f'  {name}: {produced or "source narrower than smallest width"}')
+
+        self.stdout.write(self.style.SUCCESS(f'Done: {done} images processed, {failed} failed.'))
@@ -0,0 +1,39 @@
+import os
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.core.management.base import BaseCommand, CommandError
+
+from main import images, media
+
+
+class Command(BaseCommand):
+    help = ('Write the small <poster>.lite.jpg that {% lazy_video %} serves to '
+            'Save-Data clients. Run before collectstatic.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', default=None,
+                            help='Static directory to write into (default: the first STATICFILES_DIRS entry)')
+        parser.add_argument('--max-width', type=int, default=640)
+        parser.add_argument('--quality', type=int, default=40)
+
+    def handle(self, *args, **options):
+        output = options['output'] or (settings.STATICFILES_DIRS[0] if settings.STATICFILES_DIRS else None)
+        if not output:
+            raise CommandError('No output directory: pass --output or set STATICFILES_DIRS.')
+
+        written = 0
+        for poster in media.poster_paths():
+            source = finders.find(poster)
+            if not source:
+                self.stdout.write(self.style.WARNING(f'{poster}: not found, skipped'))
+                continue
+            with open(source, 'rb') as f:
+                data = images.render_lite(f.read(), options['max_width'], options['quality'])
+            target = os.path.join(output, media.lite_name(poster))
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            with open(target, 'wb') as f:
+                f.write(data)
+            written += 1
+            self.stdout.write(f'{media.lite_name(poster)}: {os.path.getsize(source) // 1024} KB → {len(data) // 1024} KB')
+        self.stdout.write(self.style.SUCCESS(f'Wrote {written} lite posters.'))
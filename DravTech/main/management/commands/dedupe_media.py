@@ -0,0 +1,80 @@
+from collections import Counter
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from main.models import MediaBlob
+from main.signals import MEDIA_FIELDS
+from main.storage import is_blob, media_storage
+
+
+class Command(BaseCommand):
+    help = 'Move legacy uploads into content-addressed blobs and rebuild blob reference counts'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Report what would change without writing anything')
+        parser.add_argument('--delete-originals', action='store_true',
+                            help='Remove legacy files once no row points at them')
+
+    def handle(self, *args, **options):
+        storage = media_storage()
+        dry_run = options['dry_run']
+        moved   = {}        # legacy name → blob name
+        saved   = 0
+
+        for model, fields in MEDIA_FIELDS.items():
+            for field_name in fields:
+                rows = (model.objects.exclude(**{field_name: ''})
+                        .exclude(**{f'{field_name}__isnull': True})
+                        .values_list('pk', field_name))
+                for pk, name in rows.iterator():
+                    if is_blob(name):
+                        continue
+                    if name not in moved:
+                        if not storage.exists(name):
+                            self.stdout.write(self.style.WARNING(f'  missing: {name}'))
+                            continue
+                        if dry_run:
+                            moved[name] = None
+                            continue
+                        with storage.open(name, 'rb') as f:
+                            blob = storage.save(name, f)
+                        if blob in moved.values():
+                            saved += storage.size(name)
+                        moved[name] = blob
+                        self.stdout.write(f'  {name} → {blob}')
+                    if not dry_run and moved[name]:
+                        # .update() skips signals; counts are rebuilt below.
+                        model.objects.filter(pk=pk).update(**{field_name: moved[name]})
+
+        if dry_run:
+            self.stdout.write(f'{len(moved)} files would be moved into blob storage.')
+            return
+
+        counts = Counter()
+        for model, fields in MEDIA_FIELDS.items():
+            for field_name in fields:
+                counts.update(
+                    name for name in model.objects.values_list(field_name, flat=True)
+                    if is_blob(name)
+                )
+
+        with transaction.atomic():
+            MediaBlob.objects.exclude(name__in=counts).update(ref_count=0)
+            for name, refs in counts.items():
+                MediaBlob.objects.update_or_create(
+                    name=name,
+                    defaults={'ref_count': refs,
+                              'size': storage.size(name) if storage.exists(name) else 0},
+                )
+
+        if options['delete_originals']:
+            for name in moved:
+                if storage.exists(name):
+                    storage.delete(name)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Done: {len(moved)} files moved into {len(counts)} blobs, '
+            f'{saved:,} duplicate bytes reclaimable.'
+        ))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from main import related
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the precomputed related-products table for the whole catalog'
+
+    def handle(self, *args, **options):
+        written = related.rebuild()
+        self.stdout.write(self.style.SUCCESS(f'Related products: {written} links written.'))
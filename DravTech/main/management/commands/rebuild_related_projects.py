@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from main import similarity
+
+
+class Command(BaseCommand):
+    help = 'Rescore every project pair and rewrite the related-projects table'
+
+    def handle(self, *args, **options):
+        indexed = similarity.rebuild()
+        self.stdout.write(self.style.SUCCESS(f'Related projects rebuilt for {indexed} projects.'))
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from main.models import Product
+
+
+class Command(BaseCommand):
+    help = 'Rebuild Product.min_plan_price, active_plan_count and from_price from the pricing plans'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500,
+                            help='Products per UPDATE statement')
+
+    def handle(self, *args, **options):
+        size    = max(options['batch_size'], 1)
+        ids     = list(Product.objects.order_by('pk').values_list('pk', flat=True))
+        updated = 0
+        for start in range(0, len(ids), size):
+            updated += Product.recompute_price_summaries(ids[start:start + size])
+
+        self.stdout.write(self.style.SUCCESS(f'Recomputed price summaries for {updated} products.'))
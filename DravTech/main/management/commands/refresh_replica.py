@@ -0,0 +1,30 @@
+import sqlite3
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from DravTech.routers import REPLICA, has_replica
+
+
+class Command(BaseCommand):
+    help = 'Copy the primary SQLite database into the local replica file (DB_REPLICA_NAME)'
+
+    def handle(self, *args, **options):
+        if not has_replica():
+            raise CommandError('No "replica" database configured; set DB_REPLICA_NAME.')
+        primary, replica = connections[DEFAULT_DB_ALIAS], connections[REPLICA]
+        if primary.vendor != 'sqlite' or replica.vendor != 'sqlite':
+            raise CommandError('Only SQLite files can be copied; use real replication otherwise.')
+
+        replica.close()
+        primary.ensure_connection()
+        target = sqlite3.connect(replica.settings_dict['NAME'])
+        try:
+            # Online backup: consistent snapshot, readers of the primary keep going.
+            primary.connection.backup(target)
+        finally:
+            target.close()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Replica refreshed: {replica.settings_dict['NAME']}"
+        ))
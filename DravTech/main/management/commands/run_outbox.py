@@ -0,0 +1,37 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from main import outbox
+
+
+class Command(BaseCommand):
+    help = 'Send queued outbox emails in batches, retrying failures with backoff'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true',
+                            help='Drain everything that is due, then exit (for cron)')
+        parser.add_argument('--batch-size', type=int, default=None,
+                            help='Emails per SMTP connection (default: OUTBOX_BATCH_SIZE)')
+        parser.add_argument('--interval', type=float, default=5.0,
+                            help='Seconds to sleep when the outbox is empty')
+
+    def handle(self, *args, **options):
+        total_sent = total_failed = 0
+        try:
+            while True:
+                sent, failed = outbox.send_batch(options['batch_size'])
+                total_sent   += sent
+                total_failed += failed
+                if sent or failed:
+                    self.stdout.write(f'  batch: {sent} sent, {failed} failed')
+                    continue
+                if options['once']:
+                    break
+                time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            pass
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Outbox: {total_sent} sent, {total_failed} failed.'
+        ))
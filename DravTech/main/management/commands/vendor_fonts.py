@@ -0,0 +1,90 @@
+import json
+import os
+from urllib.error import URLError
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from main import fonts
+
+
+class Command(BaseCommand):
+    help = ('Download only the web font faces the site CSS uses, subset them, and write '
+            '@font-face rules (font-display: swap) plus preload hints for base.html.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', default=None,
+                            help='Static directory to write assets/vendor/fonts/ into '
+                                 '(default: the first STATICFILES_DIRS entry)')
+        parser.add_argument('--subsets', default='latin',
+                            help='Comma-separated unicode subsets to keep, in preload priority order')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Only list the faces and the Google Fonts request')
+
+    def handle(self, *args, **options):
+        output = options['output'] or (settings.STATICFILES_DIRS[0] if settings.STATICFILES_DIRS else None)
+        if not output:
+            raise CommandError('No output directory: pass --output or set STATICFILES_DIRS.')
+        subsets = [s.strip() for s in options['subsets'].split(',') if s.strip()]
+
+        faces   = fonts.used_faces()
+        preload = fonts.preloads(faces)
+        url     = fonts.google_url(faces)
+        for family, counter in faces.items():
+            listed = ', '.join(f'{weight}{" italic" if style == "italic" else ""}'
+                               for weight, style in sorted(counter))
+            self.stdout.write(f'{family}: {listed}')
+        if options['dry_run']:
+            self.stdout.write(url)
+            return
+
+        try:
+            remote = fonts.parse_google_css(fonts.fetch(url).decode())
+        except (URLError, OSError) as exc:
+            raise CommandError(f'Could not fetch {url}: {exc}')
+        remote = sorted((face for face in remote if face['subset'] in subsets),
+                        key=lambda face: subsets.index(face['subset']))
+        if not remote:
+            raise CommandError(f'Google Fonts returned no faces for subsets: {", ".join(subsets)}')
+
+        directory = os.path.join(output, fonts.FONT_DIR)
+        os.makedirs(directory, exist_ok=True)
+        text, written, preloaded, total = fonts.site_text(), [], set(), 0
+        for face in remote:
+            try:
+                data = fonts.fetch(face['url'])
+            except (URLError, OSError) as exc:
+                raise CommandError(f'Could not fetch {face["url"]}: {exc}')
+            data, unicode_range = fonts.subset(data, face, text)
+            name = fonts.face_filename(face)
+            with open(os.path.join(directory, name), 'wb') as f:
+                f.write(data)
+            total += len(data)
+
+            key = (face['family'], face['weight'], face['style'])
+            written.append({
+                'family':        face['family'],
+                'weight':        face['weight'],
+                'style':         face['style'],
+                'subset':        face['subset'],
+                'file':          name,
+                'unicode_range': unicode_range,
+                'preload':       key in preload and key not in preloaded,
+            })
+            if key in preload:
+                preloaded.add(key)
+
+        stale = {f for f in os.listdir(directory) if f.endswith('.woff2')} - {face['file'] for face in written}
+        for name in stale:
+            os.remove(os.path.join(directory, name))
+        with open(os.path.join(directory, 'fonts.css'), 'w', encoding='utf-8') as f:
+            f.write(fonts.font_face_css(written))
+        with open(os.path.join(directory, 'fonts.json'), 'w', encoding='utf-8') as f:
+            json.dump({'faces': written}, f, indent=2)
+
+        if fonts.font_subset is None:
+            self.stdout.write(self.style.WARNING(
+                'fontTools/brotli not installed: kept Google\'s unicode subsets without glyph subsetting.'))
+        self.stdout.write(self.style.SUCCESS(
+            f'Vendored {len(written)} font files ({total // 1024} KB), '
+            f'{sum(face["preload"] for face in written)} preloaded, into {directory}'))
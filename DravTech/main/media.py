@@ -0,0 +1,64 @@
+# main/media.py
+"""
+Below-the-fold media.
+
+`{% lazy_img %}` writes <img> tags with loading="lazy" and
+decoding="async"; pass eager=True for above-the-fold images such as the
+header logo. `{% lazy_video %}` writes a <video> with preload="none" and
+its poster and sources held in data- attributes. assets/js/media.js
+starts the video once it nears the viewport and pauses it again when it
+scrolls away, so the footer background video is never fetched on pages
+nobody scrolls to the bottom of.
+
+For clients that send `Save-Data: on`, {% lazy_video %} renders only a
+lazy poster <img>, using the small `<poster>.lite.jpg` written by
+`manage.py build_lite_posters` when it exists. `SaveDataMiddleware` adds
+`Vary: Save-Data` to HTML responses so caches keep the two versions
+apart.
+"""
+import os
+import posixpath
+import re
+
+from django.template.utils import get_app_template_dirs
+from django.utils.cache import patch_vary_headers
+
+LITE_SUFFIX = ".lite.jpg"
+
+_POSTER = re.compile(r"""\{%\s*lazy_video\b[^%]*?\bposter=["']([^"']+)["']""")
+
+
+def save_data(request):
+    return request is not None and request.headers.get("Save-Data", "").strip().lower() == "on"
+
+
+def lite_name(path):
+    stem, _ = posixpath.splitext(path)
+    return f"{stem}{LITE_SUFFIX}"
+
+
+def poster_paths():
+    """Static poster paths named by {% lazy_video %} in any template."""
+    from django.template import engines
+
+    dirs = [d for engine in engines.all() for d in getattr(engine, "dirs", [])]
+    found = set()
+    for directory in [*dirs, *get_app_template_dirs("templates")]:
+        for root, _, files in os.walk(directory):
+            for name in files:
+                if name.endswith(".html"):
+                    with open(os.path.join(root, name), encoding="utf-8", errors="ignore") as f:
+                        found.update(_POSTER.findall(f.read()))
+    return sorted(found)
+
+
+class SaveDataMiddleware:
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if response.get("Content-Type", "").startswith("text/html"):
+            patch_vary_headers(response, ("Save-Data",))
+        return response
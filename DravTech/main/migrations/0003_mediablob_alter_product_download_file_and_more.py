@@ -0,0 +1,47 @@
+# Generated by Django 4.2.23 on 2026-10-16 22:35
+
+import main.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0002_aboutpage_final_cta_headline_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MediaBlob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255, unique=True)),
+                ('size', models.PositiveBigIntegerField(default=0)),
+                ('ref_count', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['name'],
+            },
+        ),
+        migrations.AlterField(
+            model_name='product',
+            name='download_file',
+            field=models.FileField(blank=True, help_text='Actual file delivered to buyer after purchase.', null=True, storage=main.storage.media_storage, upload_to='downloads/'),
+        ),
+        migrations.AlterField(
+            model_name='product',
+            name='image',
+            field=models.ImageField(blank=True, null=True, storage=main.storage.media_storage, upload_to='products/'),
+        ),
+        migrations.AlterField(
+            model_name='project',
+            name='image',
+            field=models.ImageField(blank=True, null=True, storage=main.storage.media_storage, upload_to='projects/'),
+        ),
+        migrations.AlterField(
+            model_name='teammember',
+            name='photo',
+            field=models.ImageField(blank=True, null=True, storage=main.storage.media_storage, upload_to='team/'),
+        ),
+    ]
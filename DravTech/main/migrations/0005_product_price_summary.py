@@ -0,0 +1,39 @@
+# Generated by Django 4.2.23 on 2026-10-16 22:51
+
+from django.db import migrations, models
+from django.db.models import Count, Min, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def fill_price_summaries(apps, schema_editor):
+    Product     = apps.get_model('main', 'Product')
+    PricingPlan = apps.get_model('main', 'PricingPlan')
+    plans = (PricingPlan.objects
+             .filter(product=OuterRef('pk'), is_active=True)
+             .order_by()
+             .values('product'))
+    Product.objects.update(
+        min_plan_price=Subquery(plans.annotate(m=Min('price')).values('m')),
+        active_plan_count=Coalesce(Subquery(plans.annotate(n=Count('pk')).values('n')), 0),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0004_outboxemail'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='active_plan_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='min_plan_price',
+            field=models.DecimalField(blank=True, db_index=True, decimal_places=2, editable=False, help_text='Cheapest active pricing plan.', max_digits=10, null=True),
+        ),
+        migrations.RunPython(fill_price_summaries, migrations.RunPython.noop),
+    ]
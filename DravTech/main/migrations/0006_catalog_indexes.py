@@ -0,0 +1,46 @@
+# Generated by Django 4.2.23 on 2026-10-16 22:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0005_product_price_summary'),
+        ('services', '0006_catalog_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='contactmessage',
+            index=models.Index(fields=['email', '-submitted_at'], name='contactmessage_email_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='pricingplan',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['product', 'display_order', 'price'], name='pricingplan_product_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['display_order', '-published_at', 'title'], name='product_active_order_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['display_order', 'title', 'id'], name='product_catalog_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['product_type', 'display_order', 'title', 'id'], name='product_type_order_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('is_active', True), ('is_featured', True)), fields=['display_order', 'title'], name='product_featured_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['display_order', '-published_at', 'title'], name='project_active_order_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(condition=models.Q(('is_active', True), ('is_featured', True)), fields=['display_order', '-published_at', 'title'], name='project_featured_idx'),
+        ),
+    ]
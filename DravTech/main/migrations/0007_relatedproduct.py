@@ -0,0 +1,28 @@
+# Generated by Django 4.2.23 on 2026-10-16 23:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0006_catalog_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RelatedProduct',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField(default=0)),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='neighbours', to='main.product')),
+                ('related', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='main.product')),
+            ],
+            options={
+                'ordering': ['product', '-score'],
+                'indexes': [models.Index(fields=['product', '-score'], name='relatedproduct_rank_idx')],
+                'constraints': [models.UniqueConstraint(fields=('product', 'related'), name='relatedproduct_unique_pair')],
+            },
+        ),
+    ]
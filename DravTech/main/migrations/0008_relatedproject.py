@@ -0,0 +1,28 @@
+# Generated by Django 4.2.23 on 2026-10-16 23:01
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0007_relatedproduct'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RelatedProject',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField(default=0)),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='similar', to='main.project')),
+                ('related', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='main.project')),
+            ],
+            options={
+                'ordering': ['project', '-score'],
+                'indexes': [models.Index(fields=['project', '-score'], name='relatedproject_rank_idx')],
+                'constraints': [models.UniqueConstraint(fields=('project', 'related'), name='relatedproject_unique_pair')],
+            },
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:31
+
+from django.db import migrations, models
+from django.db.models import Case, F, Min, OuterRef, Subquery, When
+
+
+def fill_from_price(apps, schema_editor):
+    Product     = apps.get_model('main', 'Product')
+    PricingPlan = apps.get_model('main', 'PricingPlan')
+    plans = (PricingPlan.objects
+             .filter(product=OuterRef('pk'), is_active=True)
+             .order_by()
+             .values('product'))
+    Product.objects.update(
+        from_price=Case(
+            When(product_type='digital', then=Subquery(plans.annotate(m=Min('price')).values('m'))),
+            default=F('price'),
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0008_relatedproject'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='from_price',
+            field=models.DecimalField(blank=True, decimal_places=2, editable=False, help_text='Listing price: cheapest plan for digital products, else price.', max_digits=10, null=True),
+        ),
+        migrations.AlterField(
+            model_name='product',
+            name='min_plan_price',
+            field=models.DecimalField(blank=True, decimal_places=2, editable=False, help_text='Cheapest active pricing plan.', max_digits=10, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['from_price', 'id'], name='product_from_price_idx'),
+        ),
+        migrations.RunPython(fill_from_price, migrations.RunPython.noop),
+    ]
@@ -1,7 +1,11 @@
 from django.db import models
+from django.db.models import Case, Count, F, Min, OuterRef, Q, Subquery, When
+from django.db.models.functions import Coalesce
 from django.utils.text import slugify
 from services.models import Service
 
+from .storage import media_storage
+
 
 # ─────────────────────────────────────────────
 #  CATALOGUE
@@ -76,9 +80,11 @@ class Product(models.Model):
                     help_text='e.g. "Oil on canvas" or "Digital illustration"')
 
     # ── Media ─────────────────────────────────
-    image         = models.ImageField(upload_to="products/", blank=True, null=True)
+    image         = models.ImageField(upload_to="products/", storage=media_storage,
+                        blank=True, null=True)
     # FIX: download_file is the correct field for artwork downloads (not image)
-    download_file = models.FileField(upload_to="downloads/", blank=True, null=True,
+    download_file = models.FileField(upload_to="downloads/", storage=media_storage,
+                        blank=True, null=True,
                         help_text="Actual file delivered to buyer after purchase.")
 
     # ── Pricing ───────────────────────────────
@@ -86,6 +92,19 @@ class Product(models.Model):
     # Digital products use PricingPlan instead.
     price = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
 
+    # Summary of the active PricingPlans, maintained by main.signals so
+    # listings can show, sort and filter by "from" price without a join.
+    # from_price is the one sortable price: min_plan_price for digital
+    # products, price for everything else. Ordinary saves never write these
+    # columns (see save()). Rebuild with `manage.py recompute_price_summaries`.
+    min_plan_price    = models.DecimalField(max_digits=10, decimal_places=2,
+                            null=True, blank=True, editable=False,
+                            help_text="Cheapest active pricing plan.")
+    active_plan_count = models.PositiveIntegerField(default=0, editable=False)
+    from_price        = models.DecimalField(max_digits=10, decimal_places=2,
+                            null=True, blank=True, editable=False,
+                            help_text="Listing price: cheapest plan for digital products, else price.")
+
     # ── Delivery flags ────────────────────────
     is_physical     = models.BooleanField(default=False,
                           help_text="Requires a shipping address at checkout.")
@@ -107,6 +126,22 @@ class Product(models.Model):
 
     class Meta:
         ordering = ["display_order", "-published_at", "title"]
+        # Listing access paths. Django emits filter(is_active=True) as a bare
+        # `WHERE is_active`, which SQLite only matches against a partial
+        # index condition, so visibility is the condition and the sort the key.
+        indexes  = [
+            models.Index(fields=["display_order", "-published_at", "title"],
+                         condition=Q(is_active=True), name="product_active_order_idx"),
+            models.Index(fields=["display_order", "title", "id"],
+                         condition=Q(is_active=True), name="product_catalog_idx"),
+            models.Index(fields=["product_type", "display_order", "title", "id"],
+                         condition=Q(is_active=True), name="product_type_order_idx"),
+            models.Index(fields=["display_order", "title"],
+                         condition=Q(is_active=True, is_featured=True),
+                         name="product_featured_idx"),
+            models.Index(fields=["from_price", "id"],
+                         condition=Q(is_active=True), name="product_from_price_idx"),
+        ]
 
     # ── Helpers ───────────────────────────────
 
@@ -129,10 +164,44 @@ class Product(models.Model):
             return f"KES {self.price:,.2f}"
         return "Contact us"
 
+    SUMMARY_FIELDS = ("min_plan_price", "active_plan_count", "from_price")
+
     def save(self, *args, **kwargs):
         if not self.slug:
             self.slug = slugify(self.title)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is None and not self._state.adding:
+            # The summaries loaded with this instance may be stale by now;
+            # only recompute_price_summaries writes them.
+            kwargs["update_fields"] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.SUMMARY_FIELDS
+            ]
         super().save(*args, **kwargs)
+        if update_fields is None or {"price", "product_type"} & set(update_fields):
+            type(self).recompute_price_summaries([self.pk])
+            self.__dict__.update(
+                type(self).objects.filter(pk=self.pk).values(*self.SUMMARY_FIELDS).get()
+            )
+
+    @classmethod
+    def recompute_price_summaries(cls, product_ids=None):
+        """
+        Rewrite min_plan_price / active_plan_count / from_price from
+        PricingPlan in a single UPDATE. Returns the number of products touched.
+        """
+        plans = (PricingPlan.objects
+                 .filter(product=OuterRef("pk"), is_active=True)
+                 .order_by()
+                 .values("product"))
+        min_plan_price = Subquery(plans.annotate(m=Min("price")).values("m"))
+        products = cls.objects.all() if product_ids is None else cls.objects.filter(pk__in=product_ids)
+        return products.update(
+            min_plan_price    = min_plan_price,
+            active_plan_count = Coalesce(Subquery(plans.annotate(n=Count("pk")).values("n")), 0),
+            from_price        = Case(When(product_type=cls.TYPE_DIGITAL, then=min_plan_price),
+                                     default=F("price")),
+        )
 
     def get_absolute_url(self):
         from django.urls import reverse
@@ -169,11 +238,38 @@ class PricingPlan(models.Model):
 
     class Meta:
         ordering = ["display_order"]
+        indexes  = [
+            models.Index(fields=["product", "display_order", "price"],
+                         condition=Q(is_active=True), name="pricingplan_product_idx"),
+        ]
 
     def __str__(self):
         return f"{self.product.title} — {self.name}"
 
 
+class RelatedProduct(models.Model):
+    """
+    One precomputed neighbour of a product, scored by main.related.
+    Detail pages sample a few of a product's top rows instead of sorting
+    the catalog randomly.
+    """
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name="neighbours")
+    related = models.ForeignKey(Product, on_delete=models.CASCADE, related_name="+")
+    score   = models.FloatField(default=0)
+
+    class Meta:
+        ordering    = ["product", "-score"]
+        constraints = [
+            models.UniqueConstraint(fields=["product", "related"], name="relatedproduct_unique_pair"),
+        ]
+        indexes     = [
+            models.Index(fields=["product", "-score"], name="relatedproduct_rank_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.product_id} → {self.related_id} ({self.score:.2f})"
+
+
 # ─────────────────────────────────────────────
 #  CONTACT
 # ─────────────────────────────────────────────
@@ -215,6 +311,9 @@ class ContactMessage(models.Model):
 
     class Meta:
         ordering      = ["-submitted_at"]
+        indexes       = [
+            models.Index(fields=["email", "-submitted_at"], name="contactmessage_email_idx"),
+        ]
         verbose_name  = "Contact Message"
         verbose_name_plural = "Contact Messages"
 
@@ -308,7 +407,8 @@ class TeamMember(models.Model):
     name          = models.CharField(max_length=150)
     role          = models.CharField(max_length=150)
     bio           = models.TextField(blank=True)
-    photo         = models.ImageField(upload_to="team/", blank=True, null=True)
+    photo         = models.ImageField(upload_to="team/", storage=media_storage,
+                        blank=True, null=True)
     linkedin      = models.URLField(blank=True)
     github        = models.URLField(blank=True)
     twitter       = models.URLField(blank=True)
@@ -330,7 +430,8 @@ class Project(models.Model):
     summary          = models.TextField()
     description      = models.TextField(blank=True)
     related_services = models.ManyToManyField(Service, blank=True, related_name="projects")
-    image            = models.ImageField(upload_to="projects/", blank=True, null=True)
+    image            = models.ImageField(upload_to="projects/", storage=media_storage,
+                           blank=True, null=True)
     link             = models.URLField(blank=True)
     is_active        = models.BooleanField(default=True)
     is_featured      = models.BooleanField(default=False)
@@ -341,6 +442,13 @@ class Project(models.Model):
 
     class Meta:
         ordering = ["display_order", "-published_at", "title"]
+        indexes  = [
+            models.Index(fields=["display_order", "-published_at", "title"],
+                         condition=Q(is_active=True), name="project_active_order_idx"),
+            models.Index(fields=["display_order", "-published_at", "title"],
+                         condition=Q(is_active=True, is_featured=True),
+                         name="project_featured_idx"),
+        ]
 
     def save(self, *args, **kwargs):
         if not self.slug:
@@ -351,6 +459,28 @@ class Project(models.Model):
         return self.title
 
 
+class RelatedProject(models.Model):
+    """
+    One of a project's top-N most similar projects, scored by
+    main.similarity. Project detail pages read these in rank order.
+    """
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name="similar")
+    related = models.ForeignKey(Project, on_delete=models.CASCADE, related_name="+")
+    score   = models.FloatField(default=0)
+
+    class Meta:
+        ordering    = ["project", "-score"]
+        constraints = [
+            models.UniqueConstraint(fields=["project", "related"], name="relatedproject_unique_pair"),
+        ]
+        indexes     = [
+            models.Index(fields=["project", "-score"], name="relatedproject_rank_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.project_id} → {self.related_id} ({self.score:.2f})"
+
+
 class Testimonial(models.Model):
     quote         = models.TextField()
     author_name   = models.CharField(max_length=150, blank=True)
@@ -401,3 +531,75 @@ class SiteStat(models.Model):
 
     def __str__(self):
         return f"{self.value} — {self.label}"
+
+
+# ─────────────────────────────────────────────
+#  MEDIA BLOBS
+# ─────────────────────────────────────────────
+
+class MediaBlob(models.Model):
+    """
+    Reference count for one content-addressed file (see main.storage).
+    Maintained by main.signals; rebuilt by `manage.py dedupe_media`.
+    """
+    name       = models.CharField(max_length=255, unique=True)
+    size       = models.PositiveBigIntegerField(default=0)
+    ref_count  = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["name"]
+
+    def __str__(self):
+        return f"{self.name} ×{self.ref_count}"
+
+    @classmethod
+    def acquire(cls, name, size=0):
+        blob, created = cls.objects.get_or_create(
+            name=name, defaults={"size": size, "ref_count": 1}
+        )
+        if not created:
+            cls.objects.filter(pk=blob.pk).update(ref_count=F("ref_count") + 1)
+
+    @classmethod
+    def release(cls, name):
+        cls.objects.filter(name=name, ref_count__gt=0).update(ref_count=F("ref_count") - 1)
+
+
+# ─────────────────────────────────────────────
+#  EMAIL OUTBOX
+# ─────────────────────────────────────────────
+
+class OutboxEmail(models.Model):
+    """
+    An email waiting to be sent by `manage.py run_outbox` (see main.outbox).
+    Views enqueue here instead of talking to SMTP inside the request.
+    """
+    STATUS_PENDING = "pending"
+    STATUS_SENT    = "sent"
+    STATUS_FAILED  = "failed"
+
+    STATUS_CHOICES = [
+        (STATUS_PENDING, "Pending"),
+        (STATUS_SENT,    "Sent"),
+        (STATUS_FAILED,  "Failed"),
+    ]
+
+    subject         = models.CharField(max_length=255)
+    body            = models.TextField(blank=True)
+    html_body       = models.TextField(blank=True)
+    from_email      = models.CharField(max_length=255)
+    to              = models.JSONField(default=list)
+    status          = models.CharField(max_length=10, choices=STATUS_CHOICES,
+                          default=STATUS_PENDING)
+    attempts        = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(db_index=True)
+    last_error      = models.TextField(blank=True)
+    created_at      = models.DateTimeField(auto_now_add=True)
+    sent_at         = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["next_attempt_at", "id"]
+
+    def __str__(self):
+        return f"{self.subject} → {', '.join(self.to)} ({self.status})"
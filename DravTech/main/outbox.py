@@ -0,0 +1,125 @@
+# main/outbox.py
+"""
+Durable email outbox.
+
+Views call `enqueue(...)`, which only writes an OutboxEmail row, so a form
+POST never waits on the mail server. `manage.py run_outbox` drains the
+table in batches over one SMTP connection and retries failures with
+exponential backoff until OUTBOX_MAX_ATTEMPTS is reached.
+
+A worker claims a row by bumping `attempts` with a compare-and-set and
+pushing `next_attempt_at` forward by a lease, so two workers never send the
+same row, and a row held by a crashed worker is picked up again once the
+lease expires.
+"""
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db.models import F
+from django.utils import timezone
+
+from .models import OutboxEmail
+
+logger = logging.getLogger(__name__)
+
+LEASE = timedelta(minutes=5)
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def enqueue(subject, body, to, html_body="", from_email=None):
+    """Queue one email for the outbox worker. `to` is a list of addresses."""
+    return OutboxEmail.objects.create(
+        subject=subject[:255],
+        body=body,
+        html_body=html_body or "",
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+        to=[address for address in to if address],
+        next_attempt_at=timezone.now(),
+    )
+
+
+def backoff(attempts):
+    """Delay before retry number `attempts` + 1: base · 2^(attempts-1), capped."""
+    base = _setting("OUTBOX_RETRY_BASE_SECONDS", 60)
+    cap  = _setting("OUTBOX_RETRY_MAX_SECONDS", 6 * 60 * 60)
+    return timedelta(seconds=min(base * 2 ** max(attempts - 1, 0), cap))
+
+
+def claim_batch(size):
+    """Lease up to `size` due rows for this worker and return them."""
+    now     = timezone.now()
+    due     = (OutboxEmail.objects
+               .filter(status=OutboxEmail.STATUS_PENDING, next_attempt_at__lte=now)
+               .order_by("next_attempt_at", "id")
+               .values_list("pk", "attempts")[:size])
+    claimed = []
+    for pk, attempts in due:
+        won = OutboxEmail.objects.filter(
+            pk=pk, status=OutboxEmail.STATUS_PENDING, attempts=attempts,
+        ).update(attempts=F("attempts") + 1, next_attempt_at=now + LEASE)
+        if won:
+            claimed.append(pk)
+    return list(OutboxEmail.objects.filter(pk__in=claimed).order_by("next_attempt_at", "id"))
+
+
+def _message(row, connection):
+    message = EmailMultiAlternatives(
+        subject=row.subject, body=row.body, from_email=row.from_email,
+        to=row.to, connection=connection,
+    )
+    if row.html_body:
+        message.attach_alternative(row.html_body, "text/html")
+    return message
+
+
+def _failed(row, error):
+    row.last_error = f"{type(error).__name__}: {error}"
+    if row.attempts >= _setting("OUTBOX_MAX_ATTEMPTS", 8):
+        row.status = OutboxEmail.STATUS_FAILED
+        logger.error("Outbox email %s gave up after %s attempts: %s", row.pk, row.attempts, error)
+    else:
+        row.next_attempt_at = timezone.now() + backoff(row.attempts)
+    row.save(update_fields=["status", "last_error", "next_attempt_at"])
+
+
+def send_batch(size=None):
+    """Send one batch over a single connection. Returns (sent, failed)."""
+    rows = claim_batch(size or _setting("OUTBOX_BATCH_SIZE", 50))
+    if not rows:
+        return 0, 0
+
+    handled, sent, failed = set(), 0, 0
+    connection = get_connection(fail_silently=False)
+    try:
+        connection.open()
+        for row in rows:
+            try:
+                connection.send_messages([_message(row, connection)])
+            except Exception as e:
+                handled.add(row.pk)
+                failed += 1
+                _failed(row, e)
+                # The SMTP session may be unusable after an error; start a new one.
+                connection.close()
+                connection.open()
+                continue
+            handled.add(row.pk)
+            sent += 1
+            OutboxEmail.objects.filter(pk=row.pk).update(
+                status=OutboxEmail.STATUS_SENT, sent_at=timezone.now(), last_error="",
+            )
+    except Exception as e:
+        # Could not (re)connect: the rest of the batch goes back with backoff.
+        logger.warning("Outbox connection failed: %s", e)
+        for row in rows:
+            if row.pk not in handled:
+                failed += 1
+                _failed(row, e)
+    finally:
+        connection.close()
+    return sent, failed
@@ -0,0 +1,38 @@
+# main/portfolio.py
+from django.db.models import Prefetch
+
+from services.models import Service
+from .models import Project
+
+
+def active_projects():
+    """
+    Active projects with their active related services loaded in one query.
+
+    The filtered services land on `project.active_services` (a plain list),
+    so templates and grouping code never go back to the database per project.
+    """
+    return (
+        Project.objects.filter(is_active=True)
+        .prefetch_related(
+            Prefetch(
+                'related_services',
+                queryset=Service.objects.filter(is_active=True).order_by('display_order', 'title'),
+                to_attr='active_services',
+            )
+        )
+    )
+
+
+def group_projects_by_service(projects):
+    """
+    Group projects under each of their active services.
+
+    Returns {service: [project, ...]} in first-seen order. Expects projects
+    from `active_projects()`.
+    """
+    projects_by_category = {}
+    for project in projects:
+        for service in project.active_services:
+            projects_by_category.setdefault(service, []).append(project)
+    return projects_by_category
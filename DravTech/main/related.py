@@ -0,0 +1,150 @@
+# main/related.py
+"""
+Precomputed related products.
+
+Every active product keeps its best RELATED_PRODUCTS_CANDIDATES neighbours
+of the same product type in RelatedProduct. The score is shared category,
+plus feature overlap (Jaccard), with display order as the tie-break. Detail
+pages read those rows with one indexed query and pick a random few, so
+visitors still see a rotating selection without ORDER BY RANDOM() over the
+whole catalog.
+
+When one product changes, main.signals calls `refresh` after commit. It
+scores that product against its peers only, and rewrites its own list
+plus the lists it enters or leaves. That is linear in the catalog, not
+quadratic. `manage.py rebuild_related_products` rebuilds everything.
+"""
+import random
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Min
+
+from .models import Product, RelatedProduct
+
+CATEGORY_WEIGHT = 2.0
+FEATURE_WEIGHT  = 4.0
+
+
+def candidates_per_product():
+    return getattr(settings, "RELATED_PRODUCTS_CANDIDATES", 12)
+
+
+def _feature_set(features):
+    names = set()
+    for feature in features or ():
+        if isinstance(feature, dict):
+            feature = feature.get("title") or feature.get("name") or ""
+        name = str(feature).strip().lower()
+        if name:
+            names.add(name)
+    return names
+
+
+def score(a, b):
+    """Similarity of two product rows from `_rows`; higher is closer."""
+    value = CATEGORY_WEIGHT if a["category_id"] == b["category_id"] else 0.0
+    union = a["features"] | b["features"]
+    if union:
+        value += FEATURE_WEIGHT * len(a["features"] & b["features"]) / len(union)
+    return value
+
+
+def _rows(product_types):
+    products = Product.objects.filter(is_active=True)
+    if product_types is not None:
+        products = products.filter(product_type__in=product_types)
+    rows = products.values("id", "category_id", "product_type", "features", "display_order", "title")
+    for row in rows:
+        row["features"] = _feature_set(row["features"])
+        yield row
+
+
+def _neighbours(product, peers):
+    """Link objects for the product's best peers, best first."""
+    ranked = sorted(
+        ((score(product, other), other) for other in peers if other["id"] != product["id"]),
+        key=lambda pair: (-pair[0], pair[1]["display_order"], pair[1]["title"]),
+    )
+    return [
+        RelatedProduct(product_id=product["id"], related_id=other["id"], score=value)
+        for value, other in ranked[:candidates_per_product()]
+    ]
+
+
+def _by_type(product_types):
+    by_type = defaultdict(list)
+    for row in _rows(product_types):
+        by_type[row["product_type"]].append(row)
+    return by_type
+
+
+@transaction.atomic
+def rebuild(product_types=None):
+    """
+    Rewrite the neighbour lists of every product of `product_types`
+    (all products when None). Returns the number of rows written.
+    """
+    links = [
+        link
+        for peers in _by_type(product_types).values()
+        for product in peers
+        for link in _neighbours(product, peers)
+    ]
+
+    stale = RelatedProduct.objects.all()
+    if product_types is not None:
+        stale = stale.filter(product__product_type__in=product_types)
+    stale.delete()
+    RelatedProduct.objects.bulk_create(links)
+    return len(links)
+
+
+@transaction.atomic
+def refresh(product_id, product_type):
+    """
+    Re-rank after one product was saved or deleted. Another product's list
+    only moves if the changed product was on it, or now ties or beats its
+    weakest entry (or the list has room). Returns the lists rewritten.
+    """
+    listing = set(RelatedProduct.objects.filter(related_id=product_id).values_list("product_id", flat=True))
+    types   = {product_type}
+    types.update(Product.objects.filter(pk__in=listing).values_list("product_type", flat=True))
+    by_type = _by_type(types)
+    rows    = {row["id"]: row for peers in by_type.values() for row in peers}
+
+    affected = {product_id} | listing
+    changed  = rows.get(product_id)     # None once deactivated or deleted
+    if changed is not None:
+        peers = by_type[changed["product_type"]]
+        lists = {
+            owner: (count, weakest)
+            for owner, count, weakest in RelatedProduct.objects
+            .filter(product_id__in=[peer["id"] for peer in peers])
+            .order_by().values("product").annotate(count=Count("id"), weakest=Min("score"))
+            .values_list("product", "count", "weakest")
+        }
+        limit = candidates_per_product()
+        for peer in peers:
+            count, weakest = lists.get(peer["id"], (0, None))
+            if peer is not changed and (count < limit or score(changed, peer) >= weakest):
+                affected.add(peer["id"])
+
+    RelatedProduct.objects.filter(product_id__in=affected).delete()
+    RelatedProduct.objects.bulk_create(
+        link
+        for pk in affected if pk in rows
+        for link in _neighbours(rows[pk], by_type[rows[pk]["product_type"]])
+    )
+    return len(affected)
+
+
+def sample(product, count=4):
+    """A random `count` of the product's stored neighbours, in one query."""
+    rows = list(
+        RelatedProduct.objects
+        .filter(product=product, related__is_active=True)
+        .select_related("related")[:candidates_per_product()]
+    )
+    return [row.related for row in random.sample(rows, min(count, len(rows)))]
@@ -0,0 +1,219 @@
+# main/signals.py
+import logging
+
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from services.models import CaseStudy, Service, ServiceCategory
+from . import fragment_cache, home_cache, images, related, similarity
+from .models import MediaBlob, PricingPlan, Product, Project, SiteStat, TeamMember
+from .storage import is_blob, media_storage
+
+logger = logging.getLogger(__name__)
+
+# Which homepage sections each model feeds.
+HOME_SECTIONS_BY_MODEL = {
+    Product:         ('products',),
+    SiteStat:        ('stats',),
+    Service:         ('services', 'case_studies', 'portfolio'),
+    ServiceCategory: ('case_studies',),
+    CaseStudy:       ('case_studies',),
+    Project:         ('portfolio',),
+}
+
+
+def _invalidate_after_commit(sections):
+    # Wait for the commit so a concurrent request cannot re-cache old rows.
+    transaction.on_commit(lambda: home_cache.invalidate(*sections))
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def invalidate_home_sections(sender, **kwargs):
+    sections = HOME_SECTIONS_BY_MODEL.get(sender)
+    if sections:
+        _invalidate_after_commit(sections)
+
+
+@receiver(m2m_changed, sender=Project.related_services.through)
+def invalidate_home_portfolio(sender, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        _invalidate_after_commit(('portfolio',))
+
+
+# ── Fragment cache generations (see main.fragment_cache) ──
+
+@receiver(post_save)
+@receiver(post_delete)
+def bump_fragment_generation(sender, **kwargs):
+    if sender._meta.label_lower in fragment_cache.MODELS:
+        transaction.on_commit(lambda: fragment_cache.bump(sender))
+
+
+@receiver(m2m_changed, sender=Project.related_services.through)
+def bump_project_fragments(sender, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        transaction.on_commit(lambda: fragment_cache.bump(Project))
+
+
+# ImageFields that get responsive derivatives (see main.images).
+IMAGE_FIELDS = {
+    Product:    'image',
+    Service:    'image',
+    CaseStudy:  'image',
+    Project:    'image',
+    TeamMember: 'photo',
+}
+
+
+def _build_derivatives(model, fieldfile):
+    try:
+        if not images.available_widths(fieldfile):
+            images.generate_derivatives(fieldfile)
+            # Cached fragments still hold the plain <img>; re-render them.
+            if model._meta.label_lower in fragment_cache.MODELS:
+                fragment_cache.bump(model)
+    except Exception:
+        logger.exception("Could not build image derivatives for %s", fieldfile.name)
+
+
+@receiver(post_save)
+def build_image_derivatives(sender, instance, raw=False, **kwargs):
+    field = IMAGE_FIELDS.get(sender)
+    if field is None or raw:
+        return
+    fieldfile = getattr(instance, field)
+    if fieldfile:
+        transaction.on_commit(lambda: _build_derivatives(sender, fieldfile))
+
+
+# ── Media blob reference counts (see main.storage) ──
+
+MEDIA_FIELDS = {
+    Product:    ('image', 'download_file'),
+    TeamMember: ('photo',),
+    Project:    ('image',),
+    Service:    ('image',),
+    CaseStudy:  ('image',),
+}
+
+
+def _blob_names(instance, fields):
+    names = (getattr(instance, field).name for field in fields)
+    return {name for name in names if is_blob(name)}
+
+
+def _collect_unreferenced(names):
+    storage = media_storage()
+    for name in names:
+        # Re-check after commit: another row may have picked the blob up.
+        if MediaBlob.objects.filter(name=name, ref_count=0).delete()[0]:
+            storage.delete(name)
+            images.delete_derivatives(storage, name)
+
+
+def _release(names):
+    for name in names:
+        MediaBlob.release(name)
+    if names:
+        transaction.on_commit(lambda: _collect_unreferenced(names))
+
+
+@receiver(pre_save)
+def remember_media_blobs(sender, instance, update_fields=None, **kwargs):
+    fields = MEDIA_FIELDS.get(sender)
+    if not fields:
+        return
+    if update_fields is not None:
+        fields = tuple(f for f in fields if f in update_fields)
+    previous = None
+    if fields and instance.pk is not None:
+        previous = sender.objects.filter(pk=instance.pk).values_list(*fields).first()
+    instance._media_fields   = fields
+    instance._previous_blobs = {name for name in previous or () if is_blob(name)}
+
+
+@receiver(post_save)
+def count_media_blobs(sender, instance, **kwargs):
+    fields = instance.__dict__.pop('_media_fields', None)
+    if not fields:
+        return
+    current  = _blob_names(instance, fields)
+    previous = instance.__dict__.pop('_previous_blobs', set())
+    storage  = media_storage()
+    for name in current - previous:
+        MediaBlob.acquire(name, size=storage.size(name) if storage.exists(name) else 0)
+    _release(previous - current)
+
+
+@receiver(post_delete)
+def release_media_blobs(sender, instance, **kwargs):
+    fields = MEDIA_FIELDS.get(sender)
+    if fields:
+        _release(_blob_names(instance, fields))
+
+
+# ── Product price summaries ──────────────────
+#
+# Product.min_plan_price / active_plan_count / from_price mirror the active
+# plans. They are rewritten in the same transaction as the plan change, so
+# a listing never sees a plan without its summary.
+
+@receiver(pre_save, sender=PricingPlan)
+def remember_plan_product(sender, instance, raw=False, **kwargs):
+    instance._previous_product_id = None
+    if instance.pk is not None and not raw:
+        instance._previous_product_id = (
+            PricingPlan.objects.filter(pk=instance.pk).values_list('product_id', flat=True).first()
+        )
+
+
+@receiver(post_save, sender=PricingPlan)
+@receiver(post_delete, sender=PricingPlan)
+def update_price_summary(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    product_ids = {instance.product_id, instance.__dict__.pop('_previous_product_id', None)}
+    product_ids.discard(None)
+    Product.recompute_price_summaries(product_ids)
+
+
+# ── Related products ─────────────────────────
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+def refresh_related_products(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    pk, product_type = instance.pk, instance.product_type
+    transaction.on_commit(lambda: related.refresh(pk, product_type))
+
+
+# ── Related projects ─────────────────────────
+
+@receiver(post_save, sender=Project)
+def refresh_related_projects(sender, instance, raw=False, **kwargs):
+    if not raw:
+        pk = instance.pk
+        transaction.on_commit(lambda: similarity.refresh(pk))
+
+
+@receiver(post_delete, sender=Project)
+def rebuild_related_projects(sender, **kwargs):
+    # The cascade already removed its rows, leaving other lists short.
+    transaction.on_commit(similarity.rebuild)
+
+
+@receiver(m2m_changed, sender=Project.related_services.through)
+def refresh_related_projects_services(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        pk = instance.pk
+        transaction.on_commit(lambda: similarity.refresh(pk))
+    elif pk_set:
+        project_ids = set(pk_set)
+        transaction.on_commit(lambda: [similarity.refresh(pk) for pk in project_ids])
+    else:
+        transaction.on_commit(similarity.rebuild)
@@ -0,0 +1,138 @@
+# main/similarity.py
+"""
+Project similarity index.
+
+Each active project pair is scored by shared related_services (Jaccard)
+and by text similarity: TF-IDF cosine over the title, summary and
+description. Each project's top RELATED_PROJECTS_LIMIT neighbours go into
+RelatedProject, so project_detail reads its related projects, already
+ranked, with one indexed query.
+
+`rebuild()` scores every project; `manage.py rebuild_related_projects`
+runs it. When a single project changes, through its services, text or
+visibility, `refresh(project_id)` rescores only that project's row of the
+matrix. It rewrites that project's list and the lists of projects it
+entered or left. Document frequencies drift a little between full
+rebuilds, which only nudges scores.
+"""
+import math
+import re
+from collections import Counter
+
+from django.conf import settings
+from django.db import transaction
+
+from .models import Project, RelatedProject
+
+SERVICE_WEIGHT = 0.6
+TEXT_WEIGHT    = 0.4
+
+_WORD      = re.compile(r"[a-z0-9]{3,}")
+_STOPWORDS = frozenset(
+    "and are for from has have into its our that the their this was were with "
+    "which will your you about over more than".split()
+)
+
+
+def limit():
+    return getattr(settings, "RELATED_PROJECTS_LIMIT", 6)
+
+
+def _tokens(*texts):
+    words = _WORD.findall(" ".join(texts).lower())
+    return Counter(word for word in words if word not in _STOPWORDS)
+
+
+class SimilarityIndex:
+    """Service sets and normalised TF-IDF vectors for the active projects."""
+
+    def __init__(self):
+        rows = list(
+            Project.objects.filter(is_active=True)
+            .values_list("id", "title", "summary", "description")
+        )
+        services = {pk: set() for pk, *_ in rows}
+        for project_id, service_id in (
+            Project.related_services.through.objects
+            .filter(project_id__in=services)
+            .values_list("project_id", "service_id")
+        ):
+            services[project_id].add(service_id)
+
+        counts = {pk: _tokens(title, summary, description) for pk, title, summary, description in rows}
+        df     = Counter(word for terms in counts.values() for word in terms)
+        total  = len(rows)
+        self.services = services
+        self.vectors  = {}
+        for pk, terms in counts.items():
+            vector = {w: tf * math.log((1 + total) / (1 + df[w])) for w, tf in terms.items()}
+            norm   = math.sqrt(sum(v * v for v in vector.values())) or 1.0
+            self.vectors[pk] = {w: v / norm for w, v in vector.items()}
+
+    @property
+    def ids(self):
+        return self.vectors.keys()
+
+    def score(self, a, b):
+        shared = self.services[a] | self.services[b]
+        jaccard = len(self.services[a] & self.services[b]) / len(shared) if shared else 0.0
+        va, vb  = self.vectors[a], self.vectors[b]
+        if len(vb) < len(va):
+            va, vb = vb, va
+        cosine = sum(v * vb.get(w, 0.0) for w, v in va.items())
+        return SERVICE_WEIGHT * jaccard + TEXT_WEIGHT * cosine
+
+    def neighbours(self, pk):
+        ranked = sorted(
+            ((self.score(pk, other), other) for other in self.ids if other != pk),
+            key=lambda pair: (-pair[0], pair[1]),
+        )
+        return [(other, value) for value, other in ranked[:limit()] if value > 0]
+
+
+def _write(index, project_ids):
+    RelatedProject.objects.filter(project_id__in=project_ids).delete()
+    RelatedProject.objects.bulk_create(
+        RelatedProject(project_id=pk, related_id=other, score=value)
+        for pk in project_ids if pk in index.ids
+        for other, value in index.neighbours(pk)
+    )
+
+
+@transaction.atomic
+def rebuild():
+    """Rescore every pair. Returns the number of projects indexed."""
+    index = SimilarityIndex()
+    RelatedProject.objects.all().delete()
+    _write(index, list(index.ids))
+    return len(index.ids)
+
+
+@transaction.atomic
+def refresh(project_id):
+    """
+    Re-rank after one project changed. Other projects' lists only move if
+    the changed project was on them or now outranks their weakest entry.
+    """
+    index   = SimilarityIndex()
+    current = {}
+    for owner, related, score in RelatedProject.objects.values_list("project", "related", "score"):
+        current.setdefault(owner, []).append((related, score))
+
+    affected = {project_id}
+    if project_id in index.ids:
+        for other in index.ids:
+            if other == project_id:
+                continue
+            entries = current.get(other, [])
+            listed  = any(related == project_id for related, _ in entries)
+            weakest = min((score for _, score in entries), default=0.0)
+            value   = index.score(project_id, other)
+            if listed or (value > 0 and (len(entries) < limit() or value > weakest)):
+                affected.add(other)
+    else:
+        # Deactivated or deleted: drop it from every list that had it.
+        affected.update(owner for owner, entries in current.items()
+                        if any(related == project_id for related, _ in entries))
+
+    _write(index, affected)
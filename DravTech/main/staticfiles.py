@@ -0,0 +1,164 @@
+# main/staticfiles.py
+"""
+Hashed, precompressed static files.
+
+`CompressedManifestStaticFilesStorage` is Django's manifest storage (every
+file gets a content-hash name such as main.3f2a9c1b7d4e.css, and CSS
+url() references are rewritten to match). It also writes .gz siblings, and
+.br siblings when the optional `brotli` package is installed, for
+text-like files at collectstatic time, so nothing is compressed per
+request.
+
+`PrecompressedStaticMiddleware` serves STATIC_URL from STATIC_ROOT when
+Django itself has to, for example on hosts without a front-end static
+mapping. It picks the best precompressed sibling the client accepts.
+Hashed names get a year-long `immutable` Cache-Control, so repeat visits
+never re-request them; unhashed names are revalidated.
+
+Until collectstatic has written a manifest (development, tests),
+{% static %} falls back to plain names. A reference to a file that does
+not exist also keeps its plain name (and 404s) rather than failing the
+whole page render.
+"""
+import gzip
+import logging
+import mimetypes
+import os
+import posixpath
+import re
+from urllib.parse import unquote
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, HttpResponseNotModified
+from django.utils._os import safe_join
+from django.utils.http import http_date
+from django.views.static import was_modified_since
+
+try:
+    import brotli
+except ImportError:         # optional; gzip alone is still a big win
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+COMPRESSIBLE = {
+    ".css", ".js", ".mjs", ".map", ".json", ".svg", ".txt", ".xml", ".html",
+    ".ico", ".ttf", ".otf", ".eot",
+}
+MIN_SIZE = 256              # below this the headers outweigh the saving
+
+_HASHED = re.compile(r"\.[0-9a-f]{12}\.[^./]+$")
+
+
+def _compressed(data):
+    """(suffix, bytes) for each encoding that actually shrinks `data`."""
+    variants = [(".gz", gzip.compress(data, compresslevel=9, mtime=0))]
+    if brotli is not None:
+        variants.append((".br", brotli.compress(data, quality=11)))
+    return [(suffix, body) for suffix, body in variants if len(body) < len(data)]
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+
+    manifest_strict = False
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+        names = set(self.hashed_files) | set(self.hashed_files.values())
+        for name in sorted(names):
+            if os.path.splitext(name)[1].lower() in COMPRESSIBLE:
+                self._write_compressed(name)
+
+    def _write_compressed(self, name):
+        path = self.path(name)
+        if not os.path.isfile(path) or os.path.getsize(path) < MIN_SIZE:
+            return
+        with open(path, "rb") as f:
+            data = f.read()
+        for suffix, body in _compressed(data):
+            with open(path + suffix, "wb") as f:
+                f.write(body)
+
+    def stored_name(self, name):
+        if not self.hashed_files:
+            # No manifest yet: collectstatic has not run here.
+            return name
+        try:
+            return super().stored_name(name)
+        except ValueError:
+            logger.warning("Static file %r is not in the manifest or STATIC_ROOT", name)
+            return name
+
+
+class PrecompressedStaticMiddleware:
+
+    ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.prefix  = settings.STATIC_URL if settings.STATIC_URL.startswith("/") else None
+        self.root    = settings.STATIC_ROOT
+        self.max_age = getattr(settings, "STATIC_MAX_AGE", 60 * 60 * 24 * 365)
+
+    def __call__(self, request):
+        if (
+            self.prefix and self.root
+            and request.method in ("GET", "HEAD")
+            and request.path.startswith(self.prefix)
+        ):
+            response = self.serve(request, request.path[len(self.prefix):])
+            if response is not None:
+                return response
+        return self.get_response(request)
+
+    def _accepted(self, request):
+        accepted = set()
+        for part in request.headers.get("Accept-Encoding", "").split(","):
+            coding, *params = (p.strip() for p in part.split(";"))
+            quality = 1.0
+            for param in params:
+                key, _, value = param.partition("=")
+                if key.strip() == "q":
+                    try:
+                        quality = float(value)
+                    except ValueError:
+                        quality = 0.0
+            if coding and quality > 0:
+                accepted.add(coding.lower())
+        return accepted
+
+    def serve(self, request, name):
+        name = posixpath.normpath(unquote(name)).lstrip("/")
+        try:
+            path = safe_join(self.root, name)
+        except SuspiciousFileOperation:
+            return None
+        if not os.path.isfile(path):
+            return None
+
+        stat = os.stat(path)
+        if not was_modified_since(request.headers.get("If-Modified-Since"), stat.st_mtime):
+            return HttpResponseNotModified()
+
+        content_type, _ = mimetypes.guess_type(name)
+        encoding = None
+        accepted = self._accepted(request)
+        for coding, suffix in self.ENCODINGS:
+            if coding in accepted and os.path.isfile(path + suffix):
+                encoding, path = coding, path + suffix
+                break
+
+        response = FileResponse(open(path, "rb"), content_type=content_type or "application/octet-stream")
+        response["Last-Modified"] = http_date(stat.st_mtime)
+        response["Vary"] = "Accept-Encoding"
+        if encoding:
+            response["Content-Encoding"] = encoding
+        if _HASHED.search(name):
+            response["Cache-Control"] = f"public, max-age={self.max_age}, immutable"
+        else:
+            response["Cache-Control"] = "public, max-age=0, must-revalidate"
+        return response
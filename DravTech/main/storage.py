@@ -0,0 +1,102 @@
+# main/storage.py
+"""
+Content-addressed media storage.
+
+Uploads are stored under the SHA-256 of their bytes instead of their
+original name, so identical files share one blob on disk:
+
+    products/data.jpg           →  blobs/3f/3fa1…c9.jpg
+    services/data_epTImF6.jpg   →  blobs/3f/3fa1…c9.jpg   (same bytes, same blob)
+
+A blob's name never changes while its bytes exist, so its URL can be
+cached forever. How many rows point at each blob is tracked in
+`MediaBlob` (see main.signals); a blob is deleted when that count drops
+to zero. Image derivatives (main.images) are already keyed by their
+source blob's name and are stored verbatim.
+"""
+import hashlib
+import os
+import posixpath
+import tempfile
+
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+
+BLOB_DIR         = "blobs"
+PASSTHROUGH_DIRS = ("derivatives",)
+
+
+def is_blob(name):
+    return bool(name) and name.startswith(BLOB_DIR + "/")
+
+
+def blob_name(digest, original_name):
+    ext = posixpath.splitext(original_name)[1].lower()
+    return posixpath.join(BLOB_DIR, digest[:2], digest + ext)
+
+
+@deconstructible(path="main.storage.ContentAddressedStorage")
+class ContentAddressedStorage(FileSystemStorage):
+
+    def _passthrough(self, name):
+        return name.split("/", 1)[0] in PASSTHROUGH_DIRS
+
+    def get_available_name(self, name, max_length=None):
+        # Blob names are decided in _save; only verbatim names can collide.
+        if self._passthrough(name):
+            return super().get_available_name(name, max_length)
+        return name
+
+    def _save(self, name, content):
+        if self._passthrough(name):
+            return super()._save(name, content)
+
+        # Spool to a temp file in MEDIA_ROOT while hashing, then rename into
+        # place. The rename is atomic and both writers hold the same bytes,
+        # so concurrent uploads of one file cannot corrupt it.
+        digest = hashlib.sha256()
+        os.makedirs(self.location, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.location, prefix=".upload-")
+        try:
+            with os.fdopen(fd, "wb") as tmp:
+                if hasattr(content, "seek"):
+                    content.seek(0)
+                for chunk in content.chunks():
+                    digest.update(chunk)
+                    tmp.write(chunk)
+
+            name = blob_name(digest.hexdigest(), name)
+            full_path = self.path(name)
+            if os.path.exists(full_path):
+                return name
+
+            directory = os.path.dirname(full_path)
+            if self.directory_permissions_mode is not None:
+                old_umask = os.umask(0o777 & ~self.directory_permissions_mode)
+                try:
+                    os.makedirs(directory, self.directory_permissions_mode, exist_ok=True)
+                finally:
+                    os.umask(old_umask)
+            else:
+                os.makedirs(directory, exist_ok=True)
+
+            os.replace(tmp_path, full_path)
+            tmp_path = None
+            if self.file_permissions_mode is not None:
+                os.chmod(full_path, self.file_permissions_mode)
+            return name
+        finally:
+            if tmp_path is not None and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+
+_storage = None
+
+
+def media_storage():
+    """Storage for model FileFields; a callable keeps migrations stable."""
+    global _storage
+    if _storage is None:
+        _storage = ContentAddressedStorage()
+    return _storage
+
@@ -0,0 +1,65 @@
+from django import template
+from django.templatetags.static import static
+from django.utils.html import format_html, format_html_join
+from django.utils.safestring import mark_safe
+
+from main import bundles, fonts
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def bundle_styles(context):
+    """
+    Inline the page family's critical CSS and load the full bundle without
+    blocking render. Falls back to one <link> per stylesheet until
+    `manage.py build_bundles` has run.
+    """
+    family   = bundles.family_for(context)
+    critical = bundles.critical_css(family)
+    if critical is None:
+        return format_html_join(
+            "\n", '<link href="{}" rel="stylesheet">',
+            ((static(path),) for path in bundles.sources(family, "css")),
+        )
+    href = static(bundles.bundle_name(family, "css"))
+    return format_html(
+        '<style>{}</style>\n'
+        '<link href="{}" rel="preload" as="style" onload="this.onload=null;this.rel=\'stylesheet\'">\n'
+        '<noscript><link href="{}" rel="stylesheet"></noscript>',
+        mark_safe(critical), href, href,
+    )
+
+
+@register.simple_tag(takes_context=True)
+def bundle_scripts(context):
+    """The page family's script bundle, deferred; one tag per script until built."""
+    family = bundles.family_for(context)
+    if bundles.critical_css(family) is None:
+        return format_html_join(
+            "\n", '<script src="{}"></script>',
+            ((static(path),) for path in bundles.sources(family, "js")),
+        )
+    return format_html('<script src="{}" defer></script>', static(bundles.bundle_name(family, "js")))
+
+
+@register.simple_tag
+def font_links():
+    """
+    Preload hints and inline @font-face for the vendored web fonts; the
+    Google Fonts stylesheet until `manage.py vendor_fonts` has run.
+    """
+    vendored = fonts.load_manifest()
+    if vendored is None:
+        return format_html(
+            '<link href="https://fonts.googleapis.com" rel="preconnect">\n'
+            '<link href="https://fonts.gstatic.com" rel="preconnect" crossorigin>\n'
+            '<link href="{}" rel="stylesheet">',
+            fonts.GOOGLE_FALLBACK,
+        )
+    css, preload = vendored
+    links = format_html_join(
+        "\n", '<link href="{}" rel="preload" as="font" type="font/woff2" crossorigin>',
+        ((href,) for href in preload),
+    )
+    return format_html("{}\n<style>{}</style>", links, mark_safe(css))
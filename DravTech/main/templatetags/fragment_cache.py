@@ -0,0 +1,70 @@
+from django import template
+from django.core.cache import cache
+
+from DravTech.routers import primary_reads
+from main import fragment_cache
+
+register = template.Library()
+
+
+class CacheFragmentNode(template.Node):
+
+    def __init__(self, nodelist, name, labels, vary_on, version):
+        self.nodelist = nodelist
+        self.name     = name
+        self.labels   = labels
+        self.vary_on  = vary_on
+        self.version  = version
+
+    def render(self, context):
+        vary_on = [var.resolve(context) for var in self.vary_on]
+        key     = fragment_cache.fragment_key(self.name, self.labels, vary_on, self.version)
+        value   = cache.get(key)
+        if value is None:
+            # Cached for every visitor: never capture replica lag.
+            with primary_reads():
+                value = self.nodelist.render(context)
+            cache.set(key, value, fragment_cache.timeout())
+        return value
+
+
+def _literal(bit, tag_name):
+    if len(bit) < 2 or bit[0] != bit[-1] or bit[0] not in "'\"":
+        raise template.TemplateSyntaxError(f"{tag_name!r} expects a quoted string, got {bit}")
+    return bit[1:-1]
+
+
+@register.tag
+def cachefragment(parser, token):
+    """
+    Cache a block until rows of the listed models change.
+    Usage: {% cachefragment "about-team" models="main.TeamMember" %} ... {% endcachefragment %}
+    Further arguments are variables the output also depends on, as with
+    {% cache %}: {% cachefragment "products" models="main.Product" type_filter %}
+    """
+    bits     = token.split_contents()
+    tag_name = bits[0]
+    if len(bits) < 3 or not bits[2].startswith("models="):
+        raise template.TemplateSyntaxError(
+            f'{tag_name!r} usage: {{% {tag_name} "name" models="app.Model ..." [var ...] %}}'
+        )
+    name   = _literal(bits[1], tag_name)
+    labels = []
+    for model in _literal(bits[2][len("models="):], tag_name).split():
+        try:
+            model_label = fragment_cache.label(model)
+        except (LookupError, ValueError):
+            raise template.TemplateSyntaxError(f"{tag_name!r}: unknown model {model!r}")
+        if model_label not in fragment_cache.MODELS:
+            raise template.TemplateSyntaxError(
+                f"{tag_name!r}: {model} has no generation counter; add it to main.fragment_cache.MODELS"
+            )
+        labels.append(model_label)
+
+    nodelist = parser.parse((f"end{tag_name}",))
+    parser.delete_first_token()
+    return CacheFragmentNode(
+        nodelist, name, sorted(set(labels)),
+        [parser.compile_filter(bit) for bit in bits[3:]],
+        fragment_cache.template_version(parser.origin),
+    )
@@ -0,0 +1,62 @@
+from django import template
+from django.contrib.staticfiles import finders
+from django.templatetags.static import static
+from django.utils.html import format_html, format_html_join
+
+from main import media
+
+register = template.Library()
+
+
+def _url(src):
+    """Static path → URL; URLs (e.g. an ImageField's .url) pass through."""
+    src = str(src)
+    return src if src.startswith(("/", "http://", "https://", "data:")) else static(src)
+
+
+def _attrs(attrs):
+    return format_html_join(
+        "", ' {}="{}"', ((key.replace("_", "-"), value) for key, value in attrs.items())
+    )
+
+
+@register.simple_tag
+def lazy_img(src, alt="", eager=False, **attrs):
+    """
+    <img> with loading/decoding hints.
+    Usage: {% lazy_img 'assets/img/logo.jpeg' alt="DravTech logo" eager=True %}
+    Extra keyword arguments become attributes (data_x → data-x).
+    """
+    if eager:
+        attrs.setdefault("fetchpriority", "high")
+    else:
+        attrs.setdefault("loading", "lazy")
+    attrs.setdefault("decoding", "async")
+    return format_html('<img src="{}" alt="{}"{}>', _url(src), alt, _attrs(attrs))
+
+
+@register.simple_tag(takes_context=True)
+def lazy_video(context, src, poster="", type="video/mp4", autoplay=True, **attrs):
+    """
+    Muted background <video> that loads only near the viewport; a poster
+    <img> alone for Save-Data clients.
+    Usage: {% lazy_video 'assets/videos/bg.mp4' poster='assets/img/bg.jpg' class="footer-video" %}
+    """
+    if media.save_data(context.get("request")):
+        if not poster:
+            return ""
+        lite = media.lite_name(poster)
+        return format_html(
+            '<img src="{}" alt="" aria-hidden="true" loading="lazy" decoding="async"{}>',
+            _url(lite if finders.find(lite) else poster), _attrs(attrs),
+        )
+
+    if poster:
+        attrs["data_poster"] = _url(poster)
+    if autoplay:
+        attrs["data_autoplay"] = ""
+    return format_html(
+        '<video muted loop playsinline preload="none" data-lazy-video{}>'
+        '<source data-src="{}" type="{}"></video>',
+        _attrs(attrs), _url(src), type,
+    )
@@ -0,0 +1,45 @@
+from django import template
+from django.utils.html import format_html, format_html_join
+
+from main.images import FORMATS, available_widths, derivative_name
+
+register = template.Library()
+
+DEFAULT_SIZES = "(max-width: 576px) 100vw, (max-width: 992px) 50vw, 33vw"
+
+
+@register.simple_tag
+def responsive_image(image, alt="", sizes=DEFAULT_SIZES, **attrs):
+    """
+    Render an ImageField as <picture> with WebP/JPEG srcsets.
+    Usage: {% responsive_image product.image alt=product.title class="img-fluid" loading="lazy" %}
+    Extra keyword arguments become <img> attributes (data_x → data-x).
+    Falls back to a plain <img> until derivatives have been generated.
+    """
+    if not image:
+        return ""
+
+    attrs.setdefault("decoding", "async")
+    img_attrs = format_html_join(
+        "", ' {}="{}"', ((key.replace("_", "-"), value) for key, value in attrs.items())
+    )
+    widths = available_widths(image)
+    if not widths:
+        return format_html('<img src="{}" alt="{}"{}>', image.url, alt, img_attrs)
+
+    storage = image.storage
+
+    def srcset(ext):
+        return ", ".join(
+            f"{storage.url(derivative_name(image.name, width, ext))} {width}w" for width in widths
+        )
+
+    return format_html(
+        '<picture style="display: contents">'
+        '<source type="{}" srcset="{}" sizes="{}">'
+        '<img src="{}" srcset="{}" sizes="{}" alt="{}"{}>'
+        '</picture>',
+        FORMATS["webp"][1], srcset("webp"), sizes,
+        storage.url(derivative_name(image.name, widths[-1], "jpg")),
+        srcset("jpg"), sizes, alt, img_attrs,
+    )
@@ -1,3 +1,809 @@
-from django.test import TestCase
+import io
+import os
+import shutil
+import tempfile
+from smtplib import SMTPException
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.core.cache import cache
+from django.core import mail
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.template import Context, Template, TemplateSyntaxError
+from django.contrib.auth.models import User
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from PIL import Image
+
+from DravTech import routers
+from DravTech.database import serialized_write
+from services.models import Service
+from . import bundles, fonts, home_cache, images, outbox, related, similarity
+from .models import (
+    Category, MediaBlob, OutboxEmail, PricingPlan, Product, Project, RelatedProduct,
+    RelatedProject, SiteStat, TeamMember,
+)
+
+
+class HomePortfolioQueryTests(TestCase):
+    """The homepage portfolio must not issue a query per project."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.active_service = Service.objects.create(title="Web Apps", overview="Web")
+        cls.hidden_service = Service.objects.create(title="Legacy", overview="Old", is_active=False)
+
+    def setUp(self):
+        cache.clear()
+
+    def _add_projects(self, count, start=0):
+        for i in range(start, start + count):
+            project = Project.objects.create(title=f"Project {i}", summary="Summary", is_featured=True)
+            project.related_services.add(self.active_service, self.hidden_service)
+
+    def _cold_home(self):
+        cache.clear()
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse("home"))
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries), response
+
+    def test_query_count_is_independent_of_project_count(self):
+        self._add_projects(1)
+        baseline, _ = self._cold_home()
+
+        self._add_projects(10, start=1)
+        count, response = self._cold_home()
+        self.assertEqual(count, baseline)
+        self.assertEqual(len(response.context["projects"]), 11)
+
+    def test_projects_grouped_by_active_service_only(self):
+        self._add_projects(3)
+        _, response = self._cold_home()
+
+        grouped = response.context["projects_by_category"]
+        self.assertEqual(list(grouped), [self.active_service])
+        self.assertEqual(len(grouped[self.active_service]), 3)
+
+
+class HomeCacheTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        SiteStat.objects.create(label="Clients", value="50+")
+
+    def test_warm_homepage_costs_zero_queries(self):
+        self.client.get(reverse("home"))
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse("home"))
+        self.assertEqual(len(response.context["stats"]), 1)
+
+    def test_saving_a_model_invalidates_its_section(self):
+        self.client.get(reverse("home"))
+        with self.captureOnCommitCallbacks(execute=True):
+            SiteStat.objects.create(label="Projects", value="120+")
+
+        response = self.client.get(reverse("home"))
+        self.assertEqual(len(response.context["stats"]), 2)
+
+
+class ImageDerivativeTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        override = override_settings(MEDIA_ROOT=self.media_root, MEDIA_URL="/media/")
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def _upload(self, width, height):
+        buffer = io.BytesIO()
+        Image.new("RGB", (width, height), "navy").save(buffer, "JPEG")
+        return SimpleUploadedFile("shot.jpg", buffer.getvalue(), content_type="image/jpeg")
+
+    def test_render_variants_skips_widths_wider_than_source(self):
+        variants = images.render_variants(self._upload(500, 250).read(), (320, 480, 768))
+        self.assertEqual(sorted({(w, ext) for w, ext, _ in variants}),
+                         [(320, "jpg"), (320, "webp"), (480, "jpg"), (480, "webp")])
+
+    def test_missing_derivatives_are_only_briefly_remembered(self):
+        project = Project.objects.create(title="Shot", summary="S", image=self._upload(1000, 600))
+        with mock.patch("main.images.cache.set") as cache_set:
+            self.assertEqual(images.available_widths(project.image), [])
+        self.assertEqual(cache_set.call_args.args[2], images.MISSING_TIMEOUT)
+
+        images.generate_derivatives(project.image)
+        with mock.patch("main.images.cache.set") as cache_set:
+            cache.clear()
+            self.assertEqual(images.available_widths(project.image), [320, 480, 768])
+        self.assertEqual(cache_set.call_args.args[2], images.WIDTHS_TIMEOUT)
+
+    def test_saving_an_image_builds_derivatives_and_srcset(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            project = Project.objects.create(title="Shot", summary="S", image=self._upload(1000, 600))
+
+        self.assertEqual(images.available_widths(project.image), [320, 480, 768])
+        html = Template(
+            "{% load responsive_images %}{% responsive_image project.image alt='Shot' loading='lazy' %}"
+        ).render(Context({"project": project}))
+        self.assertIn('type="image/webp"', html)
+        self.assertIn("-768w.jpg 768w", html)
+        self.assertIn('loading="lazy"', html)
+
+
+class ContentAddressedStorageTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        override = override_settings(MEDIA_ROOT=self.media_root, MEDIA_URL="/media/")
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def _upload(self, name, colour="navy"):
+        buffer = io.BytesIO()
+        Image.new("RGB", (40, 20), colour).save(buffer, "JPEG")
+        return SimpleUploadedFile(name, buffer.getvalue(), content_type="image/jpeg")
+
+    def test_identical_uploads_share_one_counted_blob(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            project = Project.objects.create(title="A", summary="S", image=self._upload("data.jpg"))
+            member  = TeamMember.objects.create(name="B", role="R", photo=self._upload("data_epTImF6.JPG"))
+
+        self.assertEqual(project.image.name, member.photo.name)
+        self.assertTrue(project.image.name.startswith("blobs/"))
+        self.assertTrue(project.image.url.endswith(".jpg"))
+        self.assertEqual(MediaBlob.objects.get(name=project.image.name).ref_count, 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            project.delete()
+        self.assertTrue(member.photo.storage.exists(member.photo.name))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            member.photo = self._upload("other.jpg", "teal")
+            member.save()
+        self.assertFalse(member.photo.storage.exists(project.image.name))
+        self.assertFalse(MediaBlob.objects.filter(name=project.image.name).exists())
+
+
+class OutboxTests(TestCase):
+
+    def test_contact_form_queues_instead_of_sending(self):
+        response = self.client.post(reverse("contact"), {
+            "name": "Ada", "email": "ada@example.com", "contact_type": "general",
+            "priority": "medium", "subject": "Hello team", "message": "I would like to hear about your ERP.",
+        })
+        self.assertRedirects(response, reverse("contact_confirmation"), fetch_redirect_response=False)
+        self.assertEqual(mail.outbox, [])
+        self.assertEqual(OutboxEmail.objects.filter(status=OutboxEmail.STATUS_PENDING).count(), 2)
+
+        call_command("run_outbox", "--once", stdout=io.StringIO())
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertEqual(mail.outbox[0].alternatives[0][1], "text/html")
+        self.assertFalse(OutboxEmail.objects.exclude(status=OutboxEmail.STATUS_SENT).exists())
+
+    @override_settings(OUTBOX_MAX_ATTEMPTS=2)
+    def test_failures_back_off_then_give_up(self):
+        email = outbox.enqueue("Hi", "Body", ["a@example.com"])
+        with mock.patch("django.core.mail.backends.locmem.EmailBackend.send_messages",
+                        side_effect=SMTPException("421 try later")):
+            self.assertEqual(outbox.send_batch(), (0, 1))
+            email.refresh_from_db()
+            self.assertEqual(email.status, OutboxEmail.STATUS_PENDING)
+            self.assertIn("421", email.last_error)
+            self.assertEqual(outbox.send_batch(), (0, 0))   # not due yet
+
+            OutboxEmail.objects.update(next_attempt_at=email.created_at)
+            self.assertEqual(outbox.send_batch(), (0, 1))
+        email.refresh_from_db()
+        self.assertEqual((email.status, email.attempts), (OutboxEmail.STATUS_FAILED, 2))
+
+
+class PriceSummaryTests(TestCase):
+
+    def setUp(self):
+        category     = Category.objects.create(name="Software", slug="software")
+        self.product = Product.objects.create(
+            title="CRM", category=category, product_type=Product.TYPE_DIGITAL,
+        )
+
+    def _plan(self, price, **kwargs):
+        return PricingPlan.objects.create(
+            product=self.product, name=f"Plan {price}", price=price,
+            billing_type=PricingPlan.BILLING_MONTHLY, **kwargs,
+        )
+
+    def _summary(self):
+        self.product.refresh_from_db()
+        return self.product.min_plan_price, self.product.active_plan_count
+
+    def test_plan_changes_keep_summary_current(self):
+        self.assertEqual(self._summary(), (None, 0))
+        pro     = self._plan(5000)
+        starter = self._plan(1500)
+        self._plan(900, is_active=False)
+        self.assertEqual(self._summary(), (1500, 2))
+
+        starter.is_active = False
+        starter.save()
+        self.assertEqual(self._summary(), (5000, 1))
+
+        pro.delete()
+        self.assertEqual(self._summary(), (None, 0))
+
+    def test_moving_a_plan_updates_both_products(self):
+        plan  = self._plan(2000)
+        other = Product.objects.create(
+            title="ERP", category=self.product.category, product_type=Product.TYPE_DIGITAL,
+        )
+        plan.product = other
+        plan.save()
+
+        other.refresh_from_db()
+        self.assertEqual(self._summary(), (None, 0))
+        self.assertEqual((other.min_plan_price, other.active_plan_count), (2000, 1))
+
+    def test_ordinary_saves_leave_summaries_alone(self):
+        stale = Product.objects.get(pk=self.product.pk)
+        self._plan(1500)
+        stale.title = "CRM Suite"
+        stale.save()
+        self.assertEqual(self._summary(), (1500, 1))
+        self.assertEqual(self.product.from_price, 1500)
+
+        cap = Product.objects.create(title="Cap", category=self.product.category,
+                                     product_type=Product.TYPE_MERCH, price=800)
+        self.assertEqual(cap.from_price, 800)
+        cap.price = 650
+        cap.save()
+        cap.refresh_from_db()
+        self.assertEqual(cap.from_price, 650)
+
+    def test_recompute_command_repairs_drift(self):
+        self._plan(3000)
+        Product.objects.update(min_plan_price=None, active_plan_count=0, from_price=None)
+
+        call_command('recompute_price_summaries', batch_size=1, stdout=io.StringIO())
+        self.assertEqual(self._summary(), (3000, 1))
+        self.assertEqual(self.product.from_price, 3000)
+
+
+class CatalogIndexTests(TestCase):
+
+    def test_benchmark_shows_plans_and_rolls_back(self):
+        out = io.StringIO()
+        call_command('benchmark_indexes', seed=50, repeat=1, stdout=out)
+        report = out.getvalue()
+
+        if connection.vendor == 'sqlite':
+            catalog = report.split('catalog page', 1)[1].split('\n')[1:3]
+            self.assertNotIn('product_catalog_idx', catalog[0])
+            self.assertIn('USING INDEX product_catalog_idx', catalog[1])
+        self.assertFalse(Product.objects.exists())
+        with connection.cursor() as cursor:
+            names = {i.name for i in Product._meta.indexes}
+            constraints = connection.introspection.get_constraints(cursor, Product._meta.db_table)
+        self.assertLessEqual(names, set(constraints))
+
+
+class SQLiteTuningTests(TransactionTestCase):
+
+    def setUp(self):
+        if connection.vendor != 'sqlite':
+            self.skipTest('SQLite only')
+
+    def _pragma(self, name):
+        with connection.cursor() as cursor:
+            cursor.execute(f'PRAGMA {name}')
+            return cursor.fetchone()[0]
+
+    def test_pragmas_applied_to_new_connections(self):
+        connection.close()
+        connection.ensure_connection()
+        self.assertEqual(self._pragma('synchronous'), 1)      # NORMAL
+        self.assertEqual(self._pragma('busy_timeout'), 5000)
+        self.assertLess(self._pragma('cache_size'), 0)        # sized in KiB
+
+    def test_serialized_write_begins_immediate(self):
+        with CaptureQueriesContext(connection) as ctx:
+            with serialized_write():
+                SiteStat.objects.create(label='Clients', value='10')
+                with serialized_write():                       # nests as a savepoint
+                    SiteStat.objects.create(label='Projects', value='20')
+        sql = [q['sql'] for q in ctx.captured_queries]
+        self.assertEqual(sql[0], 'BEGIN IMMEDIATE')
+        self.assertEqual(sql.count('BEGIN IMMEDIATE'), 1)
+        self.assertEqual(SiteStat.objects.count(), 2)
+
+        # Back to Django's normal BEGIN afterwards.
+        self.assertNotIn('_start_transaction_under_autocommit', connection.__dict__)
+
+
+class ReplicaRoutingTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        patcher = mock.patch('DravTech.routers.has_replica', return_value=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.router = routers.PrimaryReplicaRouter()
+
+    def _routed(self, request, middleware=None):
+        seen = {}
+
+        @routers.replica_reads
+        def probe(request):
+            seen['product'] = self.router.db_for_read(Product)
+            seen['user']    = self.router.db_for_read(User)
+            return HttpResponse()
+
+        handler = middleware(probe) if middleware else probe
+        handler(request)
+        return seen
+
+    def test_catalog_reads_use_replica_but_writes_do_not(self):
+        # TestCase wraps each test in a transaction; route as if outside it.
+        with mock.patch.object(connection, 'in_atomic_block', False):
+            seen = self._routed(RequestFactory().get('/'))
+        self.assertEqual(seen, {'product': 'replica', 'user': 'default'})
+        self.assertEqual(self.router.db_for_read(Product), 'default')
+        self.assertEqual(self.router.db_for_write(Product), 'default')
+        self.assertFalse(self.router.allow_migrate('replica', 'main'))
+
+    def test_post_pins_visitor_to_primary(self):
+        pin = routers.PrimaryPinMiddleware(lambda request: HttpResponse())
+        response = pin(RequestFactory().post('/contact/'))
+        self.assertIn(routers.PIN_COOKIE, response.cookies)
+
+        request = RequestFactory().get('/')
+        request.COOKIES[routers.PIN_COOKIE] = '1'
+        with mock.patch.object(connection, 'in_atomic_block', False):
+            seen = self._routed(request, routers.PrimaryPinMiddleware)
+        self.assertEqual(seen['product'], 'default')
+
+    def test_cached_home_sections_are_rebuilt_from_primary(self):
+        seen = {}
+
+        def stats():
+            seen['build'] = self.router.db_for_read(SiteStat)
+            return {'stats': []}
+
+        @routers.replica_reads
+        def view(request):
+            home_cache.get_home_context()
+            seen['view'] = self.router.db_for_read(SiteStat)
+            return HttpResponse()
+
+        with mock.patch.dict(home_cache.SECTIONS, stats=stats), \
+                mock.patch.object(connection, 'in_atomic_block', False):
+            view(RequestFactory().get('/'))
+        self.assertEqual(seen, {'build': 'default', 'view': 'replica'})
+
+
+class RelatedProductTests(TestCase):
+
+    def setUp(self):
+        self.software = Category.objects.create(name="Software", slug="software")
+        self.apparel  = Category.objects.create(name="Apparel", slug="apparel")
+
+    def _product(self, title, category, features=(), product_type=Product.TYPE_DIGITAL):
+        return Product.objects.create(title=title, category=category,
+                                      product_type=product_type, features=list(features))
+
+    def test_neighbours_ranked_by_category_and_features(self):
+        crm   = self._product("CRM", self.software, ["Invoices", "Reports"])
+        erp   = self._product("ERP", self.software, ["invoices", "reports "])
+        pos   = self._product("POS", self.apparel, ["Reports", "Payroll"])
+        wiki  = self._product("Wiki", self.apparel)
+        shirt = self._product("Shirt", self.apparel, product_type=Product.TYPE_MERCH)
+        related.rebuild()
+
+        ranked = list(RelatedProduct.objects.filter(product=crm).values_list("related", flat=True))
+        self.assertEqual(ranked, [erp.pk, pos.pk, wiki.pk])
+        self.assertFalse(RelatedProduct.objects.filter(related=shirt).exclude(product=shirt).exists())
+
+        with self.assertNumQueries(1):
+            picks = related.sample(crm, 2)
+        self.assertEqual(len(picks), 2)
+        self.assertLessEqual({p.pk for p in picks}, {erp.pk, pos.pk, wiki.pk})
+
+    def test_product_changes_refresh_their_type(self):
+        crm = self._product("CRM", self.software)
+        with self.captureOnCommitCallbacks(execute=True):
+            erp = self._product("ERP", self.software)
+        self.assertEqual([p.pk for p in related.sample(crm)], [erp.pk])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            erp.product_type = Product.TYPE_MERCH
+            erp.save()
+        self.assertEqual(related.sample(crm), [])
+
+    @override_settings(RELATED_PRODUCTS_CANDIDATES=1)
+    def test_refresh_only_rewrites_lists_the_product_enters_or_leaves(self):
+        crm  = self._product("CRM", self.software, ["Invoices"])
+        self._product("ERP", self.software, ["Invoices"])
+        pos  = self._product("POS", self.apparel, ["Payroll"])
+        self._product("Till", self.apparel, ["Payroll"])
+        related.rebuild()
+        untouched = RelatedProduct.objects.get(product=crm).pk
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self._product("Kiosk", self.apparel, ["Payroll"])
+        self.assertEqual(RelatedProduct.objects.get(product=crm).pk, untouched)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            pos.features = ["Invoices"]
+            pos.category = self.software
+            pos.save()
+        incremental = set(RelatedProduct.objects.values_list("product", "related", "score"))
+        related.rebuild()
+        self.assertEqual(incremental, set(RelatedProduct.objects.values_list("product", "related", "score")))
+
+
+class RelatedProjectTests(TestCase):
+
+    def setUp(self):
+        self.web    = Service.objects.create(title="Web", overview="Web builds")
+        self.mobile = Service.objects.create(title="Mobile", overview="Apps")
+
+    def _project(self, title, summary, *services):
+        with self.captureOnCommitCallbacks(execute=True):
+            project = Project.objects.create(title=title, summary=summary)
+            project.related_services.add(*services)
+        return project
+
+    def _related(self, project):
+        return list(RelatedProject.objects.filter(project=project).values_list("related", flat=True))
+
+    def test_ranked_by_services_then_text(self):
+        shop    = self._project("Shop", "Online store checkout for a fashion retailer", self.web)
+        market  = self._project("Market", "Online store with checkout and payments", self.web)
+        clinic  = self._project("Clinic", "Patient booking portal", self.web, self.mobile)
+        tracker = self._project("Tracker", "Fitness tracker with online checkout", self.mobile)
+        self._project("Unrelated", "Warehouse robotics")
+
+        self.assertEqual(self._related(shop), [market.pk, clinic.pk, tracker.pk])
+
+        url = reverse("project_detail", args=[shop.slug])
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        self.assertEqual([p.pk for p in response.context["related_projects"]],
+                         [market.pk, clinic.pk, tracker.pk])
+        self.assertFalse(any("DISTINCT" in q["sql"] for q in ctx.captured_queries))
+
+    def test_service_changes_and_deactivation_update_lists(self):
+        shop   = self._project("Shop", "Online store", self.web)
+        clinic = self._project("Clinic", "Patient booking", self.mobile)
+        self.assertEqual(self._related(shop), [])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            clinic.related_services.add(self.web)
+        self.assertEqual(self._related(shop), [clinic.pk])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            clinic.is_active = False
+            clinic.save()
+        self.assertEqual(self._related(shop), [])
+        self.assertEqual(self._related(clinic), [])
+
+
+class StaticPipelineTests(TestCase):
+
+    def setUp(self):
+        source = tempfile.mkdtemp()
+        root   = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, source)
+        self.addCleanup(shutil.rmtree, root)
+        with open(f"{source}/site.css", "w") as f:
+            f.write("body { background: url('dot.png'); }\n" + ".card { margin: 0 auto; }\n" * 40)
+        Image.new("RGB", (2, 2), "red").save(f"{source}/dot.png")
+        override = override_settings(STATICFILES_DIRS=[source], STATIC_ROOT=root)
+        override.enable()
+        self.addCleanup(override.disable)
+        self.root = root
+
+    def test_collectstatic_writes_hashed_compressed_files_served_immutable(self):
+        from django.contrib.staticfiles.storage import staticfiles_storage
+        from django.test.client import Client
+
+        call_command("collectstatic", interactive=False, verbosity=0)
+        hashed = staticfiles_storage.stored_name("site.css")
+        self.assertRegex(hashed, r"^site\.[0-9a-f]{12}\.css$")
+        with open(f"{self.root}/{hashed}") as f:
+            self.assertRegex(f.read(), r"dot\.[0-9a-f]{12}\.png")
+        self.assertTrue(staticfiles_storage.exists(hashed + ".gz"))
+        self.assertFalse(staticfiles_storage.exists(staticfiles_storage.stored_name("dot.png") + ".gz"))
+
+        client   = Client(SERVER_NAME="dravtech.pythonanywhere.com")
+        response = client.get(f"/static/{hashed}", HTTP_ACCEPT_ENCODING="br;q=0, gzip")
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(response["Content-Type"], "text/css")
+        self.assertIn("immutable", response["Cache-Control"])
+        self.assertEqual(response["Vary"], "Accept-Encoding")
+
+        response = client.get("/static/site.css")
+        self.assertNotIn("Content-Encoding", response)
+        self.assertIn("must-revalidate", response["Cache-Control"])
+
+
+@override_settings(DEBUG=False)
+class CollectedSiteTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root)
+        override = override_settings(STATIC_ROOT=root)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def test_pages_render_against_the_real_manifest(self):
+        call_command("collectstatic", interactive=False, verbosity=0)
+        for name in ("home", "about"):
+            response = self.client.get(reverse(name))
+            self.assertEqual(response.status_code, 200)
+            self.assertRegex(response.content.decode(), r"/static/assets/img/logo\.[0-9a-f]{12}\.jpeg")
+
+        with self.assertLogs("main.staticfiles", "WARNING"):
+            html = Template("{% load static %}{% static 'assets/img/missing.jpg' %}").render(Context())
+        self.assertEqual(html, "/static/assets/img/missing.jpg")
+
+
+class BundleTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+
+    def test_prune_keeps_rules_that_can_match(self):
+        rules, _ = bundles.parse(
+            "@font-face{font-family:icons;src:url(x.woff2)}"
+            "@keyframes spin{to{transform:rotate(1turn)}}"
+            ".used,.unused{color:red}"
+            ".used:not(.unused)::before{content:\"{\"}"
+            "@media (min-width:1px){.unused{margin:0}table.used{margin:0}}"
+            ".alert-danger{color:red}.spinner{animation:spin 1s}"
+            "[data-aos]{opacity:0}[data-missing]{opacity:0}"
+        )
+        vocabulary = bundles.Vocabulary()
+        vocabulary.feed('<div class="used alert-{{ message.tags }}" data-aos="fade-up"></div>')
+
+        css = bundles.render(bundles.prune(rules, vocabulary))
+        self.assertIn(".used{color:red}", css)
+        self.assertIn(".used:not(.unused)::before", css)
+        self.assertIn(".alert-danger", css)
+        self.assertIn("[data-aos]", css)
+        self.assertNotIn("table.used", css)
+        self.assertNotIn("@media", css)
+        self.assertNotIn("[data-missing]", css)
+        self.assertNotIn("@keyframes", css)
+        self.assertNotIn("@font-face", css)
+
+    def test_budget_fills_with_layout_rules_first(self):
+        rules, _ = bundles.parse(".page{margin:0}.nav{padding:0}.nav:hover{color:red}.header{margin:0}")
+        layout = bundles.Vocabulary()
+        layout.feed('<nav class="nav header"></nav>')
+
+        rules = bundles.first_paint(rules)
+        self.assertNotIn(":hover", bundles.render(rules))
+        kept = bundles.within_budget(rules, budget=40, first=layout)
+        self.assertEqual(bundles.render(kept), ".nav{padding:0}\n.header{margin:0}")
+
+    def test_unbuilt_pages_link_only_their_family_files(self):
+        home  = self.client.get(reverse("home")).content.decode()
+        about = self.client.get(reverse("about")).content.decode()
+        self.assertIn("assets/css/main.css", about)
+        self.assertIn("assets/vendor/aos/aos.js", about)
+        self.assertNotIn("purecounter", about)
+        self.assertNotIn("swiper", about)
+        self.assertIn("purecounter_vanilla.js", home)
+        self.assertIn("assets/css/services.css", home)
+
+    def test_built_bundles_inline_critical_css(self):
+        output = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, output)
+        with override_settings(STATICFILES_DIRS=[output, *settings.STATICFILES_DIRS]):
+            call_command("build_bundles", "home", output=output, stdout=io.StringIO())
+            with open(f"{output}/assets/bundles/home.critical.css") as f:
+                critical = f.read()
+            response = self.client.get(reverse("home"))
+
+        self.assertIn(".container{", critical)
+        self.assertIn(".header{", critical)
+        self.assertNotIn(".offcanvas-backdrop", critical)
+        self.assertNotIn(":hover", critical)
+        self.assertLessEqual(len(critical.encode()), bundles.CRITICAL_BUDGET + 1)
+        self.assertIn('url("../vendor/bootstrap-icons/fonts/', critical)
+
+        html = response.content.decode()
+        self.assertIn("<style>", html)
+        self.assertIn('url("/static/assets/vendor/bootstrap-icons/fonts/', html)
+        self.assertIn('assets/bundles/home.css" rel="preload"', html)
+        self.assertIn('assets/bundles/home.js" defer', html)
+        self.assertNotIn("assets/css/main.css", html)
+
+
+class VendoredFontTests(TestCase):
+
+    GOOGLE_CSS = """
+/* cyrillic */
+@font-face {
+  font-family: 'Roboto';
+  font-style: normal;
+  font-weight: 400;
+  font-display: swap;
+  src: url(https://fonts.gstatic.com/s/roboto/cyrillic-400.woff2) format('woff2');
+  unicode-range: U+0301, U+0400-045F;
+}
+/* latin */
+@font-face {
+  font-family: 'Roboto';
+  font-style: normal;
+  font-weight: 400;
+  font-display: swap;
+  src: url(https://fonts.gstatic.com/s/roboto/latin-400.woff2) format('woff2');
+  unicode-range: U+0000-00FF, U+2000-206F;
+}
+/* latin */
+@font-face {
+  font-family: 'Roboto';
+  font-style: normal;
+  font-weight: 700;
+  font-display: swap;
+  src: url(https://fonts.gstatic.com/s/roboto/latin-700.woff2) format('woff2');
+  unicode-range: U+0000-00FF, U+2000-206F;
+}
+"""
+
+    def setUp(self):
+        cache.clear()
+
+    def _fetch(self, url):
+        return self.GOOGLE_CSS.encode() if url.startswith(fonts.GOOGLE_CSS) else b"wOF2" + url.encode()
+
+    def test_only_used_weights_are_requested(self):
+        faces = fonts.used_faces()
+        self.assertIn((400, "normal"), faces["Roboto"])
+        self.assertTrue(all(weight in fonts.FAMILIES[family]
+                            for family, counter in faces.items() for weight, _ in counter))
+        self.assertNotIn((100, "normal"), faces["Raleway"])
+        self.assertLess(sum(len(counter) for counter in faces.values()), 20)
+        self.assertIn(("Roboto", 400, "normal"), fonts.preloads(faces))
+        self.assertEqual(fonts.snap(600, fonts.FAMILIES["Lato"]), 700)
+        self.assertEqual(fonts.snap(500, fonts.FAMILIES["Lato"]), 400)
+
+    def test_vendored_fonts_replace_the_google_stylesheet(self):
+        html = self.client.get(reverse("about")).content.decode()
+        self.assertIn("fonts.googleapis.com/css2?family=Roboto", html)
+
+        output = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, output)
+        with override_settings(STATICFILES_DIRS=[output, *settings.STATICFILES_DIRS]), \
+                mock.patch.object(fonts, "fetch", side_effect=self._fetch), \
+                mock.patch.object(fonts, "font_subset", None):
+            call_command("vendor_fonts", output=output, stdout=io.StringIO())
+            html = self.client.get(reverse("about")).content.decode()
+
+        directory = f"{output}/{fonts.FONT_DIR}"
+        self.assertEqual(sorted(f for f in os.listdir(directory) if f.endswith(".woff2")),
+                         ["roboto-400-latin.woff2", "roboto-700-latin.woff2"])
+        with open(f"{directory}/fonts.css") as f:
+            self.assertIn("font-display:swap", f.read())
+
+        self.assertNotIn("fonts.googleapis.com/css2?family=Roboto", html)
+        self.assertIn('href="/static/assets/vendor/fonts/roboto-400-latin.woff2" rel="preload" as="font"', html)
+        self.assertNotIn('roboto-700-latin.woff2" rel="preload"', html)
+        self.assertIn('src:url("/static/assets/vendor/fonts/roboto-700-latin.woff2")', html)
+
+
+class LazyMediaTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+
+    def test_footer_video_waits_for_the_viewport(self):
+        response = self.client.get(reverse("about"))
+        html = response.content.decode()
+
+        self.assertIn('preload="none" data-lazy-video', html)
+        self.assertIn('data-src="/static/assets/videos/footer-bg.mp4"', html)
+        self.assertNotIn(' src="/static/assets/videos/', html)
+        self.assertIn('data-poster="/static/assets/img/footer-bg-fallback.jpg"', html)
+        self.assertIn('alt="DravTech logo" fetchpriority="high" decoding="async"', html)
+        self.assertIn("Save-Data", response["Vary"])
+
+    def test_save_data_gets_a_lite_poster_only(self):
+        source, output = tempfile.mkdtemp(), tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, source)
+        self.addCleanup(shutil.rmtree, output)
+        os.makedirs(f"{source}/assets/img")
+        Image.effect_noise((1600, 900), 64).convert("RGB").save(f"{source}/assets/img/footer-bg-fallback.jpg", quality=95)
+
+        with override_settings(STATICFILES_DIRS=[output, source, *settings.STATICFILES_DIRS]):
+            html = self.client.get(reverse("about"), HTTP_SAVE_DATA="on").content.decode()
+            self.assertNotIn("<video", html)
+            self.assertIn('src="/static/assets/img/footer-bg-fallback.jpg" alt="" aria-hidden="true" loading="lazy"', html)
+
+            call_command("build_lite_posters", output=output, stdout=io.StringIO())
+            html = self.client.get(reverse("about"), HTTP_SAVE_DATA="on").content.decode()
+
+        lite = f"{output}/assets/img/footer-bg-fallback.lite.jpg"
+        self.assertLess(os.path.getsize(lite), os.path.getsize(f"{source}/assets/img/footer-bg-fallback.jpg"))
+        with Image.open(lite) as image:
+            self.assertEqual(image.width, 640)
+        self.assertIn('src="/static/assets/img/footer-bg-fallback.lite.jpg"', html)
+
+
+class LazyCardImageTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        override = override_settings(MEDIA_ROOT=media_root, MEDIA_URL="/media/")
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def test_product_grid_images_load_lazily(self):
+        buffer = io.BytesIO()
+        Image.new("RGB", (40, 20), "navy").save(buffer, "JPEG")
+        Product.objects.create(
+            title="Cap", category=Category.objects.create(name="Merch", slug="merch"),
+            product_type=Product.TYPE_MERCH, price=800,
+            image=SimpleUploadedFile("cap.jpg", buffer.getvalue(), content_type="image/jpeg"),
+        )
+        html = self.client.get(reverse("marketplace:products")).content.decode()
+        self.assertIn('alt="Cap" loading="lazy" decoding="async"', html)
+
+
+class FragmentCacheTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        TeamMember.objects.create(name="Ada", role="Engineer")
+
+    def test_card_grids_are_cached_until_their_rows_change(self):
+        self.client.get(reverse("about"))
+        with CaptureQueriesContext(connection) as queries:
+            html = self.client.get(reverse("about")).content.decode()
+        self.assertIn("Ada", html)
+        self.assertFalse([q for q in queries if "main_teammember" in q["sql"]])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            TeamMember.objects.create(name="Grace", role="Engineer")
+        html = self.client.get(reverse("about")).content.decode()
+        self.assertIn("Grace", html)
+
+    def test_misses_render_from_primary(self):
+        router, seen = routers.PrimaryReplicaRouter(), []
+
+        class Probe:
+            def __str__(self):
+                seen.append(router.db_for_read(TeamMember))
+                return ""
+
+        @routers.replica_reads
+        def view(request):
+            Template(
+                '{% load fragment_cache %}{% cachefragment "probe" models="main.TeamMember" %}{{ probe }}{% endcachefragment %}'
+            ).render(Context({"probe": Probe()}))
+            return HttpResponse()
+
+        with mock.patch('DravTech.routers.has_replica', return_value=True), \
+                mock.patch.object(connection, 'in_atomic_block', False):
+            view(RequestFactory().get('/'))
+        self.assertEqual(seen, ['default'])
+
+    def test_unknown_product_types_share_the_all_grid(self):
+        response = self.client.get(reverse("marketplace:products"), {"type": "xyz"})
+        self.assertEqual(response.context["type_filter"], "all")
+
+    def test_only_tracked_models_are_accepted(self):
+        Template('{% load fragment_cache %}{% cachefragment "x" models="main.TeamMember" %}{% endcachefragment %}')
+        with self.assertRaises(TemplateSyntaxError):
+            Template('{% load fragment_cache %}{% cachefragment "x" models="main.ContactMessage" %}{% endcachefragment %}')
@@ -1,5 +1,4 @@
 from django.conf import settings
-from django.core.mail import send_mail, EmailMultiAlternatives
 from django.template.loader import render_to_string
 from django.utils.html import strip_tags
 from django.http import JsonResponse
@@ -8,96 +7,42 @@ from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.views.decorators.http import require_POST
 from django.utils import timezone
+from django.db import transaction
 import logging
+from DravTech.database import serialized_write
+from DravTech.routers import replica_reads
 from .models import (
     AboutPage,
     CompanyValue,
     ContactMessage,
     HowWeWorkStep,
+    PricingPlan,
     Product,
     Project,
+    RelatedProject,
     SiteStat,
     TeamMember,
     Testimonial,
     TimelineEntry,
 )
 from .forms import ContactForm
+from . import outbox, related, similarity
+from .home_cache import get_home_context
 from services.models import Service, CaseStudy
 
+@replica_reads
 def home(request):
-   
-    # Get featured products from main Product model
-    featured_products = (
-        Product.objects.filter(is_active=True, is_featured=True)
-        .order_by('display_order', '-published_at', 'title')
-    )
-    
-    # Get products by category for marketplace section
-    digital_products = Product.objects.filter(
-        is_active=True, 
-        product_type=Product.TYPE_DIGITAL
-    ).order_by('display_order', 'title')
-    
-    merch_products = Product.objects.filter(
-        is_active=True, 
-        product_type=Product.TYPE_MERCH
-    ).order_by('display_order', 'title')
-    
-    artwork_products = Product.objects.filter(
-        is_active=True, 
-        product_type=Product.TYPE_ARTWORK
-    ).order_by('display_order', 'title')
-    
-    all_products = list(digital_products) + list(merch_products) + list(artwork_products)
-    
-    stats = SiteStat.objects.filter(is_active=True)
-    
-    # Get specific stats for contact section (limit to 3 for contact panel)
-    contact_stats = SiteStat.objects.filter(is_active=True)[:3]
-    
-    # Portfolio data grouped by categories (services)
-    projects = Project.objects.filter(is_active=True).prefetch_related('related_services')
-    categories = Service.objects.filter(is_active=True).order_by('display_order', 'title')
-    featured_services = Service.objects.filter(is_active=True, is_featured=True).order_by('display_order', 'title')
-    featured_case_studies = CaseStudy.objects.filter(is_active=True, is_featured=True).order_by('display_order', 'title')[:3]
-    
-    # Process case study results - split comma-separated strings into lists
-    for case_study in featured_case_studies:
-        if case_study.results:
-            case_study.results_list = [result.strip() for result in case_study.results.split(',')]
-        else:
-            case_study.results_list = []
-    
-    # Group projects by categories for filtering
-    projects_by_category = {}
-    for project in projects:
-        for service in project.related_services.filter(is_active=True):
-            if service not in projects_by_category:
-                projects_by_category[service] = []
-            projects_by_category[service].append(project)
-
-    return render(
-        request,
-        'index.html',
-        {
-            'categories': categories,
-            'featured_services': featured_services,
-            'featured_products': featured_products,
-            'digital_products': digital_products,
-            'merch_products': merch_products,
-            'artwork_products': artwork_products,
-            'all_products': all_products,
-            'stats': stats,
-            'contact_stats': contact_stats,
-            'projects': projects,
-            'categories': categories,
-            'projects_by_category': projects_by_category,
-            'featured_case_studies': featured_case_studies,
-            'form': ContactForm(),  # Add contact form for the contact section
-            'page_title': 'Home',
-            'page_description': 'Explore our digital products, services, and portfolio of successful projects.',
-        },
-    )
+    """
+    Homepage. Every section comes from the homepage cache, which is
+    invalidated by model signals (see main.home_cache / main.signals).
+    """
+    context = get_home_context()
+    context.update({
+        'form': ContactForm(),  # Add contact form for the contact section
+        'page_title': 'Home',
+        'page_description': 'Explore our digital products, services, and portfolio of successful projects.',
+    })
+    return render(request, 'index.html', context)
 
 
 def products_list(request):
@@ -117,12 +62,8 @@ def product_detail(request, slug):
         is_active=True,
     )
     
-    # Get related products (same category)
-    related_products = Product.objects.filter(
-        is_active=True,
-        category=product.category,
-        product_type=product.product_type
-    ).exclude(id=product.id).order_by('?')[:4]
+    # Related products: a rotating sample of the precomputed neighbours
+    related_products = related.sample(product, 4)
     
     # Get pricing plans for digital products
     pricing_plans = PricingPlan.objects.filter(
@@ -150,37 +91,27 @@ def get_client_ip(request):
 
 
 def send_confirmation_email(contact):
-    """Send a thank-you email to the person who submitted the form."""
+    """Queue a thank-you email to the person who submitted the form."""
     subject = f"We received your message — {contact.subject}"
 
     html_body = render_to_string('contact/emails/confirmation.html', {'contact': contact})
     text_body = strip_tags(html_body)
 
-    email = EmailMultiAlternatives(
-        subject=subject,
-        body=text_body,
-        from_email=settings.DEFAULT_FROM_EMAIL,
-        to=[contact.email],
-    )
-    email.attach_alternative(html_body, "text/html")
-    email.send(fail_silently=True)
+    outbox.enqueue(subject, text_body, [contact.email], html_body=html_body)
 
 
 def send_admin_notification(contact):
-    """Notify the admin team that a new message has arrived."""
+    """Queue a notice to the admin team that a new message has arrived."""
     subject = f"[{contact.get_priority_display()}] New Contact: {contact.subject}"
 
     html_body = render_to_string('contact/emails/admin_notification.html', {'contact': contact})
     text_body = strip_tags(html_body)
 
-    email = EmailMultiAlternatives(
-        subject=subject,
-        body=text_body,
-        from_email=settings.DEFAULT_FROM_EMAIL,
-        to=[settings.DEFAULT_CONTACT_EMAIL],   # Use the contact email from settings
+    outbox.enqueue(
+        subject, text_body,
+        [settings.DEFAULT_CONTACT_EMAIL],   # Use the contact email from settings
+        html_body=html_body,
     )
-    email.attach_alternative(html_body, "text/html")
-    email.send(fail_silently=True)
 
 
 
@@ -194,15 +125,20 @@ def contact(request):
         if form.is_valid():
             contact_message = form.save(commit=False)
             contact_message.ip_address = get_client_ip(request)
-            contact_message.save()
 
-            # Try sending emails safely
-            try:
-                send_confirmation_email(contact_message)
-                send_admin_notification(contact_message)
+            # One write transaction for the message and its queued emails
+            email_error = None
+            with serialized_write():
+                contact_message.save()
+                try:
+                    with transaction.atomic():
+                        send_confirmation_email(contact_message)
+                        send_admin_notification(contact_message)
+                except Exception as e:
+                    email_error = e
 
-            except Exception as e:
-                logger.error(f"Email sending failed: {e}")
+            if email_error is not None:
+                logger.error(f"Email sending failed: {email_error}")
 
                 messages.warning(
                     request,
@@ -241,7 +177,7 @@ def user_contact_history(request):
     # Get all contact submissions from this user's email
     user_submissions = ContactMessage.objects.filter(
         email=request.user.email
-    ).order_by('-created_at')
+    ).order_by('-submitted_at')
     
     return render(request, 'user/contact_history.html', {
         'user_submissions': user_submissions,
@@ -335,14 +271,8 @@ def request_demo(request):
             )
             
             try:
-                send_mail(
-                    subject,
-                    body,
-                    from_email,
-                    admin_emails,
-                    fail_silently=False,
-                )
-                print(f"✅ Demo request admin notification sent to {admin_emails}")
+                outbox.enqueue(subject, body, admin_emails, from_email=from_email)
+                print(f"✅ Demo request admin notification queued for {admin_emails}")
             except Exception as e:
                 print(f"❌ Failed to send demo request admin notification: {e}")
                 import traceback
@@ -385,15 +315,11 @@ def request_demo(request):
                 </html>
                 """
                 
-                send_mail(
-                    subject=confirmation_subject,
-                    message="",
-                    from_email=from_email,
-                    recipient_list=[inquiry.email],
-                    html_message=html_message,
-                    fail_silently=False,
+                outbox.enqueue(
+                    confirmation_subject, "", [inquiry.email],
+                    html_body=html_message, from_email=from_email,
                 )
-                print(f"✅ Demo confirmation email sent to {inquiry.email}")
+                print(f"✅ Demo confirmation email queued for {inquiry.email}")
             except Exception as e:
                 print(f"❌ Failed to send demo confirmation email: {e}")
                 import traceback
@@ -430,6 +356,7 @@ def demo_confirmation(request):
     return render(request, 'main/demo_confirmation.html', context)
 
 
+@replica_reads
 def about(request):
     """
     About page with a single shared background image and dynamic sections.
@@ -567,13 +494,7 @@ Submitted: {timezone.now().strftime('%Y-%m-%d %H:%M:%S')}
             
             if admin_emails:
                 try:
-                    send_mail(
-                        subject,
-                        body,
-                        from_email,
-                        admin_emails,
-                        fail_silently=True,
-                    )
+                    outbox.enqueue(subject, body, admin_emails, from_email=from_email)
                 except Exception:
                     pass
             
@@ -594,13 +515,8 @@ We look forward to working with you!
 Best regards,
 The DravTech Team"""
                 
-                send_mail(
-                    confirmation_subject,
-                    confirmation_body,
-                    from_email,
-                    [email],
-                    fail_silently=True,
-                )
+                outbox.enqueue(confirmation_subject, confirmation_body, [email],
+                               from_email=from_email)
             except Exception:
                 pass
             
@@ -643,20 +559,12 @@ def project_detail(request, slug):
     """Display detailed information about a specific project."""
     project = get_object_or_404(Project, slug=slug, is_active=True)
     
-    # Get related projects (excluding current project)
-    related_projects = Project.objects.filter(
-        is_active=True
-    ).exclude(id=project.id)
-    
-    # If project has related services, prioritize projects with same services
-    if project.related_services.exists():
-        related_services = project.related_services.all()
-        related_projects = related_projects.filter(
-            related_services__in=related_services
-        ).distinct()
-    
-    # Limit to 6 related projects
-    related_projects = related_projects[:6]
+    # Related projects, precomputed and ranked (see main.similarity)
+    related_projects = [
+        link.related for link in
+        RelatedProject.objects.filter(project=project, related__is_active=True)
+        .select_related('related')[:similarity.limit()]
+    ]
     
     context = {
         'project': project,
@@ -0,0 +1,185 @@
+# marketplace/carts.py
+"""
+Database-backed carts.
+
+A visitor's cart is found by their user id or, when anonymous, by the
+session key taken from the cookie, so looking it up never decodes the
+session itself. Adding, removing and changing a quantity each touch one
+CartItem row.
+
+On login the anonymous cart is folded into the user's cart. Django rotates
+the session key during login, so a new anonymous cart also stores its id
+in the session once; that is the only session write the cart makes.
+
+The header badge polls `cart_count`, which reads a signed summary cookie
+written by every mutation instead of the session or the cart rows.
+"""
+import json
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import DecimalField, ExpressionWrapper, F, Sum
+
+from .models import Cart, CartItem
+
+SESSION_CART_ID = "cart_id"
+
+SUMMARY_COOKIE = "cart_summary"
+SUMMARY_SALT   = "marketplace.carts.summary"
+
+
+def _owner(request):
+    if request.user.is_authenticated:
+        return {"user": request.user}
+    if request.session.session_key:
+        return {"session_key": request.session.session_key}
+    return None
+
+
+def get_cart(request, create=False):
+    """The request's cart, or None when it has none and `create` is False."""
+    if hasattr(request, "_cart"):
+        if request._cart is not None or not create:
+            return request._cart
+
+    owner = _owner(request)
+    cart  = Cart.objects.filter(**owner).first() if owner else None
+    if cart is None and create:
+        if owner is None:
+            request.session.save()          # allocate a session key
+            owner = _owner(request)
+        cart, created = Cart.objects.get_or_create(**owner)
+        if created and not request.user.is_authenticated:
+            request.session[SESSION_CART_ID] = cart.pk
+    request._cart = cart
+    return cart
+
+
+def add(cart, product_id, quantity=1):
+    line = CartItem.objects.filter(cart=cart, product_id=product_id)
+    if line.update(quantity=F("quantity") + quantity):
+        return
+    try:
+        with transaction.atomic():
+            CartItem.objects.create(cart=cart, product_id=product_id, quantity=quantity)
+    except IntegrityError:
+        # A concurrent click created the row first.
+        line.update(quantity=F("quantity") + quantity)
+
+
+def remove(cart, product_id):
+    return CartItem.objects.filter(cart=cart, product_id=product_id).delete()[0] > 0
+
+
+def set_quantity(cart, product_id, quantity):
+    return CartItem.objects.filter(cart=cart, product_id=product_id).update(quantity=quantity) > 0
+
+
+def clear(cart):
+    CartItem.objects.filter(cart=cart).delete()
+
+
+def summary(cart):
+    """(item count, subtotal) for the badge, in one aggregate query."""
+    if cart is None:
+        return 0, Decimal("0.00")
+    totals = CartItem.objects.filter(cart=cart, product__is_active=True).aggregate(
+        count=Sum("quantity"),
+        subtotal=Sum(ExpressionWrapper(
+            F("quantity") * F("product__price"),
+            output_field=DecimalField(max_digits=14, decimal_places=2),
+        )),
+    )
+    subtotal = (totals["subtotal"] or Decimal("0")).quantize(Decimal("0.01"))
+    return totals["count"] or 0, subtotal
+
+
+# ── Badge cookie ─────────────────────────────
+#
+# Every cart mutation writes the count and subtotal into a small signed
+# cookie bound to the current session key, so the polled badge endpoint can
+# answer from the request alone. Login and logout rotate the session key,
+# which makes the cookie stale and sends the next read to the database.
+
+def _session_cookie(request):
+    return request.COOKIES.get(settings.SESSION_COOKIE_NAME, "")
+
+
+def set_summary_cookie(response, request, count, subtotal):
+    # The session key may be new in this response (first add), so prefer it.
+    session_key = getattr(request, "session", None) and request.session.session_key
+    payload = json.dumps({
+        "k": session_key or _session_cookie(request),
+        "n": count,
+        "t": str(subtotal),
+    }, separators=(",", ":"))
+    response.set_signed_cookie(
+        SUMMARY_COOKIE, payload, salt=SUMMARY_SALT,
+        max_age=settings.SESSION_COOKIE_AGE, httponly=True, samesite="Lax",
+        secure=settings.SESSION_COOKIE_SECURE,
+    )
+    return response
+
+
+def read_summary_cookie(request):
+    """(count, subtotal) from the badge cookie, or None if missing or stale."""
+    raw = request.get_signed_cookie(SUMMARY_COOKIE, default=None, salt=SUMMARY_SALT)
+    if raw is None:
+        return None
+    try:
+        data = json.loads(raw)
+        if data["k"] != _session_cookie(request) or not data["k"]:
+            return None
+        return int(data["n"]), Decimal(data["t"])
+    except (ValueError, KeyError, TypeError, ArithmeticError):
+        return None
+
+
+def items(cart):
+    """Cart items with their active products, in one query."""
+    if cart is None:
+        return []
+    return list(
+        CartItem.objects.filter(cart=cart, product__is_active=True)
+        .select_related("product")
+    )
+
+
+def as_dict(cart_items):
+    """
+    The {product_id: {...}} shape the cart and checkout templates render,
+    built from live product rows.
+    """
+    cart = {}
+    for item in cart_items:
+        product = item.product
+        cart[str(product.pk)] = {
+            "id":              product.pk,
+            "name":            product.title,
+            "price":           str(product.price or 0),
+            "quantity":        item.quantity,
+            "image":           product.image.url if product.image else "",
+            "product_type":    product.product_type,
+            "needs_shipping":  product.needs_shipping,
+            "is_downloadable": product.is_downloadable,
+            "slug":            product.slug,
+        }
+    return cart
+
+
+def merge_anonymous_cart(request, user):
+    """Fold the pre-login session cart into `user`'s cart."""
+    cart_id = request.session.pop(SESSION_CART_ID, None)
+    if cart_id is None:
+        return
+    anonymous = Cart.objects.filter(pk=cart_id, user__isnull=True).first()
+    if anonymous is None:
+        return
+
+    with transaction.atomic():
+        target, _ = Cart.objects.get_or_create(user=user)
+        for item in anonymous.items.all():
+            add(target, item.product_id, item.quantity)
+        anonymous.delete()
+    request._cart = target
@@ -0,0 +1,158 @@
+# marketplace/catalog.py
+"""
+Versioned catalog snapshot and cursor pages for the marketplace hub.
+
+The hub inlines only its first screen: one page of compact product rows plus
+per-type counts. Later pages come from /marketplace/api/catalog/ as the
+visitor scrolls. Both are stored in the cache under the current catalog
+version, and `marketplace.signals` bumps the version whenever a Product,
+PricingPlan or Category changes, so stale entries are simply never read.
+They expire after MARKETPLACE_CATALOG_PAGE_TIMEOUT, so superseded
+versions don't pile up in a shared cache.
+
+Pages use a keyset cursor over (display_order, title, id), so page N costs
+the same as page 1 however large the catalog is.
+"""
+import base64
+import hashlib
+import json
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q
+
+from main.models import Product
+from .serializers import CatalogItemSerializer
+
+VERSION_KEY  = "marketplace:catalog:version"
+SNAPSHOT_KEY = "marketplace:catalog:{version}"
+PAGE_KEY     = "marketplace:catalog:{version}:{product_type}:{cursor}"
+
+# Escape characters that could close the surrounding <script> tag.
+_JSON_SCRIPT_ESCAPES = {ord(">"): "\\u003E", ord("<"): "\\u003C", ord("&"): "\\u0026"}
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def page_size():
+    return getattr(settings, "MARKETPLACE_CATALOG_PAGE_SIZE", 24)
+
+
+def timeout():
+    return getattr(settings, "MARKETPLACE_CATALOG_PAGE_TIMEOUT", 60 * 60)
+
+
+def catalog_queryset():
+    """Active products with their category; the "from" price is a column."""
+    return (
+        Product.objects.filter(is_active=True)
+        .select_related("category")
+        .order_by("display_order", "title", "id")
+    )
+
+
+# ── Cursors ──────────────────────────────────
+
+def encode_cursor(product):
+    raw = json.dumps([product.display_order, product.title, product.id])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        display_order, title, pk = json.loads(base64.urlsafe_b64decode(padded))
+        return int(display_order), str(title), int(pk)
+    except (ValueError, TypeError):
+        raise InvalidCursor(cursor)
+
+
+def _after(cursor):
+    display_order, title, pk = decode_cursor(cursor)
+    return (
+        Q(display_order__gt=display_order)
+        | Q(display_order=display_order, title__gt=title)
+        | Q(display_order=display_order, title=title, id__gt=pk)
+    )
+
+
+def build_page(cursor=None, product_type=None):
+    """One page of compact rows plus the cursor for the next page (or None)."""
+    qs = catalog_queryset()
+    if product_type:
+        qs = qs.filter(product_type=product_type)
+    if cursor:
+        qs = qs.filter(_after(cursor))
+
+    size  = page_size()
+    rows  = list(qs[:size + 1])
+    items = rows[:size]
+    return {
+        "items": CatalogItemSerializer(items, many=True).data,
+        "next":  encode_cursor(items[-1]) if len(rows) > size else None,
+    }
+
+
+def get_page(cursor=None, product_type=None):
+    """Cached `build_page` for the current catalog version."""
+    if cursor:
+        decode_cursor(cursor)  # reject garbage before it reaches the cache
+    key = PAGE_KEY.format(
+        version=current_version(),
+        product_type=product_type or "all",
+        cursor=hashlib.md5(cursor.encode()).hexdigest() if cursor else "-",
+    )
+    page = cache.get(key)
+    if page is None:
+        page = build_page(cursor, product_type)
+        cache.set(key, page, timeout())
+    return page
+
+
+# ── Hub snapshot ─────────────────────────────
+
+def build_snapshot():
+    counts = dict(
+        Product.objects.filter(is_active=True)
+        .values_list("product_type")
+        .annotate(n=Count("id"))
+        .order_by()
+    )
+    data = build_page()
+    data["counts"] = counts
+    return json.dumps(data).translate(_JSON_SCRIPT_ESCAPES)
+
+
+def _initial_version():
+    # Seeded from the clock so an evicted version key never resurrects an
+    # older snapshot that is still sitting in the cache.
+    return int(time.time() * 1000)
+
+
+def current_version():
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, _initial_version(), None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+def get_catalog_json():
+    """Serialized first screen for the current version, built on first use."""
+    key  = SNAPSHOT_KEY.format(version=current_version())
+    blob = cache.get(key)
+    if blob is None:
+        blob = build_snapshot()
+        cache.set(key, blob, timeout())
+    return blob
+
+
+def bump_version():
+    """Invalidate the current snapshot; the next hub request rebuilds it."""
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, _initial_version(), None)
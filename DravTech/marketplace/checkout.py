@@ -0,0 +1,69 @@
+# marketplace/checkout.py
+"""
+Checkout write path.
+
+Cart rows only hold product ids and quantities. `price_lines` takes
+prices, titles and shipping needs from the product rows loaded with them
+(see marketplace.carts.items), never from anything the client sent.
+`create_order` then writes the address, the order and all of its items
+in one transaction with a fixed number of queries, whatever the size of
+the cart.
+"""
+from decimal import Decimal
+
+from django.db import transaction
+
+from .models import Order, OrderItem, ShippingAddress
+
+SHIPPING_FLAT_RATE = Decimal("300.00")   # KES flat rate; swap for real logic
+
+SHIPPING_FIELDS = (
+    "full_name", "phone", "email", "address_1", "address_2",
+    "city", "county", "postal_code", "country",
+)
+
+
+def price_lines(cart_items):
+    """
+    Price cart items (with their products loaded) from the database.
+    Returns (lines, subtotal, has_physical); each line is
+    (product, quantity, unit_price).
+    """
+    lines = [
+        (item.product, item.quantity, item.product.price or Decimal("0"))
+        for item in cart_items
+    ]
+    subtotal     = sum((price * quantity for _, quantity, price in lines), Decimal("0"))
+    has_physical = any(product.needs_shipping for product, _, _ in lines)
+    return lines, subtotal, has_physical
+
+
+@transaction.atomic
+def create_order(lines, shipping_cost, customer=None, email="", shipping=None):
+    """Persist address, order and items together; all or nothing."""
+    shipping_addr = ShippingAddress.objects.create(**shipping) if shipping else None
+    subtotal      = sum((price * quantity for _, quantity, price in lines), Decimal("0"))
+
+    order = Order.objects.create(
+        customer           = customer,
+        email              = email,
+        subtotal           = subtotal,
+        shipping_cost      = shipping_cost,
+        total              = subtotal + shipping_cost,
+        has_physical_items = shipping_addr is not None,
+        shipping_address   = shipping_addr,
+        status             = Order.STATUS_PENDING,
+        payment_status     = Order.PAYMENT_PENDING,
+    )
+    OrderItem.objects.bulk_create([
+        OrderItem(
+            order         = order,
+            product       = product,
+            product_title = product.title,       # snapshot title
+            product_type  = product.product_type,
+            unit_price    = price,
+            quantity      = quantity,
+        )
+        for product, quantity, price in lines
+    ])
+    return order
@@ -0,0 +1,134 @@
+# marketplace/delivery.py
+"""
+File delivery for paid downloads.
+
+`serve_download` streams a file in fixed-size chunks (never reading it
+whole), honours single `Range: bytes=…` requests with `If-Range`
+validation so interrupted downloads can resume, and labels every response
+with an ETag built from the file's size and mtime.
+
+`on_complete` is called only once the last byte of the file has been
+handed to the server, so a transfer that dies midway does not cost the
+buyer a download.
+
+Setting DOWNLOAD_OFFLOAD to "x-accel" (nginx) or "x-sendfile" (Apache,
+lighttpd) hands the transfer to the front-end server instead; Range
+handling is then the server's job and `on_complete` runs at hand-off.
+"""
+import mimetypes
+import os
+import re
+
+from django.conf import settings
+from django.http import HttpResponse, StreamingHttpResponse
+from django.utils.http import content_disposition_header, http_date, quote_etag
+
+CHUNK_SIZE = 64 * 1024
+
+_RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def file_etag(stat):
+    return quote_etag(f"{stat.st_size:x}-{stat.st_mtime_ns:x}")
+
+
+def parse_range(header, size):
+    """
+    Return (start, end) inclusive for a single byte range, None to send the
+    whole file (no header, multi-range or malformed), or raise ValueError
+    when the range cannot be satisfied.
+    """
+    match = _RANGE_RE.match(header.replace(" ", "")) if header else None
+    if not match or match.group(1) == match.group(2) == "":
+        return None
+    first, last = match.groups()
+    if first == "":                     # suffix range: last N bytes
+        length = int(last)
+        if length == 0:
+            raise ValueError("empty suffix range")
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end   = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise ValueError("range outside file")
+    return start, end
+
+
+def _if_range_matches(request, etag, stat):
+    validator = request.headers.get("If-Range")
+    if not validator:
+        return True
+    return validator.strip() in (etag, http_date(stat.st_mtime))
+
+
+def _stream(path, start, end, on_complete):
+    remaining = end - start + 1
+    with open(path, "rb") as f:
+        f.seek(start)
+        while remaining:
+            chunk = f.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                return          # file shrank underneath us: not a completed download
+            remaining -= len(chunk)
+            yield chunk
+    if on_complete is not None:
+        on_complete()
+
+
+def _offload(path, headers):
+    mode     = getattr(settings, "DOWNLOAD_OFFLOAD", "")
+    response = HttpResponse(headers=headers)
+    if mode == "x-accel":
+        relative = os.path.relpath(path, settings.MEDIA_ROOT).replace(os.sep, "/")
+        response["X-Accel-Redirect"] = settings.DOWNLOAD_ACCEL_PREFIX.rstrip("/") + "/" + relative
+    else:
+        response["X-Sendfile"] = path
+    # The front-end server fills in the body and its own Content-Type.
+    del response["Content-Type"]
+    return response
+
+
+def serve_download(request, path, filename, on_complete=None):
+    stat         = os.stat(path)
+    etag         = file_etag(stat)
+    content_type = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+    headers      = {
+        "ETag":          etag,
+        "Last-Modified": http_date(stat.st_mtime),
+        "Accept-Ranges": "bytes",
+        "Cache-Control": "private, no-transform",
+    }
+
+    if getattr(settings, "DOWNLOAD_OFFLOAD", ""):
+        response = _offload(path, headers)
+        response["Content-Disposition"] = content_disposition_header(True, filename)
+        if on_complete is not None:
+            on_complete()
+        return response
+
+    byte_range = None
+    if _if_range_matches(request, etag, stat):
+        try:
+            byte_range = parse_range(request.headers.get("Range"), stat.st_size)
+        except ValueError:
+            response = HttpResponse(status=416, headers=headers)
+            response["Content-Range"] = f"bytes */{stat.st_size}"
+            return response
+
+    if byte_range is None:
+        start, end, status = 0, stat.st_size - 1, 200
+    else:
+        (start, end), status = byte_range, 206
+
+    # Only a transfer that reaches the last byte counts as a download; an
+    # earlier partial range of a resumed download does not.
+    reaches_end = end == stat.st_size - 1
+    response = StreamingHttpResponse(
+        _stream(path, start, end, on_complete if reaches_end else None),
+        status=status, content_type=content_type, headers=headers,
+    )
+    response["Content-Length"] = str(end - start + 1)
+    if status == 206:
+        response["Content-Range"] = f"bytes {start}-{end}/{stat.st_size}"
+    response["Content-Disposition"] = content_disposition_header(True, filename)
+    return response
@@ -0,0 +1,62 @@
+# marketplace/idempotency.py
+"""
+Idempotency keys for order creation.
+
+The checkout form carries a random `idempotency_key` field, and API clients
+send an `Idempotency-Key` header. The first request that completes with a
+key stores its outcome (a redirect location or a response body) in the
+same transaction as the order. The unique (scope, key) constraint makes a
+concurrent duplicate fail its insert and roll back. Later duplicates find
+the stored row with one indexed lookup and replay it, so no second order
+is written and no second set of emails is sent.
+"""
+import re
+import uuid
+
+from django.db import IntegrityError, transaction
+
+from .models import IdempotencyKey
+
+HEADER     = "Idempotency-Key"
+FORM_FIELD = "idempotency_key"
+
+_VALID_KEY = re.compile(r"^[A-Za-z0-9_\-:.]{8,64}$")
+
+
+def new_key():
+    return uuid.uuid4().hex
+
+
+def key_from(request):
+    """The request's idempotency key (header first, then form field), or None."""
+    key = request.headers.get(HEADER) or request.POST.get(FORM_FIELD, "")
+    key = key.strip()
+    return key if _VALID_KEY.match(key) else None
+
+
+def lookup(scope, key):
+    if not key:
+        return None
+    return IdempotencyKey.objects.filter(scope=scope, key=key).first()
+
+
+def run_once(scope, key, create, user=None):
+    """
+    Call `create()` inside a transaction and store what it returns unless
+    `key` was already used. `create` returns (order, fields) where `fields`
+    holds response_status / response_body / location to replay later.
+    Returns (IdempotencyKey, created).
+    """
+    try:
+        with transaction.atomic():
+            order, fields = create()
+            record = IdempotencyKey.objects.create(
+                scope=scope, key=key, user=user, order=order, **fields,
+            )
+        return record, True
+    except IntegrityError:
+        # A concurrent request with the same key won the insert.
+        existing = lookup(scope, key)
+        if existing is None:
+            raise
+        return existing, False
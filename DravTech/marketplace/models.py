@@ -135,6 +135,9 @@ class Order(models.Model):
 
     class Meta:
         ordering = ["-created_at"]
+        indexes  = [
+            models.Index(fields=["customer", "-created_at"], name="order_customer_created_idx"),
+        ]
 
     def recalculate_totals(self):
         self.subtotal = sum(item.line_total for item in self.items.all())
@@ -171,6 +174,42 @@ class OrderItem(models.Model):
         return f"{self.product_title} × {self.quantity}"
 
 
+# ─────────────────────────────────────────────
+#  CART
+# ─────────────────────────────────────────────
+
+class Cart(models.Model):
+    """
+    A shopping cart owned by a user or, before login, by a session key.
+    Quantities live on CartItem rows so each click is one small write.
+    See marketplace.carts.
+    """
+    user        = models.OneToOneField(User, on_delete=models.CASCADE,
+                      null=True, blank=True, related_name="cart")
+    session_key = models.CharField(max_length=40, null=True, blank=True, unique=True)
+    created_at  = models.DateTimeField(auto_now_add=True)
+    updated_at  = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Cart #{self.pk} ({self.user or 'anonymous'})"
+
+
+class CartItem(models.Model):
+    cart     = models.ForeignKey(Cart, on_delete=models.CASCADE, related_name="items")
+    product  = models.ForeignKey(Product, on_delete=models.CASCADE, related_name="+")
+    quantity = models.PositiveIntegerField(default=1)
+    added_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering    = ["added_at", "id"]
+        constraints = [
+            models.UniqueConstraint(fields=["cart", "product"], name="unique_cart_product"),
+        ]
+
+    def __str__(self):
+        return f"{self.product} × {self.quantity}"
+
+
 # ─────────────────────────────────────────────
 #  DOWNLOAD ACCESS
 # ─────────────────────────────────────────────
@@ -228,3 +267,41 @@ class SupportTicket(models.Model):
 
     def __str__(self):
         return self.subject
+
+
+# ─────────────────────────────────────────────
+#  IDEMPOTENCY KEYS
+# ─────────────────────────────────────────────
+
+class IdempotencyKey(models.Model):
+    """
+    Remembers the outcome of an order-creating request so a double submit
+    or proxy retry with the same key replays it instead of ordering twice.
+    See marketplace.idempotency.
+    """
+    SCOPE_CHECKOUT  = "checkout"
+    SCOPE_API_ORDER = "api-order"
+
+    SCOPE_CHOICES = [
+        (SCOPE_CHECKOUT,  "Checkout form"),
+        (SCOPE_API_ORDER, "Orders API"),
+    ]
+
+    scope           = models.CharField(max_length=20, choices=SCOPE_CHOICES)
+    key             = models.CharField(max_length=64)
+    user            = models.ForeignKey(User, on_delete=models.CASCADE,
+                          null=True, blank=True, related_name="+")
+    order           = models.ForeignKey(Order, on_delete=models.CASCADE,
+                          null=True, blank=True, related_name="+")
+    response_status = models.PositiveSmallIntegerField(default=200)
+    response_body   = models.JSONField(null=True, blank=True)
+    location        = models.CharField(max_length=255, blank=True)
+    created_at      = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["scope", "key"], name="unique_idempotency_key"),
+        ]
+
+    def __str__(self):
+        return f"{self.scope}:{self.key}"
@@ -1,4 +1,8 @@
+from decimal import Decimal
+
+from django.utils.text import Truncator
 from rest_framework import serializers
+from . import checkout
 from .models import Product, Booking, Order, OrderItem, SupportTicket
 
 class ProductSerializer(serializers.ModelSerializer):
@@ -13,6 +17,8 @@ class ProductSerializer(serializers.ModelSerializer):
             "description",
             "product_type",
             "price",
+            "min_plan_price",
+            "active_plan_count",
             "formatted_price",
             "image_url",
         ]
@@ -24,7 +30,10 @@ class ProductSerializer(serializers.ModelSerializer):
         return None
 
     def get_formatted_price(self, obj):
-        return f"KES {obj.price:,.2f}"
+        price = obj.price if obj.price is not None else obj.min_plan_price
+        if price is None:
+            return None
+        return f"KES {price:,.2f}"
 class BookingSerializer(serializers.ModelSerializer):
     class Meta:
         model = Booking
@@ -42,13 +51,53 @@ class OrderSerializer(serializers.ModelSerializer):
         fields = ["id", "status", "items", "created_at"]
 
     def create(self, validated_data):
+        # Same write path as the checkout form: DB prices, one transaction.
         items_data = validated_data.pop("items")
-        order = Order.objects.create(**validated_data)
-        for item in items_data:
-            OrderItem.objects.create(order=order, **item)
-        return order
+        lines = [
+            (item["product"], item.get("quantity", 1), item["product"].price or Decimal("0"))
+            for item in items_data
+        ]
+        return checkout.create_order(lines, Decimal("0"), customer=validated_data.get("customer"))
 class SupportTicketSerializer(serializers.ModelSerializer):
     class Meta:
         model = SupportTicket
         fields = "__all__"
         read_only_fields = ["customer", "status"]
+class CatalogItemSerializer(serializers.ModelSerializer):
+    """
+    Compact catalog row for the hub and /api/catalog/. Short keys keep the
+    payload small; the hub script expands them back into full names.
+    Expects products from marketplace.catalog.catalog_queryset().
+    """
+    i   = serializers.IntegerField(source="id")
+    t   = serializers.CharField(source="title")
+    s   = serializers.CharField(source="slug")
+    d   = serializers.SerializerMethodField()
+    p   = serializers.SerializerMethodField()
+    m   = serializers.SerializerMethodField()
+    y   = serializers.CharField(source="product_type")
+    img = serializers.SerializerMethodField()
+    c   = serializers.SerializerMethodField()
+
+    DESCRIPTION_LENGTH = 160
+
+    class Meta:
+        model = Product
+        fields = ["i", "t", "s", "d", "p", "m", "y", "img", "c"]
+
+    def get_d(self, obj):
+        return Truncator(obj.description).chars(self.DESCRIPTION_LENGTH)
+
+    def get_p(self, obj):
+        return float(obj.price) if obj.price is not None else None
+
+    def get_m(self, obj):
+        if obj.product_type == Product.TYPE_DIGITAL and obj.min_plan_price:
+            return float(obj.min_plan_price)
+        return None
+
+    def get_img(self, obj):
+        return obj.image.url if obj.image else None
+
+    def get_c(self, obj):
+        return obj.category.name if obj.category else None
@@ -0,0 +1,23 @@
+# marketplace/signals.py
+from django.contrib.auth.signals import user_logged_in
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from main.models import Category, PricingPlan, Product
+from . import carts, catalog
+
+CATALOG_MODELS = (Product, PricingPlan, Category)
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def bump_catalog_version(sender, **kwargs):
+    if sender in CATALOG_MODELS:
+        transaction.on_commit(catalog.bump_version)
+
+
+@receiver(user_logged_in)
+def merge_cart_on_login(sender, request, user, **kwargs):
+    if request is not None and hasattr(request, "session"):
+        carts.merge_anonymous_cart(request, user)
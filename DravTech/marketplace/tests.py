@@ -1,3 +1,374 @@
-from django.test import TestCase
+import json
+import shutil
+import tempfile
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.db import IntegrityError, connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from main.models import Category, OutboxEmail, PricingPlan, Product
+from . import carts, catalog
+from .models import Cart, CartItem, Order, PurchasedDownload, ShippingAddress
+
+
+class CatalogSnapshotTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.category = Category.objects.create(name="Systems", slug="systems")
+
+    def setUp(self):
+        cache.clear()
+
+    def _add_digital(self, title, *prices):
+        product = Product.objects.create(
+            title=title, category=self.category, product_type=Product.TYPE_DIGITAL
+        )
+        for price in prices:
+            PricingPlan.objects.create(
+                product=product, name=f"Plan {price}", price=price,
+                billing_type=PricingPlan.BILLING_MONTHLY,
+            )
+        return product
+
+    def _hub_products(self):
+        response = self.client.get(reverse("marketplace:marketplace"))
+        self.assertEqual(response.status_code, 200)
+        return json.loads(response.context["catalog"])["items"]
+
+    def test_snapshot_uses_cheapest_active_plan(self):
+        self._add_digital("ERP", 9000, 4000)
+        products = self._hub_products()
+        self.assertEqual(products[0]["m"], 4000.0)
+        self.assertEqual(products[0]["c"], "Systems")
+
+    def test_warm_hub_does_not_touch_products(self):
+        for i in range(5):
+            self._add_digital(f"Product {i}", 1000 + i)
+        self._hub_products()
+        # featured_products is a lazy slice the template never evaluates.
+        with self.assertNumQueries(0):
+            self.client.get(reverse("marketplace:marketplace"))
+
+    def test_plan_change_rebuilds_snapshot(self):
+        product = self._add_digital("CRM", 5000)
+        self._hub_products()
+        with self.captureOnCommitCallbacks(execute=True):
+            PricingPlan.objects.create(
+                product=product, name="Lite", price=1500,
+                billing_type=PricingPlan.BILLING_MONTHLY,
+            )
+        self.assertEqual(self._hub_products()[0]["m"], 1500.0)
+
+    @override_settings(MARKETPLACE_CATALOG_PAGE_TIMEOUT=120)
+    def test_snapshots_expire(self):
+        with mock.patch("marketplace.catalog.cache.set") as cache_set:
+            catalog.get_catalog_json()
+        self.assertEqual(cache_set.call_args.args[2], 120)
+
+
+@override_settings(MARKETPLACE_CATALOG_PAGE_SIZE=2)
+class CatalogEndpointTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        category = Category.objects.create(name="Merch", slug="merch")
+        for i in range(5):
+            Product.objects.create(
+                title=f"Tee {i}", category=category,
+                product_type=Product.TYPE_MERCH, price=1000, display_order=i,
+            )
+
+    def setUp(self):
+        cache.clear()
+        self.url = reverse("marketplace:api-catalog-list")
+
+    def test_cursor_walks_every_product_once(self):
+        titles, cursor = [], None
+        while True:
+            response = self.client.get(self.url, {"cursor": cursor} if cursor else {})
+            self.assertEqual(response.status_code, 200)
+            titles += [row["t"] for row in response.json()["items"]]
+            cursor = response.json()["next"]
+            if not cursor:
+                break
+        self.assertEqual(titles, [f"Tee {i}" for i in range(5)])
+
+    def test_hub_inlines_first_page_and_counts(self):
+        response = self.client.get(reverse("marketplace:marketplace"))
+        data = json.loads(response.context["catalog"])
+        self.assertEqual(len(data["items"]), 2)
+        self.assertEqual(data["counts"], {Product.TYPE_MERCH: 5})
+        self.assertIsNotNone(data["next"])
+
+    def test_matching_etag_returns_not_modified(self):
+        etag = self.client.get(self.url)["ETag"]
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_bad_cursor_is_rejected(self):
+        response = self.client.get(self.url, {"cursor": "not-a-cursor"})
+        self.assertEqual(response.status_code, 400)
+
+
+class DownloadDeliveryTests(TestCase):
+    PAYLOAD = bytes(range(256)) * 400      # 100 KiB, more than one chunk
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        override = override_settings(MEDIA_ROOT=media_root)
+        override.enable()
+        self.addCleanup(override.disable)
+
+        user    = User.objects.create_user("buyer", password="pw")
+        category = Category.objects.create(name="Artwork", slug="artwork")
+        product  = Product.objects.create(
+            title="Sunrise", category=category,
+            product_type=Product.TYPE_ARTWORK, is_downloadable=True,
+        )
+        product.download_file.save("sunrise.png", ContentFile(self.PAYLOAD))
+        order = Order.objects.create(customer=user, payment_status=Order.PAYMENT_PAID)
+        self.purchase = PurchasedDownload.objects.create(order=order, product=product)
+        self.url = reverse("marketplace:download-artwork", args=[product.id])
+        self.client.force_login(user)
+
+    def _count(self):
+        self.purchase.refresh_from_db()
+        return self.purchase.download_count
+
+    def test_full_download_streams_and_counts_once_consumed(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertIn('filename="sunrise.png"', response["Content-Disposition"])
+        self.assertEqual(self._count(), 0)
+
+        self.assertEqual(b"".join(response.streaming_content), self.PAYLOAD)
+        self.assertEqual(self._count(), 1)
+
+    def test_resumed_download_counts_only_the_final_range(self):
+        first = self.client.get(self.url, HTTP_RANGE="bytes=0-999")
+        self.assertEqual(first.status_code, 206)
+        self.assertEqual(first["Content-Range"], f"bytes 0-999/{len(self.PAYLOAD)}")
+        self.assertEqual(b"".join(first.streaming_content), self.PAYLOAD[:1000])
+        self.assertEqual(self._count(), 0)
+
+        rest = self.client.get(self.url, HTTP_RANGE="bytes=1000-", HTTP_IF_RANGE=first["ETag"])
+        self.assertEqual(rest.status_code, 206)
+        self.assertEqual(b"".join(rest.streaming_content), self.PAYLOAD[1000:])
+        self.assertEqual(self._count(), 1)
+
+    def test_stale_if_range_sends_whole_file(self):
+        response = self.client.get(self.url, HTTP_RANGE="bytes=0-9", HTTP_IF_RANGE='"stale"')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Length"], str(len(self.PAYLOAD)))
+
+    def test_unsatisfiable_range(self):
+        response = self.client.get(self.url, HTTP_RANGE=f"bytes={len(self.PAYLOAD)}-")
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(self._count(), 0)
+
+    @override_settings(DOWNLOAD_OFFLOAD="x-accel", DOWNLOAD_ACCEL_PREFIX="/protected-media/")
+    def test_x_accel_offload(self):
+        response = self.client.get(self.url)
+        self.assertTrue(response["X-Accel-Redirect"].startswith("/protected-media/blobs/"))
+        self.assertEqual(response.content, b"")
+        self.assertEqual(self._count(), 1)
+
+
+class CheckoutTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        category = Category.objects.create(name="Merch", slug="merch")
+        cls.products = [
+            Product.objects.create(
+                title=f"Tee {i}", category=category,
+                product_type=Product.TYPE_MERCH, price=1000 + i,
+            )
+            for i in range(5)
+        ]
+
+    def _fill_cart(self, products):
+        for product in products:
+            self.client.post(reverse("marketplace:add-to-cart", args=[product.id]))
+
+    def _checkout(self):
+        return self.client.post(reverse("marketplace:checkout"), {
+            "full_name": "Ada", "phone": "0700000000", "email": "ada@example.com",
+            "address_1": "1 Moi Ave", "city": "Nairobi",
+        })
+
+    def _checkout_queries(self, products):
+        self._fill_cart(products)
+        with CaptureQueriesContext(connection) as ctx:
+            response = self._checkout()
+        self.assertEqual(response.status_code, 302)
+        return len(ctx.captured_queries)
+
+    def test_prices_come_from_the_database(self):
+        self._fill_cart(self.products[:2])
+        Product.objects.filter(pk=self.products[0].pk).update(price=900)    # repriced after adding
+        self._checkout()
+
+        order = Order.objects.get()
+        self.assertEqual(order.subtotal, 1901)
+        self.assertEqual(order.total, 2201)
+        self.assertFalse(CartItem.objects.exists())
+        self.assertEqual(sorted(order.items.values_list("unit_price", flat=True)), [900, 1001])
+        self.assertEqual(OutboxEmail.objects.count(), 2)
+
+    def test_query_count_is_independent_of_cart_size(self):
+        small = self._checkout_queries(self.products[:1])
+        large = self._checkout_queries(self.products)
+        self.assertEqual(small, large)
+
+    def test_failure_leaves_no_partial_order(self):
+        self._fill_cart(self.products[:2])
+        with mock.patch("marketplace.checkout.OrderItem.objects.bulk_create",
+                        side_effect=IntegrityError("boom")):
+            with self.assertRaises(IntegrityError):
+                self._checkout()
+        self.assertFalse(Order.objects.exists())
+        self.assertFalse(ShippingAddress.objects.exists())
+
+
+class IdempotentCheckoutTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        category    = Category.objects.create(name="Merch", slug="merch")
+        cls.product = Product.objects.create(
+            title="Mug", category=category, product_type=Product.TYPE_MERCH, price=500,
+        )
+        cls.user = User.objects.create_user("buyer", password="pw")
+
+    def _checkout(self, key):
+        self.client.post(reverse("marketplace:add-to-cart", args=[self.product.id]))
+        return self.client.post(reverse("marketplace:checkout"), {
+            "full_name": "Ada", "phone": "0700000000", "email": "ada@example.com",
+            "address_1": "1 Moi Ave", "city": "Nairobi", "idempotency_key": key,
+        })
+
+    def test_double_submit_replays_first_redirect(self):
+        first = self._checkout("form-key-0001")
+        with self.assertNumQueries(1):      # one indexed key lookup
+            second = self.client.post(reverse("marketplace:checkout"),
+                                      {"idempotency_key": "form-key-0001"})
+
+        self.assertEqual(second["Location"], first["Location"])
+        self.assertEqual(Order.objects.count(), 1)
+        self.assertEqual(ShippingAddress.objects.count(), 1)
+        self.assertEqual(OutboxEmail.objects.count(), 2)
+
+    def test_api_create_replays_response(self):
+        self.client.force_login(self.user)
+        url     = reverse("marketplace:api-order-list")
+        payload = json.dumps({"items": [{"product": self.product.id, "quantity": 2}]})
+        headers = {"HTTP_IDEMPOTENCY_KEY": "api-key-0001", "HTTP_ACCEPT": "application/json"}
+
+        first  = self.client.post(url, payload, content_type="application/json", **headers)
+        second = self.client.post(url, payload, content_type="application/json", **headers)
+
+        self.assertEqual(first.status_code, 201)
+        self.assertEqual(second.status_code, 201)
+        self.assertEqual(second.json(), first.json())
+        self.assertEqual(second["Idempotent-Replayed"], "true")
+        self.assertEqual(Order.objects.get().total, 1000)
+
+
+class CartTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        category     = Category.objects.create(name="Merch", slug="merch")
+        cls.product  = Product.objects.create(
+            title="Cap", category=category, product_type=Product.TYPE_MERCH, price=800,
+        )
+        cls.user = User.objects.create_user("shopper", password="pw")
+
+    def _add(self):
+        return self.client.post(reverse("marketplace:add-to-cart", args=[self.product.id])).json()
+
+    def test_repeat_add_updates_one_row(self):
+        self._add()
+        with CaptureQueriesContext(connection) as ctx:
+            data = self._add()
+        writes = [q["sql"] for q in ctx.captured_queries if not q["sql"].startswith("SELECT")]
+        self.assertEqual(len(writes), 1)
+        self.assertIn("marketplace_cartitem", writes[0])
+        self.assertEqual(data["cart_count"], 2)
+        self.assertEqual(CartItem.objects.get().quantity, 2)
+
+        self.client.post(reverse("marketplace:update-quantity"),
+                         {"product_id": self.product.id, "quantity": 5})
+        self.assertEqual(self.client.get(reverse("marketplace:cart-count")).json()["count"], 5)
+
+    def test_anonymous_cart_merges_on_login(self):
+        self._add()
+        user_cart = Cart.objects.create(user=self.user)
+        CartItem.objects.create(cart=user_cart, product=self.product, quantity=3)
+
+        self.client.login(username="shopper", password="pw")
+
+        self.assertEqual(Cart.objects.count(), 1)
+        self.assertEqual(CartItem.objects.get(cart=user_cart).quantity, 4)
+        self.assertEqual(self.client.get(reverse("marketplace:cart-count")).json()["count"], 4)
+
+    def test_badge_reads_signed_cookie_without_queries(self):
+        self._add()
+        self._add()
+        url = reverse("marketplace:cart-count")
+
+        with self.assertNumQueries(0):
+            response = self.client.get(url)
+        self.assertEqual(response.json(), {"count": 2, "subtotal": "1600.00"})
+        self.assertIn("private", response["Cache-Control"])
+        self.assertIn("Cookie", response["Vary"])
+
+        # A forged cookie is ignored and rebuilt from the database.
+        self.client.cookies[carts.SUMMARY_COOKIE] = "forged"
+        response = self.client.get(url)
+        self.assertEqual(response.json()["count"], 2)
+        self.assertIn(carts.SUMMARY_COOKIE, response.cookies)
+
+    def test_badge_without_session_is_empty(self):
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse("marketplace:cart-count"))
+        self.assertEqual(response.json()["count"], 0)
+
+
+class ProductPriceApiTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        category = Category.objects.create(name="All", slug="all")
+        cls.crm  = Product.objects.create(title="CRM", category=category,
+                                          product_type=Product.TYPE_DIGITAL)
+        PricingPlan.objects.create(product=cls.crm, name="Starter", price=1200,
+                                   billing_type=PricingPlan.BILLING_MONTHLY)
+        cls.cap  = Product.objects.create(title="Cap", category=category,
+                                          product_type=Product.TYPE_MERCH, price=800)
+        cls.art  = Product.objects.create(title="Print", category=category,
+                                          product_type=Product.TYPE_ARTWORK, price=4000)
+
+    def _titles(self, **params):
+        response = self.client.get("/marketplace/api/products/", params)
+        self.assertEqual(response.status_code, 200)
+        return [row["title"] for row in response.json()]
+
+    def test_orders_and_filters_by_from_price_without_joins(self):
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(self._titles(ordering="price"), ["Cap", "CRM", "Print"])
+        self.assertFalse(any("pricingplan" in q["sql"] for q in ctx.captured_queries))
+        self.assertFalse(any("CASE" in q["sql"] for q in ctx.captured_queries))
+
+        self.assertEqual(self._titles(ordering="-price"), ["Print", "CRM", "Cap"])
+        self.assertEqual(self._titles(min_price="1000", max_price="2000"), ["CRM"])
+        self.assertEqual(len(self._titles(max_price="junk")), 3)
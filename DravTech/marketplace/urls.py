@@ -7,6 +7,7 @@ app_name = "marketplace"
 # ── DRF API router ────────────────────────────────────────────────────────────
 router = DefaultRouter()
 router.register(r"products",        views.ProductViewSet,       basename="api-product")
+router.register(r"catalog",         views.CatalogViewSet,       basename="api-catalog")
 router.register(r"bookings",        views.BookingViewSet,       basename="api-booking")
 router.register(r"orders",          views.OrderViewSet,         basename="api-order")
 router.register(r"support-tickets", views.SupportTicketViewSet, basename="api-ticket")
@@ -1,21 +1,31 @@
-import json
+import hashlib
 import os
-import mimetypes
+from decimal import Decimal
 from django.http import JsonResponse
 
+from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.core.paginator import Paginator
-from django.core.mail import send_mail
+from django.db import transaction
+from django.db.models import F, Prefetch
 from django.http import JsonResponse, HttpResponse, Http404
 from django.shortcuts import get_object_or_404, redirect, render
+from django.urls import reverse
+from django.utils.cache import patch_cache_control, patch_vary_headers
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_GET, require_POST, require_http_methods
 
 from rest_framework import permissions, viewsets
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
 
+from DravTech.database import serialized_write
+from DravTech.routers import replica_reads
+from main import outbox, related
 from main.models import Category, PricingPlan, Product, ProductInquiry
-from .models import Booking, Order, OrderItem, PurchasedDownload, ShippingAddress, SupportTicket
+from . import carts, catalog, checkout, delivery, idempotency
+from .models import Booking, IdempotencyKey, Order, PurchasedDownload, SupportTicket
 from .forms import DemoRequestForm
 from .serializers import (
     BookingSerializer,
@@ -30,20 +40,76 @@ from .serializers import (
 # ─────────────────────────────────────────────
 
 class ProductViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    ?featured=true&type=<type>&min_price=&max_price=&ordering=price|-price.
+    Prices are Product.from_price: the cheapest active plan for digital
+    products, Product.price for everything else.
+    """
     serializer_class = ProductSerializer
     lookup_field     = "slug"
 
     def get_queryset(self):
+        params   = self.request.query_params
         qs       = Product.objects.filter(is_active=True)
-        featured = self.request.query_params.get("featured")
-        ptype    = self.request.query_params.get("type")
+        featured = params.get("featured")
+        ptype    = params.get("type")
         if featured == "true":
             qs = qs.filter(is_featured=True)
         if ptype:
             qs = qs.filter(product_type=ptype)
+
+        for param, lookup in (("min_price", "gte"), ("max_price", "lte")):
+            bound = _parse_price(params.get(param))
+            if bound is not None:
+                qs = qs.filter(**{f"from_price__{lookup}": bound})
+
+        ordering = params.get("ordering")
+        if ordering in ("price", "-price"):
+            # Both directions walk product_from_price_idx; no sort step.
+            from_price = F("from_price")
+            qs = qs.order_by(from_price.desc(nulls_last=True), "-id") if ordering == "-price" \
+                else qs.order_by(from_price.asc(nulls_last=True), "id")
         return qs
 
 
+def _parse_price(value):
+    try:
+        price = Decimal(value) if value not in (None, "") else None
+    except ArithmeticError:
+        return None
+    return price if price is None or price.is_finite() else None
+
+
+class CatalogViewSet(viewsets.ViewSet):
+    """
+    Compact, cursor-paginated catalog for the hub's infinite scroll.
+    ?cursor=<opaque>&type=digital|merch|artwork. Pages are cached per
+    catalog version and carry an ETag derived from it.
+    """
+    renderer_classes = [JSONRenderer]
+
+    def list(self, request):
+        cursor = request.query_params.get("cursor") or None
+        ptype  = request.query_params.get("type") or None
+        if ptype not in (None, Product.TYPE_DIGITAL, Product.TYPE_MERCH, Product.TYPE_ARTWORK):
+            return Response({"detail": "Unknown product type."}, status=400)
+
+        etag = '"{}"'.format(hashlib.md5(
+            f"{catalog.current_version()}:{ptype}:{cursor}".encode()
+        ).hexdigest())
+        if etag in request.headers.get("If-None-Match", ""):
+            response = Response(status=304)
+        else:
+            try:
+                page = catalog.get_page(cursor, ptype)
+            except catalog.InvalidCursor:
+                return Response({"detail": "Invalid cursor."}, status=400)
+            response = Response(page)
+        response["ETag"] = etag
+        response["Cache-Control"] = "public, max-age=60"
+        return response
+
+
 class BookingViewSet(viewsets.ModelViewSet):
     serializer_class   = BookingSerializer
     permission_classes = [permissions.IsAuthenticated]
@@ -62,8 +128,32 @@ class OrderViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         return Order.objects.filter(customer=self.request.user)
 
+    def create(self, request, *args, **kwargs):
+        """Honour an optional Idempotency-Key header (see marketplace.idempotency)."""
+        key = idempotency.key_from(request)
+        if key is None:
+            return super().create(request, *args, **kwargs)
+
+        previous = idempotency.lookup(IdempotencyKey.SCOPE_API_ORDER, key)
+        if previous is None:
+            def create_order():
+                response = super(OrderViewSet, self).create(request, *args, **kwargs)
+                return self.created_order, {"response_status": response.status_code,
+                                            "response_body": response.data}
+            previous, created = idempotency.run_once(
+                IdempotencyKey.SCOPE_API_ORDER, key, create_order, user=request.user
+            )
+            if created:
+                return Response(previous.response_body, status=previous.response_status)
+
+        if previous.user_id != request.user.id:
+            return Response({"detail": "Idempotency-Key already used."}, status=409)
+        response = Response(previous.response_body, status=previous.response_status)
+        response["Idempotent-Replayed"] = "true"
+        return response
+
     def perform_create(self, serializer):
-        serializer.save(customer=self.request.user)
+        self.created_order = serializer.save(customer=self.request.user)
 
 
 class SupportTicketViewSet(viewsets.ModelViewSet):
@@ -85,36 +175,17 @@ def marketplace_hub(request):
     """
     Hub page at /marketplace/ — all products with client-side
     category filter tabs. Replaces the old marketplace_view.
+
+    Only the first screen (one page + per-type counts) is inlined, from a
+    cached snapshot (see marketplace.catalog); later pages stream in from
+    CatalogViewSet, so neither cost grows with the catalog.
     """
-    all_products = Product.objects.filter(is_active=True).order_by(
-        "display_order", "title"
-    )
-    featured_products = all_products.filter(is_featured=True)[:6]
-
-    # Serialize products for JavaScript
-    products_data = []
-    for product in all_products:
-        # Get minimum price for digital products
-        min_price = None
-        if product.product_type == Product.TYPE_DIGITAL:
-            pricing_plans = product.pricing_plans.filter(is_active=True)
-            if pricing_plans.exists():
-                min_price = pricing_plans.order_by('price').first().price
-        
-        products_data.append({
-            'id': product.id,
-            'title': product.title,
-            'slug': product.slug,
-            'description': product.description,
-            'price': str(product.price),
-            'min_price': float(min_price) if min_price else None,
-            'product_type': product.product_type,
-            'image': product.image.url if product.image else None,
-            'category': product.category.name if product.category else None,
-        })
+    featured_products = Product.objects.filter(
+        is_active=True, is_featured=True
+    ).order_by("display_order", "title")[:6]
 
     return render(request, "marketplace/index.html", {
-        "all_products":      json.dumps(products_data),
+        "catalog":           catalog.get_catalog_json(),
         "featured_products": featured_products,
     })
 
@@ -127,6 +198,7 @@ marketplace_view = marketplace_hub
 #  PRODUCT LISTING  (/marketplace/products/)
 # ─────────────────────────────────────────────
 
+@replica_reads
 def product_listing(request):
     """
     /products/  — filterable listing of all active products.
@@ -135,9 +207,13 @@ def product_listing(request):
     type_filter = request.GET.get("type", "all")
     page        = request.GET.get("page", 1)
 
-    qs = Product.objects.filter(is_active=True)
+    qs = Product.objects.filter(is_active=True).prefetch_related(
+        Prefetch("pricing_plans", queryset=PricingPlan.objects.filter(is_active=True))
+    )
     if type_filter in (Product.TYPE_DIGITAL, Product.TYPE_MERCH, Product.TYPE_ARTWORK):
         qs = qs.filter(product_type=type_filter)
+    else:
+        type_filter = "all"  # also keys the cached grid; don't key on junk
 
     paginator    = Paginator(qs, 12)
     products_page = paginator.get_page(page)
@@ -157,6 +233,7 @@ def product_listing(request):
 #  PRODUCT DETAIL
 # ─────────────────────────────────────────────
 
+@replica_reads
 def product_detail_view(request, slug):
     """
     Single product detail page.
@@ -164,10 +241,7 @@ def product_detail_view(request, slug):
     """
     product = get_object_or_404(Product, slug=slug, is_active=True)
 
-    related_products = Product.objects.filter(
-        is_active=True,
-        product_type=product.product_type,
-    ).exclude(id=product.id).order_by("?")[:4]
+    related_products = related.sample(product, 4)
 
     # Pricing plans only relevant for digital
     pricing_plans = []
@@ -243,28 +317,38 @@ def _has_physical(cart):
     return any(item.get("needs_shipping") for item in cart.values())
 
 
+def _cart_response(request, cart, **data):
+    """JSON reply for a cart mutation; refreshes the badge cookie too."""
+    count, subtotal = carts.summary(cart)
+    response = JsonResponse({
+        "success":       True,
+        "cart_count":    count,
+        "cart_subtotal": str(subtotal),
+        **data,
+    })
+    return carts.set_summary_cookie(response, request, count, subtotal)
+
+
+def _parse_product_id(value):
+    try:
+        return int(value)
+    except (ValueError, TypeError):
+        return None
+
+
 def cart_page(request):
-    cart = request.session.get("cart", {})
-    
-    # Clean cart of any invalid entries
-    cleaned_cart = {}
-    for key, value in cart.items():
-        try:
-            int(key)  # Test if key can be converted to int
-            cleaned_cart[key] = value
-        except (ValueError, TypeError):
-            continue  # Skip invalid keys
-    
-    request.session["cart"] = cleaned_cart
-    request.session.modified = True
-    
-    total = _cart_totals(cleaned_cart)
-    return render(request, "marketplace/cart.html", {
-        "cart":         cleaned_cart,
+    cart       = carts.as_dict(carts.items(carts.get_cart(request)))
+    item_count = sum(i["quantity"] for i in cart.values())
+    total      = _cart_totals(cart)
+
+    response = render(request, "marketplace/cart.html", {
+        "cart":         cart,
         "total":        total,
-        "has_physical": _has_physical(cleaned_cart),
-        "item_count":   sum(i["quantity"] for i in cleaned_cart.values()),
+        "has_physical": _has_physical(cart),
+        "item_count":   item_count,
     })
+    # The rows are already loaded; resync the badge cookie for free.
+    return carts.set_summary_cookie(response, request, item_count, Decimal(str(total)))
 
 
 @csrf_exempt
@@ -284,110 +368,77 @@ def add_to_cart(request, product_id):
         return JsonResponse({"success": False,
                              "error": "This product cannot be added to cart."}, status=400)
 
-    cart = request.session.get("cart", {})
-    pid  = str(product.id)
+    cart = carts.get_cart(request, create=True)
+    carts.add(cart, product.id)
 
-    if pid in cart:
-        cart[pid]["quantity"] += 1
-    else:
-        cart[pid] = {
-            "id":           product.id,
-            "name":         product.title,            # FIX: was product.name
-            "price":        str(product.price or 0),
-            "quantity":     1,
-            "image":        product.image.url if product.image else "",
-            "product_type": product.product_type,
-            "needs_shipping": product.needs_shipping,
-            "is_downloadable": product.is_downloadable,
-            "slug":         product.slug,
-        }
-
-    request.session["cart"] = cart
-    request.session.modified = True
-
-    return JsonResponse({
-        "success":    True,
-        "cart_count": sum(i["quantity"] for i in cart.values()),
-        "message":    f"{product.title} added to cart!",
-    })
+    return _cart_response(request, cart, message=f"{product.title} added to cart!")
 
 
 @csrf_exempt
 @require_POST
 def remove_from_cart(request):
-    product_id = request.POST.get("product_id")
-    cart       = request.session.get("cart", {})
-    
-    try:
-        pid = str(product_id)
-    except (ValueError, TypeError):
+    product_id = _parse_product_id(request.POST.get("product_id"))
+    if product_id is None:
         return JsonResponse({"success": False, "error": "Invalid product ID format."})
 
-    # Clean cart of any invalid entries
-    cleaned_cart = {}
-    for key, value in cart.items():
-        try:
-            int(key)  # Test if key can be converted to int
-            cleaned_cart[key] = value
-        except (ValueError, TypeError):
-            continue  # Skip invalid keys
-    
-    request.session["cart"] = cleaned_cart
-    request.session.modified = True
-
-    removed_name = cleaned_cart[pid]["name"] if pid in cleaned_cart else "Product"
-    cleaned_cart.pop(pid, None)
-
-    request.session["cart"] = cleaned_cart
-    request.session.modified = True
+    cart = carts.get_cart(request)
+    if cart is not None:
+        carts.remove(cart, product_id)
+    removed_name = (
+        Product.objects.filter(id=product_id).values_list("title", flat=True).first()
+        or "Product"
+    )
 
-    return JsonResponse({
-        "success":    True,
-        "cart_count": sum(i["quantity"] for i in cart.values()),
-        "message":    f"{removed_name} removed from cart.",
-    })
+    return _cart_response(request, cart, message=f"{removed_name} removed from cart.")
 
 
-@csrf_exempt
+@require_GET
 def cart_count(request):
-    cart  = request.session.get("cart", {})
-    count = sum(i["quantity"] for i in cart.values())
-    return JsonResponse({"count": count})
+    """
+    Badge poll. Answers from the signed summary cookie, so the usual case
+    reads neither the session nor the database; a missing or stale cookie
+    (first visit, login, logout) falls back to one query and re-issues it.
+    """
+    summary = carts.read_summary_cookie(request)
+    if summary is not None:
+        count, subtotal = summary
+        response = JsonResponse({"count": count, "subtotal": str(subtotal)})
+    elif not request.COOKIES.get(settings.SESSION_COOKIE_NAME):
+        response = JsonResponse({"count": 0, "subtotal": "0.00"})
+    else:
+        count, subtotal = carts.summary(carts.get_cart(request))
+        response = JsonResponse({"count": count, "subtotal": str(subtotal)})
+        carts.set_summary_cookie(response, request, count, subtotal)
+
+    patch_cache_control(response, private=True, max_age=0)
+    patch_vary_headers(response, ["Cookie"])
+    return response
 
 
 @csrf_exempt
 @require_http_methods(["POST"])
 def update_quantity(request):
-    product_id   = request.POST.get("product_id")
-    new_quantity = request.POST.get("quantity")
-    cart         = request.session.get("cart", {})
-    
-    try:
-        # Convert product_id to string for session lookup
-        pid = str(product_id)
-    except (ValueError, TypeError):
+    product_id = _parse_product_id(request.POST.get("product_id"))
+    if product_id is None:
         return JsonResponse({"success": False, "error": "Invalid product ID format."})
 
-    if pid not in cart:
-        return JsonResponse({"success": False, "error": "Item not in cart."})
-
     try:
-        qty = int(new_quantity)
+        qty = int(request.POST.get("quantity"))
         if qty < 1:
             raise ValueError
     except (ValueError, TypeError):
         return JsonResponse({"success": False, "error": "Invalid quantity."})
 
-    cart[pid]["quantity"] = qty
-    request.session["cart"] = cart
-    request.session.modified = True
+    cart = carts.get_cart(request)
+    if cart is None or not carts.set_quantity(cart, product_id, qty):
+        return JsonResponse({"success": False, "error": "Item not in cart."})
 
-    return JsonResponse({
-        "success":    True,
-        "cart_count": sum(i["quantity"] for i in cart.values()),
-        "quantity":   qty,
-        "line_total": round(float(cart[pid]["price"]) * qty, 2),
-    })
+    price = Product.objects.filter(id=product_id).values_list("price", flat=True).first() or 0
+    return _cart_response(
+        request, cart,
+        quantity   = qty,
+        line_total = round(float(price) * qty, 2),
+    )
 
 
 # ─────────────────────────────────────────────
@@ -397,34 +448,29 @@ def update_quantity(request):
 @require_http_methods(["GET", "POST"])
 def checkout_view(request):
     """
-    FIX: Now imports redirect, checks for physical items,
-    collects shipping address, saves Order + OrderItems, clears cart.
+    Prices come from the database, not the session (see marketplace.checkout).
+    The order, its items and the queued emails are written in one transaction.
+    A repeated POST with the same idempotency key replays the first redirect.
     """
-    cart = request.session.get("cart", {})
-    
-    # Clean cart of any invalid entries
-    cleaned_cart = {}
-    for key, value in cart.items():
-        try:
-            int(key)  # Test if key can be converted to int
-            cleaned_cart[key] = value
-        except (ValueError, TypeError):
-            continue  # Skip invalid keys
-    
-    request.session["cart"] = cleaned_cart
-    request.session.modified = True
+    request_key = idempotency.key_from(request) if request.method == "POST" else None
+    previous    = idempotency.lookup(IdempotencyKey.SCOPE_CHECKOUT, request_key)
+    if previous is not None:
+        return redirect(previous.location)
+
+    cart       = carts.get_cart(request)
+    cart_items = carts.items(cart)
+    lines, subtotal, has_physical = checkout.price_lines(cart_items)
+    cleaned_cart = carts.as_dict(cart_items)
 
     if not cleaned_cart:
         return redirect("marketplace:cart")
 
-    subtotal      = _cart_totals(cleaned_cart)
-    has_physical  = _has_physical(cleaned_cart)
-    shipping_cost = 300.00 if has_physical else 0   # KES flat rate; swap for real logic
+    shipping_cost = checkout.SHIPPING_FLAT_RATE if has_physical else Decimal("0")
     total         = subtotal + shipping_cost
 
     if request.method == "POST":
         # ── Collect shipping address if needed ────────────────────────────
-        shipping_addr = None
+        shipping = None
         if has_physical:
             required = ["full_name", "phone", "email", "address_1", "city"]
             missing  = [f for f in required if not request.POST.get(f, "").strip()]
@@ -435,77 +481,55 @@ def checkout_view(request):
                     "shipping_cost": shipping_cost, "total": total,
                     "has_physical": has_physical,
                     "form_data": request.POST,
+                    "idempotency_key": request_key or idempotency.new_key(),
                 })
 
-            shipping_addr = ShippingAddress.objects.create(
-                full_name   = request.POST["full_name"].strip(),
-                phone       = request.POST["phone"].strip(),
-                email       = request.POST["email"].strip(),
-                address_1   = request.POST["address_1"].strip(),
-                address_2   = request.POST.get("address_2", "").strip(),
-                city        = request.POST["city"].strip(),
-                county      = request.POST.get("county", "").strip(),
-                postal_code = request.POST.get("postal_code", "").strip(),
-                country     = request.POST.get("country", "Kenya").strip(),
-            )
+            shipping = {f: request.POST.get(f, "").strip() for f in checkout.SHIPPING_FIELDS}
+            shipping["country"] = shipping["country"] or "Kenya"
 
-        # ── Create Order ──────────────────────────────────────────────────
-        order = Order.objects.create(
-            customer           = request.user if request.user.is_authenticated else None,
-            email              = request.POST.get("email", ""),
-            subtotal           = subtotal,
-            shipping_cost      = shipping_cost,
-            total              = total,
-            has_physical_items = has_physical,
-            shipping_address   = shipping_addr,
-            status             = Order.STATUS_PENDING,
-            payment_status     = Order.PAYMENT_PENDING,
-        )
+        # ── Create Order + OrderItems and queue notifications ─────────────
+        customer = request.user if request.user.is_authenticated else None
 
-        # ── Create OrderItems (with title snapshot) ───────────────────────
-        for pid, item in cleaned_cart.items():
-            try:
-                product_id = int(item["id"])
-                product = Product.objects.filter(id=product_id).first()
-                if not product:
-                    continue  # Skip invalid products
-            except (ValueError, TypeError, KeyError):
-                continue  # Skip invalid items
-                
-            OrderItem.objects.create(
-                order         = order,
-                product       = product,
-                product_title = item["name"],       # FIX: snapshot title
-                product_type  = item["product_type"],
-                unit_price    = float(item["price"]),
-                quantity      = item["quantity"],
+        def place_order():
+            order = checkout.create_order(
+                lines, shipping_cost,
+                customer = customer,
+                email    = request.POST.get("email", ""),
+                shipping = shipping,
             )
+            try:
+                with transaction.atomic():
+                    send_order_confirmation_email(request, order)
+                    send_admin_notification_email(request, order)
+            except Exception as e:
+                # Log error but don't fail the order process
+                print(f"Email queueing failed: {e}")
+            location = reverse("marketplace:order-confirmation", kwargs={"order_id": order.id})
+            return order, {"location": location}
+
+        with serialized_write():
+            if request_key:
+                record, _ = idempotency.run_once(
+                    IdempotencyKey.SCOPE_CHECKOUT, request_key, place_order, user=customer
+                )
+                location = record.location
+            else:
+                _, fields = place_order()
+                location = fields["location"]
 
         # ── Clear cart ────────────────────────────────────────────────────
-        request.session["cart"] = {}
-        request.session.modified = True
-
-        # ── Send email notifications ───────────────────────────────────────
-        try:
-            # Send email to customer
-            send_order_confirmation_email(request, order)
-            
-            # Send notification to admin
-            send_admin_notification_email(request, order)
-            
-        except Exception as e:
-            # Log error but don't fail the order process
-            print(f"Email sending failed: {e}")
+        carts.clear(cart)
 
         # ── Redirect to confirmation ───────────────────────────────────────────
-        return redirect("marketplace:order-confirmation", order_id=order.id)
+        return carts.set_summary_cookie(redirect(location), request, 0, Decimal("0.00"))
 
     return render(request, "marketplace/checkout.html", {
-        "cart":          cleaned_cart,
-        "subtotal":      subtotal,
-        "shipping_cost": shipping_cost,
-        "total":         total,
-        "has_physical":  has_physical,
+        "cart":            cleaned_cart,
+        "subtotal":        subtotal,
+        "shipping_cost":   shipping_cost,
+        "total":           total,
+        "has_physical":    has_physical,
+        "idempotency_key": idempotency.new_key(),
     })
 
 
@@ -562,7 +586,8 @@ def download_artwork(request, product_id):
     """
     FIX 1: Serves download_file — NOT image.
     FIX 2: Verifies purchase via PurchasedDownload.
-    FIX 3: Increments download_count and enforces max_downloads.
+    FIX 3: Enforces max_downloads; download_count is only incremented once
+           the whole file has been sent (see marketplace.delivery).
     """
     try:
         product_id = int(product_id)
@@ -596,23 +621,23 @@ def download_artwork(request, product_id):
     if not os.path.exists(file_path):
         raise Http404("File not found on server.")
 
-    content_type, _ = mimetypes.guess_type(file_path)
-    content_type = content_type or "application/octet-stream"
-    filename     = os.path.basename(file_path)
+    # Stored names are content hashes; give the buyer a readable one.
+    _, ext   = os.path.splitext(product.download_file.name)
+    filename = f"{product.slug}{ext}"
 
-    purchase.download_count += 1
-    purchase.save(update_fields=["download_count"])
+    def count_download():
+        # Atomic and capped, so parallel downloads cannot overrun the quota.
+        PurchasedDownload.objects.filter(
+            pk=purchase.pk, download_count__lt=F("max_downloads")
+        ).update(download_count=F("download_count") + 1)
 
-    with open(file_path, "rb") as f:
-        response = HttpResponse(f.read(), content_type=content_type)
-        response["Content-Disposition"] = f'attachment; filename="{filename}"'
-        return response
+    return delivery.serve_download(request, file_path, filename, on_complete=count_download)
 
 
 # ── EMAIL FUNCTIONS ─────────────────────────────────────────────────────
 
 def send_order_confirmation_email(request, order):
-    """Send order confirmation email to customer"""
+    """Queue the order confirmation email to the customer"""
     from django.template.loader import render_to_string
     from django.conf import settings
     
@@ -630,22 +655,18 @@ def send_order_confirmation_email(request, order):
     text_message = render_to_string('marketplace/emails/order_confirmation.txt', context)
     
     try:
-        send_mail(
-            subject=subject,
-            message=text_message,
+        outbox.enqueue(
+            subject, text_message, [order.email], html_body=html_message,
             from_email=getattr(settings, 'DEFAULT_FROM_EMAIL', 'noreply@dravtech.com'),
-            recipient_list=[order.email],
-            html_message=html_message,
-            fail_silently=False,
         )
         return True
     except Exception as e:
-        print(f"Failed to send customer email: {e}")
+        print(f"Failed to queue customer email: {e}")
         return False
 
 
 def send_admin_notification_email(request, order):
-    """Send new order notification to admin"""
+    """Queue the new order notification to the admin"""
     from django.template.loader import render_to_string
     from django.conf import settings
     
@@ -663,15 +684,12 @@ def send_admin_notification_email(request, order):
     text_message = render_to_string('marketplace/emails/admin_order_notification.txt', context)
     
     try:
-        send_mail(
-            subject=subject,
-            message=text_message,
+        outbox.enqueue(
+            subject, text_message, [getattr(settings, 'ADMIN_EMAIL', 'admin@dravtech.com')],
+            html_body=html_message,
             from_email=getattr(settings, 'DEFAULT_FROM_EMAIL', 'noreply@dravtech.com'),
-            recipient_list=[getattr(settings, 'ADMIN_EMAIL', 'admin@dravtech.com')],
-            html_message=html_message,
-            fail_silently=False,
         )
         return True
     except Exception as e:
-        print(f"Failed to send admin email: {e}")
+        print(f"Failed to queue admin email: {e}")
         return False
\ No newline at end of file
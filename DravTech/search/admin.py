@@ -0,0 +1,19 @@
+from . import engine
+
+
+class IndexedSearchMixin:
+    """
+    Route the admin changelist search box through the site search index
+    instead of `icontains` scans over `search_fields`. Set `search_kind` to
+    the SearchDocument kind of the model; `search_fields` must stay
+    non-empty so the admin still renders the search box, and so searches
+    fall back to them until the kind has been indexed.
+    """
+    search_kind = None
+
+    def get_search_results(self, request, queryset, search_term):
+        if self.search_kind:
+            object_ids = engine.search_object_ids(self.search_kind, search_term)
+            if object_ids is not None:
+                return queryset.filter(pk__in=object_ids), False
+        return super().get_search_results(request, queryset, search_term)
@@ -0,0 +1,21 @@
+from django.apps import AppConfig
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models.signals import post_migrate
+
+
+def backfill_index(using=DEFAULT_DB_ALIAS, **kwargs):
+    # Rows that predate the index (or were loaded raw) get documents on the
+    # first migrate; later changes are indexed by the save/delete signals.
+    if using != DEFAULT_DB_ALIAS:
+        return
+    from . import engine
+    engine.backfill()
+
+
+class SearchConfig(AppConfig):
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "search"
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        post_migrate.connect(backfill_index, sender=self)
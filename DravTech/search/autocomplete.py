@@ -0,0 +1,143 @@
+# search/autocomplete.py
+"""
+In-process prefix index for type-ahead over product and service titles.
+
+Each worker keeps one sorted array of lower-cased keys (every word-start
+suffix of every title, plus the slug) pointing into a tuple of suggestions.
+Lookups are a bisect plus a short forward scan. Change signals bump a
+version in the shared cache; each worker compares it on lookup and rebuilds
+its copy when it is stale, so invalidation reaches every process.
+"""
+import bisect
+import logging
+import sys
+import threading
+import time
+
+from django.core.cache import cache
+from django.urls import reverse
+
+from main.models import Product
+from services.models import Service
+
+logger = logging.getLogger(__name__)
+
+VERSION_KEY = "search:autocomplete:version"
+MAX_LIMIT   = 10
+
+
+class PrefixIndex:
+    __slots__ = ("keys", "refs", "items", "version", "build_ms", "built_at")
+
+    def __init__(self, entries, version):
+        """`entries` is an iterable of (kind, title, slug, url)."""
+        started = time.perf_counter()
+
+        items, pairs = [], []
+        for kind, title, slug, url in entries:
+            ref = len(items)
+            items.append({"kind": kind, "title": title, "url": url})
+            lowered = title.lower()
+            words   = lowered.split()
+            offset  = 0
+            for word in words:
+                offset = lowered.index(word, offset)
+                pairs.append((lowered[offset:], ref))
+                offset += len(word)
+            if slug:
+                pairs.append((slug.lower(), ref))
+
+        pairs.sort()
+        self.keys     = [key for key, _ in pairs]
+        self.refs     = [ref for _, ref in pairs]
+        self.items    = tuple(items)
+        self.version  = version
+        self.build_ms = (time.perf_counter() - started) * 1000
+        self.built_at = time.time()
+
+    def suggest(self, prefix, limit=MAX_LIMIT):
+        prefix = " ".join(prefix.lower().split())
+        if not prefix:
+            return []
+        seen, results = set(), []
+        start = bisect.bisect_left(self.keys, prefix)
+        for position in range(start, len(self.keys)):
+            if not self.keys[position].startswith(prefix):
+                break
+            ref = self.refs[position]
+            if ref not in seen:
+                seen.add(ref)
+                results.append(self.items[ref])
+                if len(results) >= limit:
+                    break
+        return results
+
+    def metrics(self):
+        approx_bytes = (
+            sys.getsizeof(self.keys) + sum(sys.getsizeof(key) for key in self.keys)
+            + sys.getsizeof(self.refs)
+            + sum(sys.getsizeof(item) for item in self.items)
+        )
+        return {
+            "version":      self.version,
+            "items":        len(self.items),
+            "keys":         len(self.keys),
+            "approx_bytes": approx_bytes,
+            "build_ms":     round(self.build_ms, 3),
+            "built_at":     self.built_at,
+        }
+
+
+def _entries():
+    for title, slug in (
+        Product.objects.filter(is_active=True)
+        .order_by("display_order", "title")
+        .values_list("title", "slug")
+    ):
+        yield "product", title, slug, reverse("marketplace:product-detail", kwargs={"slug": slug})
+
+    for title, slug in (
+        Service.objects.filter(is_active=True)
+        .order_by("display_order", "title")
+        .values_list("title", "slug")
+    ):
+        yield "service", title, slug, reverse("services:detail", kwargs={"slug": slug})
+
+
+# ── Per-process singleton ────────────────────
+
+_index = None
+_lock  = threading.Lock()
+
+
+def current_version():
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, int(time.time() * 1000), None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+def get_index():
+    """This worker's index, rebuilt if another process bumped the version."""
+    global _index
+    version = current_version()
+    index = _index
+    if index is not None and index.version == version:
+        return index
+    with _lock:
+        if _index is None or _index.version != version:
+            _index = PrefixIndex(_entries(), version)
+            logger.info("Autocomplete index built: %s", _index.metrics())
+        return _index
+
+
+def suggest(prefix, limit=MAX_LIMIT):
+    return get_index().suggest(prefix, min(limit, MAX_LIMIT))
+
+
+def bump_version():
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, int(time.time() * 1000), None)
@@ -0,0 +1,280 @@
+# search/engine.py
+"""
+Site search over products, services, projects and case studies.
+
+Every indexed row is flattened into a SearchDocument. On SQLite the text is
+also mirrored into the `search_fts` FTS5 table (created by migration 0002)
+and ranked with bm25; on other databases, or SQLite builds without FTS5,
+the SearchTerm inverted index is used instead. Callers only see
+`index_instance`, `remove_instance`, `search` and `search_object_ids`.
+"""
+import re
+from collections import defaultdict
+
+from django.db import connection, transaction
+from django.urls import reverse
+
+from main.models import Product, Project
+from services.models import CaseStudy, Service
+from .models import SearchDocument, SearchTerm
+
+FTS_TABLE = "search_fts"
+
+TITLE_WEIGHT = 3
+BODY_WEIGHT  = 1
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+# ── Source models ────────────────────────────
+
+def _join(*parts):
+    return "\n".join(str(part) for part in parts if part)
+
+
+def _product_fields(product):
+    return {
+        "title": product.title,
+        "body":  _join(
+            product.tagline,
+            product.description,
+            " ".join(str(feature) for feature in product.features or []),
+            product.slug,
+        ),
+        "url":   product.get_absolute_url(),
+    }
+
+
+def _service_fields(service):
+    return {
+        "title": service.title,
+        "body":  _join(service.tagline, service.overview, service.slug),
+        "url":   reverse("services:detail", kwargs={"slug": service.slug}),
+    }
+
+
+def _project_fields(project):
+    return {
+        "title": project.title,
+        "body":  _join(project.summary, project.description),
+        "url":   reverse("project_detail", kwargs={"slug": project.slug}),
+    }
+
+
+def _case_study_fields(case_study):
+    return {
+        "title": case_study.title,
+        "body":  _join(case_study.summary, case_study.results),
+        "url":   reverse("services:case_study_detail", kwargs={"slug": case_study.slug}),
+    }
+
+
+SOURCES = {
+    Product:   (SearchDocument.KIND_PRODUCT,    _product_fields),
+    Service:   (SearchDocument.KIND_SERVICE,    _service_fields),
+    Project:   (SearchDocument.KIND_PROJECT,    _project_fields),
+    CaseStudy: (SearchDocument.KIND_CASE_STUDY, _case_study_fields),
+}
+
+
+# ── Backend selection ────────────────────────
+
+def fts_enabled():
+    """True when the default database has the FTS5 table."""
+    cached = getattr(connection, "_search_fts_enabled", None)
+    if cached is None:
+        cached = (
+            connection.vendor == "sqlite"
+            and FTS_TABLE in connection.introspection.table_names()
+        )
+        connection._search_fts_enabled = cached
+    return cached
+
+
+def tokenize(text):
+    return [token for token in _TOKEN_RE.findall(text.lower()) if 2 <= len(token) <= 64]
+
+
+# ── Indexing ─────────────────────────────────
+
+def index_instance(instance):
+    """Create or refresh the search document for a source row."""
+    kind, build = SOURCES[type(instance)]
+    fields = build(instance)
+    fields["is_public"] = instance.is_active
+
+    with transaction.atomic():
+        document, _ = SearchDocument.objects.update_or_create(
+            kind=kind, object_id=instance.pk, defaults=fields,
+        )
+        if fts_enabled():
+            with connection.cursor() as cursor:
+                cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [document.pk])
+                cursor.execute(
+                    f"INSERT INTO {FTS_TABLE} (rowid, title, body) VALUES (%s, %s, %s)",
+                    [document.pk, document.title, document.body],
+                )
+        else:
+            _write_postings(document)
+    return document
+
+
+def _write_postings(document):
+    weights = defaultdict(int)
+    for token in tokenize(document.title):
+        weights[token] += TITLE_WEIGHT
+    for token in tokenize(document.body):
+        weights[token] += BODY_WEIGHT
+
+    SearchTerm.objects.filter(document=document).delete()
+    SearchTerm.objects.bulk_create(
+        SearchTerm(term=term, document=document, weight=weight)
+        for term, weight in weights.items()
+    )
+
+
+def remove_instance(instance):
+    kind, _ = SOURCES[type(instance)]
+    remove_document(kind, instance.pk)
+
+
+def remove_document(kind, object_id):
+    with transaction.atomic():
+        ids = list(
+            SearchDocument.objects.filter(kind=kind, object_id=object_id)
+            .values_list("id", flat=True)
+        )
+        if ids and fts_enabled():
+            with connection.cursor() as cursor:
+                cursor.executemany(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [[pk] for pk in ids])
+        SearchDocument.objects.filter(id__in=ids).delete()
+
+
+def is_indexed(kind):
+    """True once at least one document of `kind` has been written."""
+    return SearchDocument.objects.filter(kind=kind).exists()
+
+
+def backfill():
+    """
+    Index every row of each source kind that has no documents yet, so rows
+    created before the index existed become searchable. Kinds already
+    indexed are left to the save/delete signals. Returns {model: count}.
+    """
+    counts = {}
+    for model, (kind, _) in SOURCES.items():
+        if is_indexed(kind):
+            continue
+        count = 0
+        with transaction.atomic():
+            for instance in model.objects.all().iterator():
+                index_instance(instance)
+                count += 1
+        counts[model] = count
+    return counts
+
+
+def clear_index():
+    with transaction.atomic():
+        if fts_enabled():
+            with connection.cursor() as cursor:
+                cursor.execute(f"DELETE FROM {FTS_TABLE}")
+        SearchDocument.objects.all().delete()
+
+
+# ── Querying ─────────────────────────────────
+
+def _fts_ranked(tokens, kinds, public_only, limit):
+    # Every token is a quoted prefix term, so user input can never inject
+    # FTS5 operators; adjacent terms are ANDed.
+    match = " ".join(f'"{token}"*' for token in tokens)
+    doc_table = SearchDocument._meta.db_table
+
+    where  = [f"{FTS_TABLE} MATCH %s"]
+    params = [match]
+    if public_only:
+        where.append("d.is_public = %s")
+        params.append(True)
+    if kinds:
+        where.append(f"d.kind IN ({', '.join(['%s'] * len(kinds))})")
+        params.extend(kinds)
+
+    sql = (
+        f"SELECT d.id, bm25({FTS_TABLE}, 10.0, 1.0) AS score, "
+        f"snippet({FTS_TABLE}, 1, '', '', '…', 24) "
+        f"FROM {FTS_TABLE} JOIN {doc_table} d ON d.id = {FTS_TABLE}.rowid "
+        f"WHERE {' AND '.join(where)} ORDER BY score"
+    )
+    if limit:
+        sql += " LIMIT %s"
+        params.append(limit)
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        # bm25 is "lower is better"; flip it so callers sort descending.
+        return [(pk, -score, snippet) for pk, score, snippet in cursor.fetchall()]
+
+
+def _postings_ranked(tokens, kinds, public_only, limit):
+    scores = None
+    for token in dict.fromkeys(tokens):
+        postings = SearchTerm.objects.filter(term__startswith=token)
+        if public_only:
+            postings = postings.filter(document__is_public=True)
+        if kinds:
+            postings = postings.filter(document__kind__in=kinds)
+
+        token_scores = defaultdict(int)
+        for document_id, weight in postings.values_list("document_id", "weight"):
+            token_scores[document_id] += weight
+
+        if scores is None:
+            scores = token_scores
+        else:
+            scores = {pk: scores[pk] + token_scores[pk] for pk in scores if pk in token_scores}
+        if not scores:
+            return []
+
+    ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+    if limit:
+        ranked = ranked[:limit]
+    return [(pk, score, None) for pk, score in ranked]
+
+
+def _ranked(query, kinds=None, public_only=True, limit=20):
+    tokens = tokenize(query)
+    if not tokens:
+        return []
+    backend = _fts_ranked if fts_enabled() else _postings_ranked
+    return backend(tokens, kinds, public_only, limit)
+
+
+def search(query, kinds=None, limit=20):
+    """
+    Ranked public SearchDocuments for `query`, best first.
+    Each document gets `score` and `snippet` attributes.
+    """
+    ranked    = _ranked(query, kinds=kinds, limit=limit)
+    documents = SearchDocument.objects.in_bulk([pk for pk, _, _ in ranked])
+
+    results = []
+    for pk, score, snippet in ranked:
+        document = documents.get(pk)
+        if document is None:
+            continue
+        document.score   = score
+        document.snippet = snippet or document.body[:200]
+        results.append(document)
+    return results
+
+
+def search_object_ids(kind, query):
+    """
+    Source-row ids of one kind matching `query`, including inactive rows.
+    Returns None when the query has no searchable terms or nothing of that
+    kind has been indexed yet, so callers can fall back to a plain scan.
+    """
+    if not tokenize(query) or not is_indexed(kind):
+        return None
+    ids = [pk for pk, _, _ in _ranked(query, kinds=[kind], public_only=False, limit=None)]
+    return SearchDocument.objects.filter(id__in=ids).values_list("object_id", flat=True)
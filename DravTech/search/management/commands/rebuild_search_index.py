@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from search import engine
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the site search index for products, services, projects and case studies'
+
+    def handle(self, *args, **options):
+        backend = 'FTS5' if engine.fts_enabled() else 'inverted index'
+        self.stdout.write(f'Rebuilding search index ({backend})...')
+
+        with transaction.atomic():
+            engine.clear_index()
+            for model in engine.SOURCES:
+                count = 0
+                for instance in model.objects.all().iterator():
+                    engine.index_instance(instance)
+                    count += 1
+                self.stdout.write(f'  {model._meta.label}: {count}')
+
+        self.stdout.write(self.style.SUCCESS('Search index rebuilt.'))
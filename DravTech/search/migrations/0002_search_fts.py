@@ -0,0 +1,34 @@
+from django.db import migrations
+from django.db.utils import OperationalError
+
+
+def create_fts_table(apps, schema_editor):
+    """SQLite only; builds without FTS5 fall back to the SearchTerm index."""
+    connection = schema_editor.connection
+    if connection.vendor != "sqlite":
+        return
+    try:
+        schema_editor.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS search_fts "
+            "USING fts5(title, body, tokenize='porter unicode61')"
+        )
+    except OperationalError:
+        pass
+    connection.__dict__.pop("_search_fts_enabled", None)
+
+
+def drop_fts_table(apps, schema_editor):
+    if schema_editor.connection.vendor == "sqlite":
+        schema_editor.execute("DROP TABLE IF EXISTS search_fts")
+    schema_editor.connection.__dict__.pop("_search_fts_enabled", None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("search", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_fts_table, drop_fts_table),
+    ]
@@ -0,0 +1,53 @@
+from django.db import models
+
+
+class SearchDocument(models.Model):
+    """
+    One indexed object (product, service, project or case study).
+
+    Stores the flattened text that the FTS5 table / inverted index point at,
+    plus enough to render a result without touching the source model.
+    """
+    KIND_PRODUCT    = "product"
+    KIND_SERVICE    = "service"
+    KIND_PROJECT    = "project"
+    KIND_CASE_STUDY = "case_study"
+
+    KIND_CHOICES = [
+        (KIND_PRODUCT,    "Product"),
+        (KIND_SERVICE,    "Service"),
+        (KIND_PROJECT,    "Project"),
+        (KIND_CASE_STUDY, "Case Study"),
+    ]
+
+    kind       = models.CharField(max_length=20, choices=KIND_CHOICES)
+    object_id  = models.PositiveBigIntegerField()
+    title      = models.CharField(max_length=255)
+    body       = models.TextField(blank=True)
+    url        = models.CharField(max_length=255, blank=True)
+    is_public  = models.BooleanField(default=True,
+                     help_text="Mirrors the source row's is_active flag.")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ("kind", "object_id")
+
+    def __str__(self):
+        return f"{self.get_kind_display()}: {self.title}"
+
+
+class SearchTerm(models.Model):
+    """
+    Posting for the fallback inverted index (used when the database has no
+    FTS5). One row per (term, document) with a field-weighted frequency.
+    """
+    term     = models.CharField(max_length=64, db_index=True)
+    document = models.ForeignKey(SearchDocument, on_delete=models.CASCADE,
+                   related_name="terms")
+    weight   = models.PositiveIntegerField(default=1)
+
+    class Meta:
+        unique_together = ("term", "document")
+
+    def __str__(self):
+        return f"{self.term} → {self.document_id}"
@@ -0,0 +1,12 @@
+from rest_framework import serializers
+
+from .models import SearchDocument
+
+
+class SearchResultSerializer(serializers.ModelSerializer):
+    score   = serializers.FloatField(read_only=True)
+    snippet = serializers.CharField(read_only=True)
+
+    class Meta:
+        model  = SearchDocument
+        fields = ["kind", "title", "url", "snippet", "score"]
@@ -0,0 +1,32 @@
+# search/signals.py
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from main.models import Product
+from services.models import Service
+from . import autocomplete, engine
+
+AUTOCOMPLETE_MODELS = (Product, Service)
+
+
+@receiver(post_save)
+def index_on_save(sender, instance, raw=False, **kwargs):
+    # raw saves come from loaddata; run `rebuild_search_index` afterwards.
+    if sender in engine.SOURCES and not raw:
+        transaction.on_commit(lambda: engine.index_instance(instance))
+
+
+@receiver(post_delete)
+def remove_on_delete(sender, instance, **kwargs):
+    if sender in engine.SOURCES:
+        kind, _ = engine.SOURCES[sender]
+        object_id = instance.pk
+        transaction.on_commit(lambda: engine.remove_document(kind, object_id))
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def refresh_autocomplete(sender, **kwargs):
+    if sender in AUTOCOMPLETE_MODELS:
+        transaction.on_commit(autocomplete.bump_version)
@@ -0,0 +1,111 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from main.models import Category, Product, Project
+from services.models import CaseStudy, Service
+from . import autocomplete, engine
+
+
+class SearchEngineTests(TestCase):
+
+    def setUp(self):
+        category = Category.objects.create(name="Systems", slug="systems")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.erp = Product.objects.create(
+                title="School ERP", category=category, product_type=Product.TYPE_DIGITAL,
+                description="Fees, timetables and payroll for schools.",
+                features=["M-Pesa reconciliation"],
+            )
+            self.payroll = Service.objects.create(
+                title="Payroll Consulting", overview="We audit payroll processes.",
+            )
+            self.hidden = Service.objects.create(
+                title="Old payroll", overview="Retired payroll offering.", is_active=False,
+            )
+
+    def _titles(self, query, **kwargs):
+        return [doc.title for doc in engine.search(query, **kwargs)]
+
+    def test_sqlite_uses_fts5(self):
+        self.assertTrue(engine.fts_enabled())
+
+    def test_title_matches_rank_first_and_inactive_rows_are_hidden(self):
+        self.assertEqual(self._titles("payroll"), ["Payroll Consulting", "School ERP"])
+
+    def test_prefix_and_json_feature_matching(self):
+        self.assertEqual(self._titles("recon"), ["School ERP"])
+
+    def test_kind_filter(self):
+        self.assertEqual(self._titles("payroll", kinds=["product"]), ["School ERP"])
+
+    def test_inverted_index_fallback(self):
+        with mock.patch.object(engine, "fts_enabled", return_value=False):
+            engine.index_instance(self.erp)
+            engine.index_instance(self.payroll)
+            engine.index_instance(self.hidden)
+            self.assertEqual(self._titles("payroll"), ["Payroll Consulting", "School ERP"])
+            self.assertEqual(self._titles("payroll schools"), ["School ERP"])
+
+    def test_delete_removes_document(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.payroll.delete()
+        self.assertEqual(self._titles("payroll"), ["School ERP"])
+
+    def test_operator_characters_are_not_fts_syntax(self):
+        self.assertEqual(self._titles('"erp* -('), ["School ERP"])
+
+    def test_admin_ids_include_inactive_rows(self):
+        ids = set(engine.search_object_ids("service", "payroll"))
+        self.assertEqual(ids, {self.payroll.pk, self.hidden.pk})
+
+    def test_unindexed_rows_are_backfilled_and_admin_falls_back_meanwhile(self):
+        engine.clear_index()
+        self.assertIsNone(engine.search_object_ids("service", "payroll"))
+
+        counts = engine.backfill()
+        self.assertEqual(counts, {Product: 1, Service: 2, Project: 0, CaseStudy: 0})
+        self.assertEqual(self._titles("payroll"), ["Payroll Consulting", "School ERP"])
+        self.assertEqual(engine.backfill(), {Project: 0, CaseStudy: 0})
+
+    def test_search_page_and_api(self):
+        response = self.client.get(reverse("search:results"), {"q": "erp"})
+        self.assertContains(response, "School ERP")
+
+        data = self.client.get(reverse("api-search"), {"q": "erp"}).json()
+        self.assertEqual(data["results"][0]["url"], self.erp.get_absolute_url())
+
+
+class AutocompleteTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        category = Category.objects.create(name="Merch", slug="merch")
+        with self.captureOnCommitCallbacks(execute=True):
+            Product.objects.create(title="Dravtech Hoodie", category=category,
+                                   product_type=Product.TYPE_MERCH)
+            Service.objects.create(title="Web Development", overview="Sites")
+
+    def _suggest(self, q):
+        response = self.client.get(reverse("api-autocomplete"), {"q": q})
+        return [s["title"] for s in response.json()["suggestions"]]
+
+    def test_matches_title_start_word_start_and_slug(self):
+        self.assertEqual(self._suggest("drav"), ["Dravtech Hoodie"])
+        self.assertEqual(self._suggest("hoo"), ["Dravtech Hoodie"])
+        self.assertEqual(self._suggest("web-dev"), ["Web Development"])
+        self.assertEqual(self._suggest("xyz"), [])
+
+    def test_warm_lookup_runs_no_queries(self):
+        self._suggest("we")
+        with self.assertNumQueries(0):
+            self._suggest("web")
+
+    def test_change_signal_rebuilds_index(self):
+        version = autocomplete.get_index().version
+        with self.captureOnCommitCallbacks(execute=True):
+            Service.objects.create(title="Webinar Hosting", overview="Events")
+        self.assertEqual(self._suggest("webi"), ["Webinar Hosting"])
+        self.assertNotEqual(autocomplete.get_index().version, version)
@@ -0,0 +1,79 @@
+import time
+
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import JsonResponse
+from django.shortcuts import render
+from django.views.decorators.http import require_GET
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from . import autocomplete, engine
+from .models import SearchDocument
+from .serializers import SearchResultSerializer
+
+MAX_RESULTS = 50
+
+
+def _search_params(params):
+    query = params.get("q", "").strip()[:200]
+    kind  = params.get("type", "")
+    kinds = [kind] if kind in dict(SearchDocument.KIND_CHOICES) else None
+    return query, kind if kinds else "", kinds
+
+
+def search_page(request):
+    """Ranked site search across products, services, projects and case studies."""
+    query, kind, kinds = _search_params(request.GET)
+    results = engine.search(query, kinds=kinds, limit=MAX_RESULTS) if query else []
+
+    return render(request, "search/results.html", {
+        "query":      query,
+        "kind":       kind,
+        "kinds":      SearchDocument.KIND_CHOICES,
+        "results":    results,
+        "page_title": f"Search: {query}" if query else "Search",
+    })
+
+
+class SearchAPIView(APIView):
+    """GET /api/search/?q=<terms>&type=<kind>&limit=<n>"""
+    renderer_classes = [JSONRenderer]
+
+    def get(self, request):
+        query, kind, kinds = _search_params(request.query_params)
+        try:
+            limit = min(int(request.query_params.get("limit", 20)), MAX_RESULTS)
+        except ValueError:
+            limit = 20
+        results = engine.search(query, kinds=kinds, limit=max(limit, 1)) if query else []
+        return Response({
+            "query":   query,
+            "results": SearchResultSerializer(results, many=True).data,
+        })
+
+
+@require_GET
+def autocomplete_view(request):
+    """
+    GET /api/autocomplete/?q=<prefix>&limit=<n>
+    Plain JsonResponse (no DRF) to keep the type-ahead path minimal.
+    """
+    started = time.perf_counter()
+    try:
+        limit = int(request.GET.get("limit", autocomplete.MAX_LIMIT))
+    except ValueError:
+        limit = autocomplete.MAX_LIMIT
+    suggestions = autocomplete.suggest(request.GET.get("q", "")[:100], max(limit, 1))
+
+    response = JsonResponse({"suggestions": suggestions})
+    response["Server-Timing"] = f"suggest;dur={(time.perf_counter() - started) * 1000:.2f}"
+    response["Cache-Control"] = "public, max-age=60"
+    return response
+
+
+@staff_member_required
+@require_GET
+def autocomplete_metrics(request):
+    """Build time and size of this worker's autocomplete index."""
+    return JsonResponse(autocomplete.get_index().metrics())
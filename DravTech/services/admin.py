@@ -1,5 +1,7 @@
 from django.contrib import admin
 from django.utils.text import slugify
+
+from search.admin import IndexedSearchMixin
 from .models import (
     Service,
     ServiceHighlight,
@@ -24,7 +26,9 @@ class CaseStudyInline(admin.TabularInline):
     model = CaseStudy
     extra = 0
 @admin.register(Service)
-class ServiceAdmin(admin.ModelAdmin):
+class ServiceAdmin(IndexedSearchMixin, admin.ModelAdmin):
+    search_kind = "service"
+
     list_display = (
         "title",
         "category",
@@ -0,0 +1,24 @@
+# Generated by Django 4.2.23 on 2026-10-16 22:35
+
+import main.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('services', '0004_servicecategory_short_description_and_more'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='casestudy',
+            name='image',
+            field=models.ImageField(blank=True, null=True, storage=main.storage.media_storage, upload_to='case_studies/'),
+        ),
+        migrations.AlterField(
+            model_name='service',
+            name='image',
+            field=models.ImageField(blank=True, null=True, storage=main.storage.media_storage, upload_to='services/'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.23 on 2026-10-16 22:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('services', '0005_alter_casestudy_image_alter_service_image'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='casestudy',
+            index=models.Index(condition=models.Q(('is_active', True), ('is_featured', True)), fields=['display_order', 'title'], name='casestudy_featured_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='service',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['display_order', 'title'], name='service_active_order_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='service',
+            index=models.Index(condition=models.Q(('is_active', True), ('is_featured', True)), fields=['display_order', 'title'], name='service_featured_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='service',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['category', 'display_order', 'title'], name='service_category_order_idx'),
+        ),
+    ]
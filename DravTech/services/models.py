@@ -1,6 +1,9 @@
 from django.db import models
+from django.db.models import Q
 from django.utils.text import slugify
 
+from main.storage import media_storage
+
 
 class ServiceCategory(models.Model):
     """
@@ -76,6 +79,7 @@ class Service(models.Model):
 
     image = models.ImageField(
         upload_to="services/",
+        storage=media_storage,
         blank=True,
         null=True
     )
@@ -112,6 +116,15 @@ class Service(models.Model):
 
     class Meta:
         ordering = ["display_order", "title"]
+        indexes = [
+            models.Index(fields=["display_order", "title"],
+                         condition=Q(is_active=True), name="service_active_order_idx"),
+            models.Index(fields=["display_order", "title"],
+                         condition=Q(is_active=True, is_featured=True),
+                         name="service_featured_idx"),
+            models.Index(fields=["category", "display_order", "title"],
+                         condition=Q(is_active=True), name="service_category_order_idx"),
+        ]
 
     def save(self, *args, **kwargs):
         if not self.slug:
@@ -209,7 +222,8 @@ class CaseStudy(models.Model):
     title = models.CharField(max_length=200)
     slug = models.SlugField(unique=True, blank=True)
     summary = models.TextField()
-    image = models.ImageField(upload_to="case_studies/", blank=True, null=True)
+    image = models.ImageField(upload_to="case_studies/", storage=media_storage,
+                              blank=True, null=True)
 
     results = models.TextField(
         help_text="Quantifiable impact or results achieved"
@@ -223,6 +237,11 @@ class CaseStudy(models.Model):
 
     class Meta:
         ordering = ["display_order", "title"]
+        indexes = [
+            models.Index(fields=["display_order", "title"],
+                         condition=Q(is_active=True, is_featured=True),
+                         name="casestudy_featured_idx"),
+        ]
 
     def save(self, *args, **kwargs):
         if not self.slug:
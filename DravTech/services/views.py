@@ -6,8 +6,9 @@ from rest_framework.response import Response
 from rest_framework import status
 from django.contrib import messages
 from django.urls import reverse
-from django.core.mail import send_mail
 from django.conf import settings
+from DravTech.routers import replica_reads
+from main import outbox
 from .models import (
     Service,
     ServiceHighlight,
@@ -58,6 +59,7 @@ class ServiceDetailViewSet(ReadOnlyModelViewSet):
                 "case_studies",
             )
         )
+@replica_reads
 def services(request):
     services_qs = (
         Service.objects
@@ -70,6 +72,7 @@ def services(request):
         "services/services.html",
         {"services": services_qs},
     )
+@replica_reads
 def service_detail(request, slug):
     service = get_object_or_404(
         Service.objects
@@ -230,15 +233,9 @@ def service_booking(request, slug):
             </html>
             """
             
-            send_mail(
-                subject=subject,
-                message="",
-                from_email=from_email,
-                recipient_list=recipient_list,
-                html_message=html_message,
-                fail_silently=False,
-            )
-            print(f"✅ Service booking confirmation email sent to {email}")
+            outbox.enqueue(subject, "", recipient_list,
+                           html_body=html_message, from_email=from_email)
+            print(f"✅ Service booking confirmation email queued for {email}")
         except Exception as e:
             print(f"❌ Failed to send service booking confirmation email: {e}")
             import traceback
@@ -270,14 +267,9 @@ def service_booking(request, slug):
             
             admin_from_email = getattr(settings, 'DEFAULT_FROM_EMAIL', 'no-reply@example.com')
             
-            send_mail(
-                subject=admin_subject,
-                message=admin_body,
-                from_email=admin_from_email,
-                recipient_list=admin_emails,
-                fail_silently=False,
-            )
-            print(f"✅ Service booking admin notification sent to {admin_emails}")
+            outbox.enqueue(admin_subject, admin_body, admin_emails,
+                           from_email=admin_from_email)
+            print(f"✅ Service booking admin notification queued for {admin_emails}")
         except Exception as e:
             print(f"❌ Failed to send service booking admin notification: {e}")
             import traceback
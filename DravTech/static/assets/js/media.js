@@ -0,0 +1,52 @@
+/**
+ * Lazy background videos ({% lazy_video %}, see main/media.py).
+ * Sources and poster are attached once a video comes within 200px of the
+ * viewport; it plays while visible and pauses when scrolled away.
+ */
+(function() {
+  "use strict";
+
+  const videos = document.querySelectorAll('video[data-lazy-video]');
+  if (!videos.length) return;
+
+  const reduceMotion = window.matchMedia && window.matchMedia('(prefers-reduced-motion: reduce)').matches;
+
+  function load(video) {
+    if (video.dataset.loaded) return;
+    video.dataset.loaded = 'true';
+    if (video.dataset.poster) video.poster = video.dataset.poster;
+    video.querySelectorAll('source[data-src]').forEach(source => {
+      source.src = source.dataset.src;
+      source.removeAttribute('data-src');
+    });
+    video.load();
+  }
+
+  function play(video) {
+    if ('autoplay' in video.dataset && !reduceMotion) {
+      video.play().catch(() => {});
+    }
+  }
+
+  if (!('IntersectionObserver' in window)) {
+    videos.forEach(video => {
+      load(video);
+      play(video);
+    });
+    return;
+  }
+
+  const observer = new IntersectionObserver(entries => {
+    entries.forEach(entry => {
+      const video = entry.target;
+      if (entry.isIntersecting) {
+        load(video);
+        play(video);
+      } else if (video.dataset.loaded) {
+        video.pause();
+      }
+    });
+  }, { rootMargin: '200px 0px' });
+
+  videos.forEach(video => observer.observe(video));
+})();